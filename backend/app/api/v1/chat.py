@@ -2,15 +2,20 @@ from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, AsyncGenerator, List
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 import asyncio
 import time
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
 from db.database import get_db_session, get_db_context
-from db.repository import CommunityRepository, LeadRepository, ConversationRepository, MessageRepository
+from db.repository import AvailabilitySummaryRepository, CommunityRepository, LeadRepository, ConversationRepository, MessageRepository
+from db.instrumentation import current_request_id
+from db.routing import pin_to_primary
+from services.fact_sheet import get_fact_sheet
 from services.llm import handle_lead_inquiry
+from core.ids import nanoid
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -63,6 +68,7 @@ class CommunityResponse(BaseModel):
     address: str
     phone: Optional[str] = None
     email: Optional[str] = None
+    available_units: int = 0
 
 
 @router.get("/communities", response_model=List[CommunityResponse])
@@ -72,6 +78,8 @@ async def get_communities(db: AsyncSession = Depends(get_db_session)):
     try:
         community_repo = CommunityRepository()
         communities = await community_repo.get_all(db)
+        summary_repo = AvailabilitySummaryRepository()
+        available_counts = await summary_repo.get_available_counts(db)
         
         logger.info(f"Retrieved {len(communities)} communities")
         
@@ -81,7 +89,8 @@ async def get_communities(db: AsyncSession = Depends(get_db_session)):
                 name=community.name,
                 address=community.address,
                 phone=community.phone,
-                email=community.email
+                email=community.email,
+                available_units=available_counts.get(community.id, 0)
             )
             for community in communities
         ]
@@ -96,7 +105,6 @@ async def start_chat(request: StartChatRequest, db: AsyncSession = Depends(get_d
     
     try:
         lead_repo = LeadRepository()
-        conversation_repo = ConversationRepository()
         
         move_in_date = datetime.fromisoformat(request.preferences.move_in)
         
@@ -108,23 +116,16 @@ async def start_chat(request: StartChatRequest, db: AsyncSession = Depends(get_d
             "preferred_move_in": move_in_date
         }
         
-        lead = await lead_repo.create_or_get_by_email(db, lead_data)
-        logger.info(f"Lead processed - ID: {lead.id}, Email: {lead.email}")
-        
-        conversation_data = {
-            "lead_id": lead.id,
-            "community_id": request.community_id
-        }
-        conversation = await conversation_repo.create(db, conversation_data)
-        logger.info(f"Conversation created - ID: {conversation.id}, Lead: {lead.id}, Community: {request.community_id}")
+        started = await lead_repo.create_with_conversation(db, lead_data, request.community_id)
+        logger.info(f"Conversation created - ID: {started.conversation_id}, Lead: {started.lead_id}, Email: {started.email}, Community: {request.community_id}")
         
         response = StartChatResponse(
-            lead_id=lead.id,
-            conversation_id=conversation.id,
-            message=f"Hi {lead.name}! I'm here to help you find the perfect {request.preferences.bedrooms}-bedroom apartment. What questions do you have?"
+            lead_id=started.lead_id,
+            conversation_id=started.conversation_id,
+            message=f"Hi {started.name}! I'm here to help you find the perfect {request.preferences.bedrooms}-bedroom apartment. What questions do you have?"
         )
         
-        logger.info(f"Chat started successfully - Conversation: {conversation.id}")
+        logger.info(f"Chat started successfully - Conversation: {started.conversation_id}")
         return response
         
     except Exception as e:
@@ -135,11 +136,14 @@ async def start_chat(request: StartChatRequest, db: AsyncSession = Depends(get_d
 
 async def generate_leasing_response(request: ReplyRequest) -> AsyncGenerator[str, None]:
     start_time = time.time()
-    request_id = str(uuid.uuid4())
+    request_id = current_request_id() or str(uuid.uuid4())
     logger.info(f"Processing reply - Lead: {request.lead_id}, Conversation: {request.conversation_id}, RequestID: {request_id}, Message: '{request.message[:100]}...'")
     
     try:
         async with get_db_context() as db:
+            # The lead, conversation and earlier turns were written by previous
+            # requests; only catalog reads may be served by a replica.
+            pin_to_primary(db, "leads", "conversations", "messages")
             lead_repo = LeadRepository()
             message_repo = MessageRepository()
             lead = await lead_repo.get_by_id(db, request.lead_id)
@@ -156,17 +160,22 @@ async def generate_leasing_response(request: ReplyRequest) -> AsyncGenerator[str
                 raise ValueError("Conversation not found")
             
             # Get conversation history
-            conversation_messages = await message_repo.get_by_conversation_id(db, request.conversation_id)
+            conversation_messages = await message_repo.get_by_conversation_id(
+                db, request.conversation_id, since=conversation.created_at
+            )
             logger.info(f"Retrieved {len(conversation_messages)} previous messages for conversation {request.conversation_id}")
             
-            # Create the user message record
+            # The message row is built client-side and inserted once, complete
+            # with the reply, after the LLM call; the whole request is one
+            # transaction, so writing it earlier bought no durability.
             user_message_data = {
+                "id": nanoid(),
                 "conversation_id": request.conversation_id,
                 "message_text": request.message,
-                "request_id": request_id
+                "request_id": request_id,
+                "created_at": datetime.now(timezone.utc)
             }
-            user_message = await message_repo.create(db, user_message_data)
-            logger.info(f"User message saved - ID: {user_message.id}")
+            logger.info(f"User message received - ID: {user_message_data['id']}")
             
             inquiry_data = {
                 "lead": {
@@ -187,8 +196,14 @@ async def generate_leasing_response(request: ReplyRequest) -> AsyncGenerator[str
                     "bedrooms": lead.preferred_bedrooms,
                     "move_in": lead.preferred_move_in.isoformat() if lead.preferred_move_in else None
                 },
-                "community_id": conversation.community_id
+                "community_id": conversation.community_id,
+                "conversation_id": request.conversation_id,
+                "request_id": request_id,
+                "tool_history": [msg.tools_called for msg in conversation_messages if msg.tools_called]
             }
+            if settings.FACT_SHEET_ENABLED:
+                fact_sheet = await get_fact_sheet(db, conversation.community_id)
+                inquiry_data["fact_sheet"] = {"version": fact_sheet.version, "text": fact_sheet.text} if fact_sheet else None
             
             logger.info(f"Sending inquiry to LLM - Lead: {lead.email}, Community: {conversation.community_id}, History length: {len(inquiry_data['conversation_history'])}")
             action_response = await handle_lead_inquiry(db, inquiry_data)
@@ -196,8 +211,8 @@ async def generate_leasing_response(request: ReplyRequest) -> AsyncGenerator[str
             processing_time = time.time() - start_time
             logger.info(f"LLM response received - Action: {action_response.action_type}, Processing time: {processing_time:.2f}s")
             
-            # Update user message with the reply and action info
-            update_data = {
+            # Reply and action info
+            reply_data = {
                 "reply_text": action_response.response_text,
                 "action": action_response.action_type,
                 "llm_latency_ms": int(processing_time * 1000),
@@ -207,7 +222,7 @@ async def generate_leasing_response(request: ReplyRequest) -> AsyncGenerator[str
             if action_response.action_type == "propose_tour" and action_response.tour_date and action_response.tour_time:
                 try:
                     proposed_datetime = datetime.fromisoformat(f"{action_response.tour_date}T{action_response.tour_time}")
-                    update_data["proposed_time"] = proposed_datetime
+                    reply_data["proposed_time"] = proposed_datetime
                 except ValueError:
                     try:
                         from datetime import datetime as dt
@@ -221,15 +236,15 @@ async def generate_leasing_response(request: ReplyRequest) -> AsyncGenerator[str
                             datetime_str = f"{date_str}T{time_str}"
                             proposed_datetime = dt.fromisoformat(datetime_str)
                         
-                        update_data["proposed_time"] = proposed_datetime
+                        reply_data["proposed_time"] = proposed_datetime
                     except ValueError as e:
                         logger.warning(f"Failed to parse tour datetime: {action_response.tour_date}T{action_response.tour_time} - {e}")
             
             if hasattr(action_response, 'tools_called') and action_response.tools_called:
-                update_data["tools_called"] = action_response.tools_called
+                reply_data["tools_called"] = action_response.tools_called
             
-            await message_repo.update(db, user_message.id, update_data)
-            logger.info(f"Message updated with LLM response - ID: {user_message.id}")
+            user_message = await message_repo.create(db, {**user_message_data, **reply_data})
+            logger.info(f"Message saved with LLM response - ID: {user_message.id}")
             
             words = action_response.response_text.split()
             current_chunk = ""
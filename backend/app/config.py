@@ -1,4 +1,5 @@
 import os
+from typing import List, Optional
 
 from pydantic import Field, PostgresDsn
 from pydantic_settings import BaseSettings
@@ -11,7 +12,66 @@ class Settings(BaseSettings):
     FRONTEND_URL: str
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = Field(default="gpt-4.1")
-    
+
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=20)
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=10.0)
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=1800)
+    DB_POOL_PRE_PING: bool = Field(default=True)
+    DB_STATEMENT_TIMEOUT_MS: int = Field(default=30000)
+    DB_PGBOUNCER_MODE: bool = Field(default=False)
+    # Statements at or over the threshold are logged with their plan; 0 disables the slow-query log
+    DB_SLOW_QUERY_THRESHOLD_MS: int = Field(default=500)
+    DB_SLOW_QUERY_EXPLAIN: bool = Field(default=True)
+    DB_N_PLUS_ONE_THRESHOLD: int = Field(default=20)
+    # LISTEN needs a session-level connection; point this past PgBouncer if it runs in transaction mode
+    NOTIFY_DATABASE_URL: Optional[PostgresDsn] = Field(default=None)
+    DATABASE_REPLICA_URLS: List[PostgresDsn] = Field(default=[])
+    REPLICA_MAX_LAG_SECONDS: float = Field(default=2.0)
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = Field(default=1.0)
+
+    # External leasing system; one pooled client is shared by every call
+    LEASING_API_URL: str = Field(default="https://api.leasing-system.com/v1")
+    LEASING_API_TIMEOUT_SECONDS: float = Field(default=10.0)
+    LEASING_API_CONNECT_TIMEOUT_SECONDS: float = Field(default=3.0)
+    LEASING_API_MAX_CONNECTIONS: int = Field(default=20)
+    LEASING_API_MAX_CONCURRENCY: int = Field(default=20)
+    LEASING_API_MAX_ATTEMPTS: int = Field(default=3)
+
+    INVENTORY_CACHE_ENABLED: bool = Field(default=True)
+    # unit_availability_summary is recomputed in the background after writes to units and unit_pricing
+    AVAILABILITY_SUMMARY_POLL_INTERVAL_SECONDS: float = Field(default=5.0)
+    AVAILABILITY_SUMMARY_FULL_REFRESH_SECONDS: float = Field(default=300.0)
+    TOUR_SLOT_INDEX_ENABLED: bool = Field(default=True)
+    FACT_SHEET_ENABLED: bool = Field(default=True)
+    TOOL_MEMO_ENABLED: bool = Field(default=True)
+    # Tool call audit records are written in batches by a background task
+    TOOL_AUDIT_SUCCESS_SAMPLE_RATE: float = Field(default=1.0)
+    TOOL_AUDIT_QUEUE_SIZE: int = Field(default=10000)
+    TOOL_AUDIT_BATCH_SIZE: int = Field(default=200)
+    TOOL_AUDIT_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0)
+    # Per-tool circuit breakers, over a rolling window of recent calls
+    TOOL_BREAKER_WINDOW: int = Field(default=20)
+    TOOL_BREAKER_MIN_CALLS: int = Field(default=5)
+    TOOL_BREAKER_FAILURE_RATE: float = Field(default=0.5)
+    TOOL_BREAKER_SLOW_CALL_RATE: float = Field(default=0.5)
+    TOOL_BREAKER_OPEN_SECONDS: float = Field(default=30.0)
+
+    # messages and tool_calls are partitioned by month; unset retention keeps everything
+    PARTITION_MONTHS_AHEAD: int = Field(default=3)
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = Field(default=6 * 3600)
+    MESSAGES_RETENTION_MONTHS: Optional[int] = Field(default=None)
+    TOOL_CALLS_RETENTION_MONTHS: Optional[int] = Field(default=None)
+    PARTITION_RETENTION_DROP: bool = Field(default=False)
+
+    ADMISSION_CONTROL_ENABLED: bool = Field(default=True)
+    ADMISSION_LLM_ROUTES: List[str] = Field(default=["/api/v1/chat/reply"])
+    ADMISSION_LLM_MAX_CONCURRENCY: int = Field(default=32)
+    ADMISSION_LLM_MAX_QUEUE: int = Field(default=64)
+    ADMISSION_STANDARD_MAX_CONCURRENCY: int = Field(default=256)
+    ADMISSION_STANDARD_MAX_QUEUE: int = Field(default=512)
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = Field(default=5.0)
+    ADMISSION_RETRY_AFTER_SECONDS: int = Field(default=2)
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+in_flight_gauge = registry.gauge(
+    "admission_in_flight_requests", "Requests currently being served", ["route_class"]
+)
+queue_depth_gauge = registry.gauge(
+    "admission_queue_depth", "Requests waiting for a concurrency slot", ["route_class"]
+)
+rejected_counter = registry.counter(
+    "admission_rejected_total", "Requests shed with 503", ["route_class", "reason"]
+)
+queue_wait_histogram = registry.histogram(
+    "admission_queue_wait_seconds", "Time spent waiting for a concurrency slot", ["route_class"]
+)
+
+
+async def acquire_within(semaphore: asyncio.Semaphore, timeout: float) -> bool:
+    """
+    Acquire ``semaphore``, giving up after ``timeout`` seconds. Returns
+    whether the permit was taken.
+
+    ``asyncio.wait_for(semaphore.acquire(), timeout)`` can leak a permit
+    before Python 3.12: when the timeout fires just as the acquire
+    succeeds, the result is dropped and nothing releases it. Here the
+    acquire runs as a task that is only abandoned through
+    ``_abandon_acquire``, which hands back a permit it wins anyway.
+    """
+    acquire = asyncio.ensure_future(semaphore.acquire())
+    try:
+        await asyncio.wait({acquire}, timeout=timeout)
+    except asyncio.CancelledError:
+        _abandon_acquire(semaphore, acquire)
+        raise
+    if acquire.done():
+        return True
+    _abandon_acquire(semaphore, acquire)
+    return False
+
+
+def _abandon_acquire(semaphore: asyncio.Semaphore, acquire: asyncio.Future) -> None:
+    def release_if_acquired(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            semaphore.release()
+
+    if acquire.done():
+        release_if_acquired(acquire)
+        return
+    acquire.cancel()
+    acquire.add_done_callback(release_if_acquired)
+
+
+@dataclass(frozen=True)
+class RouteClassLimit:
+    max_concurrency: int
+    max_queue: int
+    queue_timeout_seconds: float
+
+
+class RouteClassLimiter:
+    """
+    Bounded concurrency with a bounded wait queue for one class of routes.
+    """
+
+    def __init__(self, route_class: str, limit: RouteClassLimit):
+        self.route_class = route_class
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit.max_concurrency)
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Take a slot, waiting in the queue if needed. Returns the rejection
+        reason when the request should be shed, otherwise None.
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.limit.max_queue:
+                return "queue_full"
+
+            self.waiting += 1
+            queue_depth_gauge.set(self.waiting, route_class=self.route_class)
+            wait_start = time.perf_counter()
+            try:
+                if not await acquire_within(self._semaphore, self.limit.queue_timeout_seconds):
+                    return "queue_timeout"
+            finally:
+                self.waiting -= 1
+                queue_depth_gauge.set(self.waiting, route_class=self.route_class)
+                queue_wait_histogram.observe(time.perf_counter() - wait_start, route_class=self.route_class)
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        in_flight_gauge.set(self.in_flight, route_class=self.route_class)
+        return None
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        in_flight_gauge.set(self.in_flight, route_class=self.route_class)
+        self._semaphore.release()
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that caps in-flight requests per route class and sheds
+    the excess with 503 + Retry-After instead of letting it pile up on the
+    database pool and the LLM. Slots are held until the response body has
+    been fully sent, so streaming replies count for their whole lifetime.
+    """
+
+    def __init__(
+        self,
+        app,
+        limits: Dict[str, RouteClassLimit],
+        classify: Callable[[str], Optional[str]],
+        retry_after_seconds: int = 1,
+    ):
+        self.app = app
+        self.classify = classify
+        self.retry_after_seconds = retry_after_seconds
+        self.limiters = {
+            route_class: RouteClassLimiter(route_class, limit)
+            for route_class, limit in limits.items()
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.classify(scope["path"])
+        limiter = self.limiters.get(route_class) if route_class else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await limiter.acquire()
+        if reason:
+            rejected_counter.inc(route_class=route_class, reason=reason)
+            logger.warning(f"Shedding request - Path: {scope['path']}, Class: {route_class}, Reason: {reason}, In flight: {limiter.in_flight}, Queued: {limiter.waiting}")
+            await self._reject(send, reason)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, reason: str) -> None:
+        body = json.dumps({"detail": "Server is busy, please retry shortly", "reason": reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after_seconds).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,115 @@
+import time
+from collections import deque
+from typing import Callable, Deque, NamedTuple, Optional
+
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+state_gauge = registry.gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["breaker"]
+)
+transitions_counter = registry.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes", ["breaker", "state"]
+)
+rejected_counter = registry.counter(
+    "circuit_breaker_rejected_total", "Calls rejected while the breaker was open", ["breaker"]
+)
+
+
+class Outcome(NamedTuple):
+    failed: bool
+    slow: bool
+
+
+class CircuitBreaker:
+    """
+    Trips open when, over the last ``window`` calls (once at least
+    ``min_calls`` have been seen), the share of failed calls reaches
+    ``failure_rate`` or the share of calls slower than ``slow_call_seconds``
+    reaches ``slow_call_rate``. After ``open_seconds`` a single probe call
+    is let through (half-open); it closes the breaker if it succeeds in
+    time and re-opens it otherwise.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: Optional[float] = None,
+        slow_call_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: Deque[Outcome] = deque(maxlen=window)
+        self._probe_in_flight = False
+        state_gauge.set(STATE_VALUES[CLOSED], breaker=name)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker {self.name} {self.state} -> {state}")
+        self.state = state
+        state_gauge.set(STATE_VALUES[state], breaker=self.name)
+        transitions_counter.inc(breaker=self.name, state=state)
+        if state == OPEN:
+            self.opened_at = self.clock()
+        if state != HALF_OPEN:
+            self._probe_in_flight = False
+        self._outcomes.clear()
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - self.clock()) if self.state == OPEN else 0.0
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go ahead now. Every allowed call must be followed
+        by exactly one ``record``.
+        """
+        if self.state == OPEN and self.clock() - self.opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        rejected_counter.inc(breaker=self.name)
+        return False
+
+    def record(self, success: bool, seconds: float) -> None:
+        outcome = Outcome(
+            failed=not success,
+            slow=self.slow_call_seconds is not None and seconds >= self.slow_call_seconds,
+        )
+        if self.state == HALF_OPEN:
+            self._transition(OPEN if outcome.failed or outcome.slow else CLOSED)
+            return
+        if self.state == OPEN:
+            # A call let through before the breaker tripped
+            return
+
+        self._outcomes.append(outcome)
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failed = sum(o.failed for o in self._outcomes)
+        slow = sum(o.slow for o in self._outcomes)
+        if failed / calls >= self.failure_rate or slow / calls >= self.slow_call_rate:
+            self._transition(OPEN)
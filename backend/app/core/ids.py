@@ -0,0 +1,24 @@
+import secrets
+from typing import List
+
+# Same alphabet and default size as the nanoid() SQL function (migration
+# 728455e2e369), so client- and server-generated ids are indistinguishable.
+ALPHABET = "_-0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DEFAULT_SIZE = 21
+
+# 64 symbols divide 256 evenly, so masking each random byte to its low six
+# bits picks every symbol with equal probability and nothing is rejected;
+# repeating the alphabet four times is exactly that byte -> symbol table.
+# The whole mapping is then a single bytes.translate() call.
+_BYTE_TO_SYMBOL = ALPHABET.encode() * 4
+
+
+def nanoid(size: int = DEFAULT_SIZE) -> str:
+    """A random URL-safe id, generated without a round trip to the database."""
+    return secrets.token_bytes(size).translate(_BYTE_TO_SYMBOL).decode("ascii")
+
+
+def nanoids(count: int, size: int = DEFAULT_SIZE) -> List[str]:
+    """``count`` ids from one read of the OS random source."""
+    symbols = secrets.token_bytes(count * size).translate(_BYTE_TO_SYMBOL).decode("ascii")
+    return [symbols[start:start + size] for start in range(0, count * size, size)]
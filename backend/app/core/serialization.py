@@ -0,0 +1,24 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+
+def json_default(value: Any) -> Any:
+    """JSON fallback for the non-JSON types tool results carry (datetimes, enums, decimals)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def canonical_json(value: Any) -> str:
+    """
+    Deterministic JSON encoding (sorted keys, no whitespace), so equal
+    payloads always produce identical text and therefore identical hashes.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=json_default)
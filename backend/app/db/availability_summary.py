@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+refreshed_counter = registry.counter(
+    "unit_availability_summary_refreshes_total", "Availability summary recomputes", ["kind"]
+)
+
+
+async def refresh_stale(connection: AsyncConnection, batch_size: int) -> int:
+    """Recompute the communities behind up to ``batch_size`` queued entries; returns the entries claimed."""
+    claimed = await connection.scalar(
+        text("SELECT refresh_stale_unit_availability_summaries(:batch_size)"), {"batch_size": batch_size}
+    )
+    if claimed:
+        refreshed_counter.inc(claimed, kind="queued")
+    return claimed
+
+
+async def refresh_all(connection: AsyncConnection) -> int:
+    """Recompute every community, unless another worker is already at it; returns the communities done."""
+    refreshed = await connection.scalar(text("SELECT refresh_all_unit_availability_summaries()"))
+    if refreshed:
+        refreshed_counter.inc(refreshed, kind="full")
+    return refreshed
+
+
+class AvailabilitySummaryRefresher:
+    """
+    Keeps unit_availability_summary in step with units and unit_pricing.
+    Writes to those tables only queue the affected communities; this task
+    recomputes them, each batch in its own READ COMMITTED transaction so
+    it sees every committed write. It wakes on ``wake`` (subscribed to
+    inventory_changed) and otherwise polls, and every
+    ``full_refresh_interval_seconds`` recomputes everything so prices that
+    took effect or expired without a write are picked up.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        poll_interval_seconds: float,
+        full_refresh_interval_seconds: float,
+        batch_size: int = 100,
+    ):
+        self.engine = engine.execution_options(isolation_level="READ COMMITTED")
+        self.poll_interval_seconds = poll_interval_seconds
+        self.full_refresh_interval_seconds = full_refresh_interval_seconds
+        self.batch_size = batch_size
+        self._wake: Optional[asyncio.Event] = None
+        self._full_refresh_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self, payload: str = "") -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            # Created here so it belongs to the running loop
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="availability-summary-refresh")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh_pending(self) -> int:
+        """Drain the queue; returns the entries claimed."""
+        claimed = 0
+        while True:
+            async with self.engine.begin() as connection:
+                batch = await refresh_stale(connection, self.batch_size)
+            claimed += batch
+            if batch < self.batch_size:
+                return claimed
+
+    async def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._full_refresh_at is None or now - self._full_refresh_at >= self.full_refresh_interval_seconds:
+            async with self.engine.begin() as connection:
+                await refresh_all(connection)
+            self._full_refresh_at = now
+        await self.refresh_pending()
+
+    async def _run(self) -> None:
+        while True:
+            # Cleared before draining, so a write queued mid-drain wakes the next pass
+            self._wake.clear()
+            try:
+                await self._refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Availability summary refresh failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
@@ -1,18 +1,76 @@
 from contextlib import asynccontextmanager
+from typing import Any, Dict
+from uuid import uuid4
 
 from config import settings
+from db.instrumentation import instrument_engine
+from db.pool import InstrumentedAsyncQueuePool
+from db.routing import ReplicaSet, RoutingSession
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL).replace(
-    "postgresql", "postgresql+asyncpg", 1
-)
+def async_url(url) -> str:
+    return str(url).replace("postgresql", "postgresql+asyncpg", 1)
+
+
+SQLALCHEMY_DATABASE_URL = async_url(settings.DATABASE_URL)
+
+
+def build_engine_options(pool_name: str) -> Dict[str, Any]:
+    connect_args: Dict[str, Any] = {}
+    statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False, future=True)
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer in transaction mode hands each transaction to a different
+        # server connection, so asyncpg's named prepared statements cannot be
+        # cached or reused. Startup parameters are also rejected, so the
+        # statement timeout is enforced client-side instead.
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+        if statement_timeout_ms:
+            connect_args["command_timeout"] = statement_timeout_ms / 1000
+    elif statement_timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+
+    return {
+        "echo": False,
+        "future": True,
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_logging_name": pool_name,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, **build_engine_options("primary"))
+instrument_engine(engine)
+
+replicas = ReplicaSet(
+    [
+        create_async_engine(async_url(url), **build_engine_options(f"replica_{i}"))
+        for i, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ],
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval_seconds=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
+for replica in replicas.replicas:
+    instrument_engine(replica.engine)
 
 SessionLocal = sessionmaker(
-    engine, class_=AsyncSession, autocommit=False, autoflush=False
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replicas,
+    autocommit=False,
+    autoflush=False,
 )
 
 Base = declarative_base()
@@ -0,0 +1,266 @@
+import asyncio
+import functools
+import inspect
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import settings
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+UNATTRIBUTED = "unattributed"
+# Execution option that keeps the instrumentation's own EXPLAINs out of the numbers
+SKIP_INSTRUMENTATION = "skip_instrumentation"
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "VALUES")
+# Each distinct slow statement is explained at most this often
+EXPLAIN_INTERVAL_SECONDS = 60.0
+MAX_EXPLAINED_STATEMENTS = 1000
+
+statement_duration_histogram = registry.histogram(
+    "db_statement_duration_seconds",
+    "Statement execution time by calling repository method",
+    ["method"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+slow_statements_counter = registry.counter(
+    "db_slow_statements_total", "Statements slower than DB_SLOW_QUERY_THRESHOLD_MS", ["method"]
+)
+request_statements_histogram = registry.histogram(
+    "db_request_statements", "Statements executed per HTTP request", ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+request_db_time_histogram = registry.histogram(
+    "db_request_duration_seconds", "Time spent executing statements per HTTP request", ["route"]
+)
+request_pool_wait_histogram = registry.histogram(
+    "db_request_pool_wait_seconds", "Time spent waiting for pool checkouts per HTTP request", ["route"]
+)
+
+
+@dataclass
+class MethodStats:
+    statements: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class RequestStats:
+    request_id: str
+    statements: int = 0
+    seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    methods: Dict[str, MethodStats] = field(default_factory=dict)
+
+    def record(self, method: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        stats = self.methods.setdefault(method, MethodStats())
+        stats.statements += 1
+        stats.seconds += seconds
+
+    def suspected_n_plus_one(self, threshold: int) -> Dict[str, MethodStats]:
+        """Methods that ran at least ``threshold`` statements in this request."""
+        return {method: stats for method, stats in self.methods.items() if stats.statements >= threshold}
+
+
+_request: ContextVar[Optional[RequestStats]] = ContextVar("db_request_stats", default=None)
+_method: ContextVar[Optional[str]] = ContextVar("db_repository_method", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    return _request.get()
+
+
+def current_request_id() -> Optional[str]:
+    stats = _request.get()
+    return stats.request_id if stats else None
+
+
+def current_method() -> str:
+    return _method.get() or UNATTRIBUTED
+
+
+@contextmanager
+def tracking_request(request_id: Optional[str] = None) -> Iterator[RequestStats]:
+    """Collect statement counts and timings for everything run in the block."""
+    stats = RequestStats(request_id=request_id or str(uuid.uuid4()))
+    token = _request.set(stats)
+    try:
+        yield stats
+    finally:
+        _request.reset(token)
+
+
+@contextmanager
+def repository_method(name: str) -> Iterator[None]:
+    """
+    Attribute statements in the block to ``name``. The outermost method
+    wins, so helpers called by a repository method are reported under the
+    method the caller actually invoked.
+    """
+    if _method.get() is not None:
+        yield
+        return
+    token = _method.set(name)
+    try:
+        yield
+    finally:
+        _method.reset(token)
+
+
+def instrument_repository(cls: type) -> None:
+    """
+    Wrap the public coroutine methods defined on ``cls`` so their statements
+    are tagged ``ClassName.method``, named after the instance's class so
+    inherited methods are told apart per repository. Async generators
+    (``stream``) are left alone; their statements run in the caller's
+    context between iterations.
+    """
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(member):
+            continue
+        setattr(cls, name, _tagged(name, member))
+
+
+def _tagged(name: str, method):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with repository_method(f"{type(self).__name__}.{name}"):
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+def record_pool_wait(seconds: float) -> None:
+    stats = _request.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+class StatementTimer:
+    """
+    Engine event listeners that time every statement, attribute it to the
+    current repository method and request, and log statements slower than
+    ``threshold_ms`` together with their plan.
+    """
+
+    def __init__(self, engine: AsyncEngine, threshold_ms: int, explain: bool):
+        self.engine = engine
+        self.threshold_seconds = threshold_ms / 1000 if threshold_ms else None
+        self.explain = explain
+        self._explained: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        context._instrumentation_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        start = getattr(context, "_instrumentation_start", None)
+        if start is None or context.execution_options.get(SKIP_INSTRUMENTATION):
+            return
+        seconds = time.perf_counter() - start
+        method = current_method()
+        statement_duration_histogram.observe(seconds, method=method)
+        stats = _request.get()
+        if stats is not None:
+            stats.record(method, seconds)
+        if self.threshold_seconds is not None and seconds >= self.threshold_seconds:
+            self.slow_statement(statement, parameters, seconds, method, stats, executemany)
+
+    def slow_statement(self, statement: str, parameters, seconds: float, method: str, stats: Optional[RequestStats], executemany: bool) -> None:
+        slow_statements_counter.inc(method=method)
+        request_id = stats.request_id if stats else None
+        logger.warning(f"Slow statement - Method: {method}, RequestID: {request_id}, Time: {seconds * 1000:.1f}ms, SQL: {statement}")
+        if self.explain and not executemany and self._should_explain(statement):
+            task = asyncio.get_running_loop().create_task(self.log_plan(statement, parameters, method, request_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _should_explain(self, statement: str) -> bool:
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return False
+        now = time.monotonic()
+        last = self._explained.get(statement)
+        if last is not None and now - last < EXPLAIN_INTERVAL_SECONDS:
+            return False
+        if len(self._explained) >= MAX_EXPLAINED_STATEMENTS:
+            self._explained.clear()
+        self._explained[statement] = now
+        return True
+
+    async def log_plan(self, statement: str, parameters, method: str, request_id: Optional[str]) -> None:
+        """
+        EXPLAIN (without ANALYZE, so nothing runs twice) on a connection of
+        its own, outside the request's transaction and off its critical path.
+        """
+        try:
+            async with self.engine.connect() as connection:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN {statement}", parameters,
+                    execution_options={SKIP_INSTRUMENTATION: True},
+                )
+                plan = "\n".join(row[0] for row in result)
+            logger.warning(f"Slow statement plan - Method: {method}, RequestID: {request_id}\n{plan}")
+        except Exception as e:
+            logger.error(f"Failed to explain slow statement - Method: {method}, Error: {e}")
+
+
+def instrument_engine(engine: AsyncEngine) -> StatementTimer:
+    timer = StatementTimer(engine, settings.DB_SLOW_QUERY_THRESHOLD_MS, settings.DB_SLOW_QUERY_EXPLAIN)
+    event.listen(engine.sync_engine, "before_cursor_execute", timer.before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", timer.after_cursor_execute)
+    return timer
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class SQLInstrumentationMiddleware:
+    """
+    ASGI middleware that gives every HTTP request an id and collects the
+    statements it runs, including those issued while a streaming body is
+    being sent. Requests that run at least ``n_plus_one_threshold``
+    statements from a single repository method are logged as likely N+1
+    patterns.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = 20):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with tracking_request() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.report(scope, stats)
+
+    def report(self, scope, stats: RequestStats) -> None:
+        route = _route_label(scope)
+        request_statements_histogram.observe(stats.statements, route=route)
+        request_db_time_histogram.observe(stats.seconds, route=route)
+        request_pool_wait_histogram.observe(stats.pool_wait_seconds, route=route)
+        if not stats.statements:
+            return
+
+        logger.info(f"SQL summary - RequestID: {stats.request_id}, Path: {scope['path']}, Statements: {stats.statements}, DB time: {stats.seconds * 1000:.1f}ms, Pool wait: {stats.pool_wait_seconds * 1000:.1f}ms")
+        suspects: List[str] = [
+            f"{method} x{method_stats.statements} ({method_stats.seconds * 1000:.1f}ms)"
+            for method, method_stats in stats.suspected_n_plus_one(self.n_plus_one_threshold).items()
+        ]
+        if suspects:
+            logger.warning(f"Possible N+1 - RequestID: {stats.request_id}, Path: {scope['path']}, Methods: {', '.join(suspects)}")
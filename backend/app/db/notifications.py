@@ -0,0 +1,111 @@
+import asyncio
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+from config import settings
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+NotificationHandler = Callable[[str], None]
+ConnectionHandler = Callable[[], None]
+
+listener_connected_gauge = registry.gauge(
+    "db_notification_listener_connected", "1 while the LISTEN connection is up"
+)
+notifications_counter = registry.counter(
+    "db_notifications_received_total", "Postgres notifications received", ["channel"]
+)
+
+
+class NotificationListener:
+    """
+    Holds one dedicated asyncpg connection that LISTENs on the subscribed
+    channels and dispatches payloads to in-process handlers. Reconnects with
+    backoff; because notifications sent while disconnected are lost, the
+    connect/disconnect hooks let caches drop anything they hold.
+    """
+
+    def __init__(self, dsn: str, reconnect_delay_seconds: float = 1.0, max_reconnect_delay_seconds: float = 30.0):
+        self.dsn = dsn
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self.max_reconnect_delay_seconds = max_reconnect_delay_seconds
+        self.connected = False
+        self._handlers: Dict[str, List[NotificationHandler]] = defaultdict(list)
+        self._on_connect: List[ConnectionHandler] = []
+        self._on_disconnect: List[ConnectionHandler] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str, handler: NotificationHandler) -> None:
+        self._handlers[channel].append(handler)
+
+    def on_connect(self, handler: ConnectionHandler) -> None:
+        self._on_connect.append(handler)
+
+    def on_disconnect(self, handler: ConnectionHandler) -> None:
+        self._on_disconnect.append(handler)
+
+    def start(self) -> None:
+        if self._task is None and self._handlers:
+            self._task = asyncio.create_task(self._run(), name="notification-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _dispatch(self, connection, pid, channel: str, payload: str) -> None:
+        notifications_counter.inc(channel=channel)
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"Notification handler failed - Channel: {channel}, Payload: {payload}, Error: {e}")
+
+    def _set_connected(self, connected: bool) -> None:
+        self.connected = connected
+        listener_connected_gauge.set(1 if connected else 0)
+        for handler in (self._on_connect if connected else self._on_disconnect):
+            handler()
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay_seconds
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                for channel in self._handlers:
+                    await connection.add_listener(channel, self._dispatch)
+
+                logger.info(f"Listening for notifications on: {', '.join(self._handlers)}")
+                self._set_connected(True)
+                delay = self.reconnect_delay_seconds
+                await closed.wait()
+                logger.warning("Notification listener connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification listener failed to connect: {e}")
+            finally:
+                if self.connected:
+                    self._set_connected(False)
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay_seconds)
+
+
+notification_listener = NotificationListener(
+    str(settings.NOTIFY_DATABASE_URL or settings.DATABASE_URL)
+)
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from config import settings
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+partitions_created_counter = registry.counter(
+    "db_partitions_created_total", "Monthly partitions created ahead of time", ["table"]
+)
+partitions_expired_counter = registry.counter(
+    "db_partitions_expired_total", "Monthly partitions detached (or dropped) by retention", ["table"]
+)
+default_partition_rows_gauge = registry.gauge(
+    "db_default_partition_rows", "Rows left in the DEFAULT partition after maintenance; should be 0", ["table"]
+)
+
+
+def retention_policy() -> Dict[str, Optional[int]]:
+    """Months of data kept per partitioned table; None keeps everything."""
+    return {
+        "messages": settings.MESSAGES_RETENTION_MONTHS,
+        "tool_calls": settings.TOOL_CALLS_RETENTION_MONTHS,
+    }
+
+
+async def ensure_partitions(connection: AsyncConnection, table: str, months_ahead: int) -> int:
+    created = await connection.scalar(
+        text("SELECT ensure_monthly_partitions(:table, (now() AT TIME ZONE 'UTC')::date, :months_ahead)"),
+        {"table": table, "months_ahead": months_ahead},
+    )
+    if created:
+        partitions_created_counter.inc(created, table=table)
+        logger.info(f"Created {created} partitions - Table: {table}")
+    return created
+
+
+async def expire_partitions(connection: AsyncConnection, table: str, keep_months: int, drop: bool) -> List[str]:
+    """
+    Detach every monthly partition that ends before the retention window,
+    and drop it unless it is being kept for archival. This replaces bulk
+    DELETEs: no dead tuples, no index bloat, no long-running transaction.
+    """
+    result = await connection.execute(
+        text("SELECT expire_monthly_partitions(:table, :keep_months, :drop)"),
+        {"table": table, "keep_months": keep_months, "drop": drop},
+    )
+    expired = list(result.scalars())
+    if expired:
+        partitions_expired_counter.inc(len(expired), table=table)
+        logger.info(f"{'Dropped' if drop else 'Detached'} expired partitions - Table: {table}, Partitions: {', '.join(expired)}")
+    return expired
+
+
+async def check_default_partition(connection: AsyncConnection, table: str) -> int:
+    """
+    Rows still in ``<table>_default`` once every month from the earliest
+    of them up to the look-ahead has its own partition, i.e. rows dated
+    past the look-ahead. Exported as a gauge and logged, since they are
+    not pruned or expired with the monthly partitions.
+    """
+    rows = await connection.scalar(text(f"SELECT count(*) FROM {table}_default"))
+    default_partition_rows_gauge.set(rows, table=table)
+    if rows:
+        logger.warning(f"Rows left in the default partition - Table: {table}, Rows: {rows}")
+    return rows
+
+
+async def run_maintenance(engine: AsyncEngine) -> None:
+    for table, keep_months in retention_policy().items():
+        async with engine.begin() as connection:
+            await ensure_partitions(connection, table, settings.PARTITION_MONTHS_AHEAD)
+            await check_default_partition(connection, table)
+        if keep_months is not None:
+            async with engine.begin() as connection:
+                await expire_partitions(connection, table, keep_months, settings.PARTITION_RETENTION_DROP)
+
+
+class PartitionMaintainer:
+    """
+    Periodically creates upcoming monthly partitions and applies retention.
+    Runs in every app worker; the database functions serialise on an
+    advisory lock, so concurrent runs are harmless.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval_seconds: float):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="partition-maintenance")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await run_maintenance(self.engine)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,77 @@
+import time
+import weakref
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.logging import get_logger
+from db.instrumentation import record_pool_wait
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+checkout_wait_histogram = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+checkout_timeout_counter = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after pool_timeout", ["pool"]
+)
+overflow_counter = registry.counter(
+    "db_pool_overflow_connections_total", "Connections opened beyond pool_size", ["pool"]
+)
+checked_out_gauge = registry.gauge(
+    "db_pool_checked_out_connections", "Connections currently checked out", ["pool"]
+)
+overflow_gauge = registry.gauge(
+    "db_pool_overflow_connections", "Overflow connections currently open", ["pool"]
+)
+size_gauge = registry.gauge("db_pool_size", "Configured pool size", ["pool"])
+
+_pools: "weakref.WeakSet[InstrumentedAsyncQueuePool]" = weakref.WeakSet()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records checkout waits, timeouts and overflow
+    events. The engine's ``pool_logging_name`` is used as the ``pool`` label.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _pools.add(self)
+
+    @property
+    def label(self) -> str:
+        return self.logging_name or "default"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            checkout_timeout_counter.inc(pool=self.label)
+            logger.error(f"Connection pool exhausted - Pool: {self.label}, {self.status()}")
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            checkout_wait_histogram.observe(wait, pool=self.label)
+            record_pool_wait(wait)
+
+    def _inc_overflow(self) -> bool:
+        incremented = super()._inc_overflow()
+        if incremented and self._overflow > 0:
+            overflow_counter.inc(pool=self.label)
+        return incremented
+
+
+def _collect_pool_gauges() -> None:
+    for pool in list(_pools):
+        checked_out_gauge.set(pool.checkedout(), pool=pool.label)
+        overflow_gauge.set(max(pool.overflow(), 0), pool=pool.label)
+        size_gauge.set(pool.size(), pool=pool.label)
+
+
+registry.add_collector(_collect_pool_gauges)
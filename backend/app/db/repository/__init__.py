@@ -3,11 +3,13 @@ from .community import CommunityRepository
 from .unit import UnitRepository
 from .pet_policy import PetPolicyRepository
 from .unit_pricing import UnitPricingRepository
+from .availability_summary import AvailabilitySummaryRepository
 from .tour_slot import TourSlotRepository
 from .lead import LeadRepository
 from .conversation import ConversationRepository
 from .message import MessageRepository
 from .tool_call import ToolCallRepository
+from .tool_call_payload import ToolCallPayloadRepository
 
 __all__ = [
     "BaseRepository",
@@ -15,9 +17,11 @@ __all__ = [
     "UnitRepository", 
     "PetPolicyRepository",
     "UnitPricingRepository",
+    "AvailabilitySummaryRepository",
     "TourSlotRepository",
     "LeadRepository",
     "ConversationRepository",
     "MessageRepository",
     "ToolCallRepository",
+    "ToolCallPayloadRepository",
 ]
\ No newline at end of file
@@ -0,0 +1,35 @@
+from typing import Dict, List
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from models import UnitAvailabilitySummary
+from .base import BaseRepository
+
+
+class AvailabilitySummaryRepository(BaseRepository[UnitAvailabilitySummary]):
+    """
+    Read side of unit_availability_summary, which db.availability_summary
+    recomputes shortly after units or their pricing change. Rows are only
+    written by that refresher.
+    """
+
+    def __init__(self):
+        super().__init__(UnitAvailabilitySummary)
+
+    async def get_by_community(self, db: AsyncSession, community_id: str) -> List[UnitAvailabilitySummary]:
+        result = await db.execute(
+            select(UnitAvailabilitySummary)
+            .where(UnitAvailabilitySummary.community_id == community_id)
+            .order_by(UnitAvailabilitySummary.bedrooms)
+        )
+        return result.scalars().all()
+
+    async def get_available_counts(self, db: AsyncSession) -> Dict[str, int]:
+        """Available units per community; communities with none are absent."""
+        result = await db.execute(
+            select(
+                UnitAvailabilitySummary.community_id,
+                func.sum(UnitAvailabilitySummary.available_units),
+            ).group_by(UnitAvailabilitySummary.community_id)
+        )
+        return {community_id: int(count) for community_id, count in result.all()}
@@ -1,17 +1,63 @@
+import base64
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
+from typing import Any, AsyncIterator, Dict, Generic, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+from sqlalchemy import ColumnElement, Float, Row, Table, column, delete, func, insert, tuple_, union_all, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from sqlmodel import SQLModel
+from core.ids import nanoids
+from db.instrumentation import instrument_repository
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
 
+# asyncpg (and the Postgres wire protocol) cap a statement at 32767 bind parameters
+MAX_BIND_PARAMS = 32767
+
+
+def _group_by_keys(rows: Sequence[Dict[str, Any]]) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    return groups
+
+
+def _chunked(rows: List[Dict[str, Any]], params_per_row: int, chunk_size: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+    size = max(1, MAX_BIND_PARAMS // max(1, params_per_row))
+    if chunk_size:
+        size = min(size, chunk_size)
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), id
+    except ValueError as e:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+
+
+@dataclass
+class Page(Generic[ModelType]):
+    items: List[ModelType]
+    next_cursor: Optional[str]
+
 
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_repository(cls)
+
     async def get_by_id(self, db: AsyncSession, id: str) -> Optional[ModelType]:
         result = await db.execute(select(self.model).where(self.model.id == id))
         return result.scalar_one_or_none()
@@ -20,32 +66,230 @@ class BaseRepository(Generic[ModelType]):
         result = await db.execute(select(self.model).offset(skip).limit(limit))
         return result.scalars().all()
 
+    def _keyset_query(self, where: Sequence[ColumnElement[bool]], descending: bool):
+        order = (self.model.created_at.desc(), self.model.id.desc()) if descending else (self.model.created_at, self.model.id)
+        return select(self.model).where(*where).order_by(*order)
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *where: ColumnElement[bool],
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        descending: bool = True,
+    ) -> Page[ModelType]:
+        """
+        Keyset pagination on (created_at, id). Pass the previous page's
+        ``next_cursor`` to continue; it is None on the last page. Cost is
+        independent of how deep the page is, unlike get_all's OFFSET.
+        """
+        query = self._keyset_query(where, descending)
+        if cursor is not None:
+            key = tuple_(self.model.created_at, self.model.id)
+            after = tuple_(*decode_cursor(cursor))
+            query = query.where(key < after if descending else key > after)
+
+        result = await db.execute(query.limit(limit + 1))
+        items = result.scalars().all()
+        if len(items) <= limit:
+            return Page(items=items, next_cursor=None)
+        items = items[:limit]
+        return Page(items=items, next_cursor=encode_cursor(items[-1].created_at, items[-1].id))
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        *where: ColumnElement[bool],
+        descending: bool = True,
+        batch_size: int = 500,
+    ) -> AsyncIterator[ModelType]:
+        """
+        Iterate every matching row through a server-side cursor, holding at
+        most ``batch_size`` rows in memory at a time. Must run inside a
+        transaction; the session stays busy until iteration finishes.
+        """
+        query = self._keyset_query(where, descending).execution_options(yield_per=batch_size)
+        result = await db.stream_scalars(query)
+        try:
+            async for item in result:
+                yield item
+        finally:
+            await result.close()
+
     async def create(self, db: AsyncSession, obj_in: Dict[str, Any]) -> ModelType:
         db_obj = self.model(**obj_in)
         db.add(db_obj)
         await db.flush()
         return db_obj
 
-    async def update(self, db: AsyncSession, id: str, obj_in: Dict[str, Any]) -> Optional[ModelType]:
-        db_obj = await self.get_by_id(db, id)
-        if not db_obj:
-            return None
-        
-        for field, value in obj_in.items():
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, value)
-        
-        await db.flush()
-        return db_obj
+    @property
+    def table(self) -> Table:
+        return self.model.__table__
 
-    async def delete(self, db: AsyncSession, id: str) -> bool:
-        db_obj = await self.get_by_id(db, id)
-        if not db_obj:
-            return False
-        
-        await db.delete(db_obj)
-        await db.flush()
-        return True
+    async def create_many(
+        self,
+        db: AsyncSession,
+        rows: Sequence[Dict[str, Any]],
+        returning: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        Multi-row INSERT through Core, bypassing ORM object construction and
+        the identity map. Rows are grouped by key set and chunked to stay
+        under the bind parameter limit. Returns the inserted rows when
+        ``returning`` is set. Rows without an id get one generated here, so
+        every row is complete before it is sent.
+        """
+        rows = [row if "id" in row else {"id": id, **row} for row, id in zip(rows, nanoids(len(rows)))]
+        inserted: List[Row] = []
+        for keys, group in _group_by_keys(rows).items():
+            for chunk in _chunked(group, len(keys), chunk_size):
+                stmt = insert(self.table).values(chunk)
+                if returning:
+                    stmt = stmt.returning(*self.table.c)
+                result = await db.execute(stmt)
+                if returning:
+                    inserted.extend(result.all())
+        return inserted
+
+    async def update_many(
+        self,
+        db: AsyncSession,
+        rows: Sequence[Dict[str, Any]],
+        returning: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        Set-based UPDATE ... FROM (VALUES ...) keyed on ``id``; every row must
+        carry its id. ORM instances already loaded in the session are not
+        refreshed.
+        """
+        updated: List[Row] = []
+        for keys, group in _group_by_keys(rows).items():
+            if "id" not in keys:
+                raise ValueError("update_many rows must include 'id'")
+            changed = [key for key in keys if key != "id"]
+            if not changed:
+                continue
+            for chunk in _chunked(group, len(keys), chunk_size):
+                data = values(
+                    *(column(key, self.table.c[key].type) for key in keys), name="data"
+                ).data([tuple(row[key] for key in keys) for row in chunk])
+                stmt = (
+                    update(self.table)
+                    .where(self.table.c.id == data.c.id)
+                    .values({key: data.c[key] for key in changed})
+                )
+                if returning:
+                    stmt = stmt.returning(*self.table.c)
+                result = await db.execute(stmt)
+                if returning:
+                    updated.extend(result.all())
+        return updated
+
+    async def upsert_many(
+        self,
+        db: AsyncSession,
+        rows: Sequence[Dict[str, Any]],
+        conflict_columns: Sequence[Any] = ("id",),
+        update_columns: Optional[Sequence[str]] = None,
+        returning: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        Multi-row INSERT ... ON CONFLICT. Conflicting rows have
+        ``update_columns`` (default: every supplied non-conflict column)
+        overwritten from EXCLUDED, or are skipped when there is nothing to
+        update. Skipped rows are not returned.
+        """
+        upserted: List[Row] = []
+        conflict_keys = {c for c in conflict_columns if isinstance(c, str)}
+        for keys, group in _group_by_keys(rows).items():
+            columns = update_columns if update_columns is not None else [key for key in keys if key not in conflict_keys]
+            for chunk in _chunked(group, len(keys), chunk_size):
+                stmt = pg_insert(self.table).values(chunk)
+                if columns:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=list(conflict_columns),
+                        set_={key: stmt.excluded[key] for key in columns},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+                if returning:
+                    stmt = stmt.returning(*self.table.c)
+                result = await db.execute(stmt)
+                if returning:
+                    upserted.extend(result.all())
+        return upserted
+
+    async def update(self, db: AsyncSession, id: str, obj_in: Dict[str, Any], *where: ColumnElement[bool]) -> Optional[ModelType]:
+        """
+        Single UPDATE ... RETURNING, no prior SELECT. Extra ``where``
+        predicates make the update conditional (optimistic concurrency,
+        guarded counters); None means no row matched. Values may be SQL
+        expressions, evaluated against the row's current values. A loaded
+        instance in the session is refreshed from the returned row.
+        """
+        values_in = {field: value for field, value in obj_in.items() if hasattr(self.model, field)}
+        if not values_in:
+            return await self.get_by_id(db, id)
+
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id, *where)
+            .values(values_in)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def delete(self, db: AsyncSession, id: str, *where: ColumnElement[bool]) -> bool:
+        """Single DELETE ... RETURNING; ``where`` predicates make it conditional."""
+        stmt = (
+            delete(self.model)
+            .where(self.model.id == id, *where)
+            .returning(self.model.id)
+            .execution_options(synchronize_session="fetch")
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def trigram_search(self, db: AsyncSession, query: str, *columns: Any, limit: int = 20) -> List[ModelType]:
+        """
+        Rows where any of ``columns`` contains ``query`` (case-insensitive)
+        or is trigram-similar to it, nearest first.
+
+        Each column and predicate is its own branch, ordered by trigram
+        distance (``<->``) and capped at ``limit``. That is a KNN scan of
+        the column's gist_trgm_ops index, which stops after ``limit`` rows
+        however many rows match. The few candidates are then merged and
+        ranked by their best distance.
+        """
+        branches = []
+        for column in columns:
+            distance = column.op("<->", return_type=Float)(query)
+            for predicate in (column.icontains(query, autoescape=True), column.op("%")(query)):
+                branches.append(
+                    select(self.model.id.label("id"), distance.label("distance"))
+                    .where(predicate)
+                    .order_by(distance)
+                    .limit(limit)
+                    .subquery()
+                )
+        candidates = union_all(*(select(branch.c.id, branch.c.distance) for branch in branches)).subquery("candidates")
+        ranked = (
+            select(candidates.c.id, func.min(candidates.c.distance).label("distance"))
+            .group_by(candidates.c.id)
+            .subquery("ranked")
+        )
+        result = await db.execute(
+            select(self.model)
+            .join(ranked, ranked.c.id == self.model.id)
+            .order_by(ranked.c.distance, self.model.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
 
     async def get_by_field(self, db: AsyncSession, field: str, value: Any) -> Optional[ModelType]:
         result = await db.execute(select(self.model).where(getattr(self.model, field) == value))
@@ -53,4 +297,7 @@ class BaseRepository(Generic[ModelType]):
 
     async def get_many_by_field(self, db: AsyncSession, field: str, value: Any) -> List[ModelType]:
         result = await db.execute(select(self.model).where(getattr(self.model, field) == value))
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+
+instrument_repository(BaseRepository)
@@ -34,8 +34,5 @@ class CommunityRepository(BaseRepository[Community]):
     async def get_by_name(self, db: AsyncSession, name: str) -> Optional[Community]:
         return await self.get_by_field(db, "name", name)
 
-    async def search_by_address(self, db: AsyncSession, address_query: str) -> List[Community]:
-        result = await db.execute(
-            select(Community).where(Community.address.ilike(f"%{address_query}%"))
-        )
-        return result.scalars().all()
\ No newline at end of file
+    async def search_by_address(self, db: AsyncSession, address_query: str, limit: int = 20) -> List[Community]:
+        return await self.trigram_search(db, address_query, Community.address, limit=limit)
\ No newline at end of file
@@ -1,10 +1,12 @@
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
+from sqlalchemy import ColumnElement, Row, func, insert, literal
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from models import Lead, Conversation
-from .base import BaseRepository
+from .base import BaseRepository, Page
 
 
 class LeadRepository(BaseRepository[Lead]):
@@ -12,24 +14,44 @@ class LeadRepository(BaseRepository[Lead]):
         super().__init__(Lead)
 
     async def get_by_email(self, db: AsyncSession, email: str) -> Optional[Lead]:
-        return await self.get_by_field(db, "email", email)
+        result = await db.execute(select(Lead).where(func.lower(Lead.email) == email.lower()))
+        return result.scalar_one_or_none()
+
+    def _upsert_by_email(self, lead_data: Dict[str, Any]) -> Insert:
+        stmt = pg_insert(Lead).values(**lead_data)
+        update_data = {k: stmt.excluded[k] for k in lead_data if k != "email"}
+        # DO UPDATE (rather than DO NOTHING) so RETURNING yields the existing row too
+        return stmt.on_conflict_do_update(
+            index_elements=[func.lower(Lead.email)],
+            set_=update_data or {"email": Lead.email},
+        )
 
     async def create_or_get_by_email(self, db: AsyncSession, lead_data: Dict[str, Any]) -> Lead:
-        existing_lead = await self.get_by_email(db, lead_data["email"])
-        if existing_lead:
-            update_data = {k: v for k, v in lead_data.items() if k != "email"}
-            if update_data:
-                for field, value in update_data.items():
-                    if hasattr(existing_lead, field):
-                        setattr(existing_lead, field, value)
-                db.add(existing_lead)
-                await db.flush()
-            return existing_lead
-        else:
-            lead = Lead(**lead_data)
-            db.add(lead)
-            await db.flush()
-            return lead
+        stmt = self._upsert_by_email(lead_data).returning(Lead)
+        result = await db.execute(stmt, execution_options={"populate_existing": True})
+        return result.scalar_one()
+
+    async def create_with_conversation(self, db: AsyncSession, lead_data: Dict[str, Any], community_id: str) -> Row:
+        """
+        Upsert the lead by case-insensitive email and open a conversation for it
+        in a single statement. Returns a row of (lead_id, name, email, conversation_id).
+        """
+        lead = self._upsert_by_email(lead_data).returning(Lead.id, Lead.name, Lead.email).cte("upserted_lead")
+        conversation = (
+            insert(Conversation)
+            .from_select(["lead_id", "community_id"], select(lead.c.id, literal(community_id)))
+            .returning(Conversation.id, Conversation.lead_id)
+            .cte("new_conversation")
+        )
+        result = await db.execute(
+            select(
+                lead.c.id.label("lead_id"),
+                lead.c.name,
+                lead.c.email,
+                conversation.c.id.label("conversation_id"),
+            ).join_from(lead, conversation, conversation.c.lead_id == lead.c.id)
+        )
+        return result.one()
 
     async def get_with_conversations(self, db: AsyncSession, lead_id: str) -> Optional[Lead]:
         result = await db.execute(
@@ -39,20 +61,36 @@ class LeadRepository(BaseRepository[Lead]):
         )
         return result.scalar_one_or_none()
 
-    async def search_by_name(self, db: AsyncSession, name_query: str) -> List[Lead]:
-        result = await db.execute(
-            select(Lead).where(Lead.name.ilike(f"%{name_query}%"))
-        )
-        return result.scalars().all()
+    async def search_by_name(self, db: AsyncSession, name_query: str, limit: int = 20) -> List[Lead]:
+        return await self.trigram_search(db, name_query, Lead.name, limit=limit)
 
-    async def get_by_preferences(self, db: AsyncSession, bedrooms: Optional[int] = None, move_in_after: Optional[datetime] = None) -> List[Lead]:
-        query = select(Lead)
-        
+    async def search(self, db: AsyncSession, query: str, limit: int = 20) -> List[Lead]:
+        """Leads whose name or email matches ``query``, best match first."""
+        return await self.trigram_search(db, query, Lead.name, Lead.email, limit=limit)
+
+    def _preference_filters(self, bedrooms: Optional[int], move_in_after: Optional[datetime]) -> List[ColumnElement[bool]]:
+        filters = []
         if bedrooms is not None:
-            query = query.where(Lead.preferred_bedrooms == bedrooms)
-        
+            filters.append(Lead.preferred_bedrooms == bedrooms)
         if move_in_after is not None:
-            query = query.where(Lead.preferred_move_in >= move_in_after)
-        
-        result = await db.execute(query)
-        return result.scalars().all()
\ No newline at end of file
+            filters.append(Lead.preferred_move_in >= move_in_after)
+        return filters
+
+    async def get_by_preferences(
+        self,
+        db: AsyncSession,
+        bedrooms: Optional[int] = None,
+        move_in_after: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> Page[Lead]:
+        return await self.get_page(db, *self._preference_filters(bedrooms, move_in_after), cursor=cursor, limit=limit)
+
+    def stream_by_preferences(
+        self,
+        db: AsyncSession,
+        bedrooms: Optional[int] = None,
+        move_in_after: Optional[datetime] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Lead]:
+        return self.stream(db, *self._preference_filters(bedrooms, move_in_after), batch_size=batch_size)
\ No newline at end of file
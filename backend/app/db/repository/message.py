@@ -1,21 +1,29 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional
+from sqlalchemy import func, literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from models import Message, ActionType
+from models import MESSAGE_SEARCH_DOCUMENT, Message, ActionType
 from .base import BaseRepository
 
+# Clock skew allowance between the app (which stamps messages) and the
+# database (which stamps conversations); far below the monthly partition size
+PARTITION_BOUND_SLACK = timedelta(hours=1)
+
 
 class MessageRepository(BaseRepository[Message]):
     def __init__(self):
         super().__init__(Message)
 
-    async def get_by_conversation_id(self, db: AsyncSession, conversation_id: str) -> List[Message]:
-        result = await db.execute(
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.asc())
-        )
+    async def get_by_conversation_id(self, db: AsyncSession, conversation_id: str, since: Optional[datetime] = None) -> List[Message]:
+        """
+        ``since`` (normally the conversation's created_at) bounds created_at
+        so only partitions from that month on are scanned.
+        """
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if since is not None:
+            query = query.where(Message.created_at >= since - PARTITION_BOUND_SLACK)
+        result = await db.execute(query.order_by(Message.created_at.asc()))
         return result.scalars().all()
 
     async def get_by_request_id(self, db: AsyncSession, request_id: str) -> Optional[Message]:
@@ -46,4 +54,29 @@ class MessageRepository(BaseRepository[Message]):
                 Message.tools_called.is_not(None)
             )
         )
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+    async def search_text(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 20,
+        conversation_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> List[Message]:
+        """
+        Full-text search over message and reply text (web search syntax:
+        quoted phrases, ``or``, ``-term``), best match first. Served by the
+        ix_messages_search GIN index; ``since`` also prunes old partitions.
+        """
+        document = literal_column(MESSAGE_SEARCH_DOCUMENT)
+        ts_query = func.websearch_to_tsquery(literal_column("'english'"), query)
+        stmt = select(Message).where(document.op("@@")(ts_query))
+        if conversation_id is not None:
+            stmt = stmt.where(Message.conversation_id == conversation_id)
+        if since is not None:
+            stmt = stmt.where(Message.created_at >= since)
+        result = await db.execute(
+            stmt.order_by(func.ts_rank_cd(document, ts_query).desc(), Message.created_at.desc()).limit(limit)
+        )
+        return result.scalars().all()
@@ -1,29 +1,100 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from sqlalchemy import ColumnElement, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm.attributes import set_committed_value
 from models import ToolCall
-from .base import BaseRepository
+from .base import BaseRepository, Page
+from .message import PARTITION_BOUND_SLACK
+from .tool_call_payload import ToolCallPayloadRepository, encode_payload
 
 
 class ToolCallRepository(BaseRepository[ToolCall]):
+    """
+    Tool call arguments and responses live in tool_call_payloads; every read
+    method here rehydrates them onto ``arguments`` / ``response``.
+    """
+
     def __init__(self):
         super().__init__(ToolCall)
+        self.payload_repo = ToolCallPayloadRepository()
 
-    async def get_by_conversation_id(self, db: AsyncSession, conversation_id: str) -> List[ToolCall]:
-        result = await db.execute(
-            select(ToolCall)
-            .where(ToolCall.conversation_id == conversation_id)
-            .order_by(ToolCall.created_at.desc())
-        )
-        return result.scalars().all()
+    async def log(self, db: AsyncSession, tool_call_data: Dict[str, Any]) -> None:
+        await self.log_many(db, [tool_call_data])
 
-    async def get_by_function_name(self, db: AsyncSession, function_name: str) -> List[ToolCall]:
-        result = await db.execute(
-            select(ToolCall)
-            .where(ToolCall.function_name == function_name)
-            .order_by(ToolCall.created_at.desc())
+    async def log_many(self, db: AsyncSession, tool_calls: Sequence[Dict[str, Any]]) -> None:
+        """
+        Insert tool calls and any payloads not stored yet in a single
+        multi-row statement (the payload insert runs as a data-modifying
+        CTE). Every dict must have the same keys.
+        """
+        rows = []
+        payloads = []
+        for tool_call_data in tool_calls:
+            tool_call_data = dict(tool_call_data)
+            arguments = encode_payload(tool_call_data.pop("arguments"))
+            response = encode_payload(tool_call_data.pop("response"))
+            payloads += [arguments, response]
+            rows.append({**tool_call_data, "arguments_hash": arguments.hash, "response_hash": response.hash})
+        if not rows:
+            return
+        await db.execute(
+            insert(ToolCall)
+            .values(rows)
+            .add_cte(self.payload_repo.insert_statement(payloads).cte("new_payloads"))
         )
-        return result.scalars().all()
+
+    async def rehydrate(self, db: AsyncSession, tool_calls: Sequence[ToolCall]) -> Sequence[ToolCall]:
+        hashes = [
+            payload_hash
+            for tool_call in tool_calls
+            for payload_hash in (tool_call.arguments_hash, tool_call.response_hash)
+            if payload_hash is not None
+        ]
+        payloads = await self.payload_repo.get_many(db, hashes)
+        for tool_call in tool_calls:
+            # Committed values, so the payloads are never flushed back inline
+            if tool_call.arguments_hash is not None:
+                set_committed_value(tool_call, "arguments", payloads.get(tool_call.arguments_hash))
+            if tool_call.response_hash is not None:
+                set_committed_value(tool_call, "response", payloads.get(tool_call.response_hash))
+        return tool_calls
+
+    async def get_by_id(self, db: AsyncSession, id: str) -> Optional[ToolCall]:
+        tool_call = await super().get_by_id(db, id)
+        if tool_call is not None:
+            await self.rehydrate(db, [tool_call])
+        return tool_call
+
+    async def get_page(self, db: AsyncSession, *where: ColumnElement[bool], **kwargs) -> Page[ToolCall]:
+        page = await super().get_page(db, *where, **kwargs)
+        await self.rehydrate(db, page.items)
+        return page
+
+    async def stream(self, db: AsyncSession, *where: ColumnElement[bool], batch_size: int = 500, **kwargs) -> AsyncIterator[ToolCall]:
+        batch: List[ToolCall] = []
+        async for tool_call in super().stream(db, *where, batch_size=batch_size, **kwargs):
+            batch.append(tool_call)
+            if len(batch) >= batch_size:
+                for item in await self.rehydrate(db, batch):
+                    yield item
+                batch = []
+        for item in await self.rehydrate(db, batch):
+            yield item
+
+    async def get_by_conversation_id(self, db: AsyncSession, conversation_id: str, since: Optional[datetime] = None) -> List[ToolCall]:
+        query = select(ToolCall).where(ToolCall.conversation_id == conversation_id)
+        if since is not None:
+            query = query.where(ToolCall.created_at >= since - PARTITION_BOUND_SLACK)
+        result = await db.execute(query.order_by(ToolCall.created_at.desc()))
+        return await self.rehydrate(db, result.scalars().all())
+
+    async def get_by_function_name(self, db: AsyncSession, function_name: str, cursor: Optional[str] = None, limit: int = 100) -> Page[ToolCall]:
+        return await self.get_page(db, ToolCall.function_name == function_name, cursor=cursor, limit=limit)
+
+    def stream_by_function_name(self, db: AsyncSession, function_name: str, batch_size: int = 500) -> AsyncIterator[ToolCall]:
+        return self.stream(db, ToolCall.function_name == function_name, batch_size=batch_size)
 
     async def get_by_request_id(self, db: AsyncSession, request_id: str) -> List[ToolCall]:
         result = await db.execute(
@@ -31,12 +102,10 @@ class ToolCallRepository(BaseRepository[ToolCall]):
             .where(ToolCall.request_id == request_id)
             .order_by(ToolCall.created_at.asc())
         )
-        return result.scalars().all()
+        return await self.rehydrate(db, result.scalars().all())
 
-    async def get_failed_calls(self, db: AsyncSession) -> List[ToolCall]:
-        result = await db.execute(
-            select(ToolCall)
-            .where(ToolCall.success == False)
-            .order_by(ToolCall.created_at.desc())
-        )
-        return result.scalars().all()
\ No newline at end of file
+    async def get_failed_calls(self, db: AsyncSession, cursor: Optional[str] = None, limit: int = 100) -> Page[ToolCall]:
+        return await self.get_page(db, ToolCall.success == False, cursor=cursor, limit=limit)
+
+    def stream_failed_calls(self, db: AsyncSession, batch_size: int = 500) -> AsyncIterator[ToolCall]:
+        return self.stream(db, ToolCall.success == False, batch_size=batch_size)
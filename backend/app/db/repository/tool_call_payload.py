@@ -0,0 +1,71 @@
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Iterable, List, NamedTuple
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.serialization import canonical_json
+from models import ToolCallPayload
+from .base import BaseRepository
+
+IDENTITY = "identity"
+ZLIB = "zlib"
+
+# Below this, zlib's header and checksum cost more than it saves
+COMPRESSION_THRESHOLD_BYTES = 128
+
+
+class EncodedPayload(NamedTuple):
+    hash: bytes
+    encoding: str
+    data: bytes
+    size_bytes: int
+
+
+def encode_payload(value: Any) -> EncodedPayload:
+    raw = canonical_json(value).encode()
+    digest = hashlib.sha256(raw).digest()
+    if len(raw) >= COMPRESSION_THRESHOLD_BYTES:
+        return EncodedPayload(digest, ZLIB, zlib.compress(raw, 6), len(raw))
+    return EncodedPayload(digest, IDENTITY, raw, len(raw))
+
+
+def decode_payload(encoding: str, data: bytes) -> Any:
+    if encoding == ZLIB:
+        data = zlib.decompress(data)
+    elif encoding != IDENTITY:
+        raise ValueError(f"Unknown payload encoding: {encoding}")
+    return json.loads(data)
+
+
+class ToolCallPayloadRepository(BaseRepository[ToolCallPayload]):
+    """
+    Content-addressed store for tool call arguments and responses: each
+    distinct payload is kept once, keyed by the sha256 of its canonical
+    JSON, and compressed when that pays off. Rows are immutable.
+    """
+
+    def __init__(self):
+        super().__init__(ToolCallPayload)
+
+    def insert_statement(self, payloads: Iterable[EncodedPayload]) -> Insert:
+        rows = {payload.hash: payload._asdict() for payload in payloads}
+        return pg_insert(ToolCallPayload).values(list(rows.values())).on_conflict_do_nothing(
+            index_elements=["hash"]
+        )
+
+    async def store_many(self, db: AsyncSession, payloads: Iterable[EncodedPayload]) -> None:
+        payloads = list(payloads)
+        if payloads:
+            await db.execute(self.insert_statement(payloads))
+
+    async def get_many(self, db: AsyncSession, hashes: Iterable[bytes]) -> Dict[bytes, Any]:
+        hashes = list(set(hashes))
+        if not hashes:
+            return {}
+        result = await db.execute(
+            select(ToolCallPayload.hash, ToolCallPayload.encoding, ToolCallPayload.data)
+            .where(ToolCallPayload.hash.in_(hashes))
+        )
+        return {row.hash: decode_payload(row.encoding, row.data) for row in result}
@@ -1,11 +1,20 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, Row, String, column, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models import TourSlot
 from .base import BaseRepository
 
 
+def _check_seats(seats_by_slot: Dict[str, int]) -> None:
+    # A zero or negative count would turn a hold into a release (or the
+    # reverse) while passing the capacity guard, so it is never a request
+    bad = {slot_id: seats for slot_id, seats in seats_by_slot.items() if seats < 1}
+    if bad:
+        raise ValueError(f"Seats must be at least 1: {bad}")
+
+
 class TourSlotRepository(BaseRepository[TourSlot]):
     def __init__(self):
         super().__init__(TourSlot)
@@ -25,27 +34,89 @@ class TourSlotRepository(BaseRepository[TourSlot]):
         )
         return result.scalars().all()
 
-    async def book_slot(self, db: AsyncSession, slot_id: str) -> Optional[TourSlot]:
-        slot = await self.get_by_id(db, slot_id)
-        if not slot or slot.current_bookings >= slot.max_capacity:
-            return None
-        
-        slot.current_bookings += 1
-        if slot.current_bookings >= slot.max_capacity:
-            slot.is_available = False
-        
-        await db.commit()
-        await db.refresh(slot)
-        return slot
-
-    async def cancel_booking(self, db: AsyncSession, slot_id: str) -> Optional[TourSlot]:
-        slot = await self.get_by_id(db, slot_id)
-        if not slot or slot.current_bookings <= 0:
-            return None
-        
-        slot.current_bookings -= 1
-        slot.is_available = True
-        
-        await db.commit()
-        await db.refresh(slot)
-        return slot
\ No newline at end of file
+    async def get_open_slot_rows(self, db: AsyncSession, community_id: str, since: datetime) -> List[Row]:
+        """
+        (id, start_time, end_time, available_spots) for every bookable slot
+        starting at or after ``since``, in start order.
+        """
+        result = await db.execute(
+            select(
+                TourSlot.id,
+                TourSlot.start_time,
+                TourSlot.end_time,
+                (TourSlot.max_capacity - TourSlot.current_bookings).label("available_spots"),
+            ).where(
+                TourSlot.community_id == community_id,
+                TourSlot.is_available == True,
+                TourSlot.start_time >= since,
+                TourSlot.current_bookings < TourSlot.max_capacity
+            ).order_by(TourSlot.start_time, TourSlot.id)
+        )
+        return result.all()
+
+    async def book_slot(self, db: AsyncSession, slot_id: str, seats: int = 1) -> Optional[TourSlot]:
+        """
+        Atomically take ``seats`` on a slot. The capacity check and increment
+        are one conditional UPDATE, so concurrent bookers cannot oversell;
+        None means the slot is missing or full. Transaction control is left
+        to the caller. Raises ValueError if ``seats`` is less than 1.
+        """
+        _check_seats({slot_id: seats})
+        return await self.update(
+            db,
+            slot_id,
+            {
+                "current_bookings": TourSlot.current_bookings + seats,
+                "is_available": TourSlot.current_bookings + seats < TourSlot.max_capacity,
+            },
+            TourSlot.current_bookings + seats <= TourSlot.max_capacity,
+        )
+
+    async def cancel_booking(self, db: AsyncSession, slot_id: str, seats: int = 1) -> Optional[TourSlot]:
+        _check_seats({slot_id: seats})
+        return await self.update(
+            db,
+            slot_id,
+            {"current_bookings": TourSlot.current_bookings - seats, "is_available": True},
+            TourSlot.current_bookings >= seats,
+        )
+
+    async def hold_slots(self, db: AsyncSession, seats_by_slot: Dict[str, int]) -> List[TourSlot]:
+        """
+        Book several slots in one statement. Each slot is taken only if all
+        of its requested seats fit; the slots that were booked are returned,
+        so callers wanting all-or-nothing can compare and roll back. Raises
+        ValueError, before touching the database, if any count is below 1.
+        """
+        return await self._adjust_bookings(db, seats_by_slot, hold=True)
+
+    async def cancel_bookings(self, db: AsyncSession, seats_by_slot: Dict[str, int]) -> List[TourSlot]:
+        return await self._adjust_bookings(db, seats_by_slot, hold=False)
+
+    async def _adjust_bookings(self, db: AsyncSession, seats_by_slot: Dict[str, int], hold: bool) -> List[TourSlot]:
+        _check_seats(seats_by_slot)
+        if not seats_by_slot:
+            return []
+
+        requested = values(
+            column("id", String), column("seats", Integer), name="requested"
+        ).data(list(seats_by_slot.items()))
+        if hold:
+            bookings = TourSlot.current_bookings + requested.c.seats
+            stmt = (
+                update(TourSlot)
+                .where(TourSlot.id == requested.c.id, bookings <= TourSlot.max_capacity)
+                .values(current_bookings=bookings, is_available=bookings < TourSlot.max_capacity)
+            )
+        else:
+            stmt = (
+                update(TourSlot)
+                .where(TourSlot.id == requested.c.id, TourSlot.current_bookings >= requested.c.seats)
+                .values(current_bookings=TourSlot.current_bookings - requested.c.seats, is_available=True)
+            )
+
+        result = await db.execute(
+            stmt.returning(TourSlot),
+            execution_options={"synchronize_session": False, "populate_existing": True},
+        )
+        return result.scalars().all()
@@ -1,10 +1,14 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import Row, func, true
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from models import Unit, UnitPricing
 from .base import BaseRepository
+from .unit_pricing import current_pricing_conditions
+
+UNIT_SEARCH_SORTS = ("rent", "square_feet", "available_date")
 
 
 class UnitRepository(BaseRepository[Unit]):
@@ -23,6 +27,121 @@ class UnitRepository(BaseRepository[Unit]):
         )
         return result.scalars().all()
 
+    async def get_available_units_by_bedrooms(self, db: AsyncSession, community_id: str, bedrooms: int) -> List[Row]:
+        """
+        Lightweight rows (no description, no ORM instances) for the availability tool.
+        """
+        result = await db.execute(
+            select(
+                Unit.id,
+                Unit.unit_number,
+                Unit.bedrooms,
+                Unit.bathrooms,
+                Unit.square_feet,
+                Unit.is_available,
+            ).where(
+                Unit.community_id == community_id,
+                Unit.is_available == True,
+                Unit.bedrooms == bedrooms
+            ).order_by(Unit.unit_number)
+        )
+        return result.all()
+
+    async def get_inventory_rows(self, db: AsyncSession, community_id: str) -> List[Row]:
+        result = await db.execute(
+            select(
+                Unit.id,
+                Unit.unit_number,
+                Unit.bedrooms,
+                Unit.bathrooms,
+                Unit.square_feet,
+                Unit.is_available,
+                Unit.base_rent,
+                Unit.available_date,
+            ).where(
+                Unit.community_id == community_id,
+                Unit.is_available == True
+            ).order_by(Unit.unit_number)
+        )
+        return result.all()
+
+    async def search_available_units(
+        self,
+        db: AsyncSession,
+        community_id: str,
+        move_in_date: datetime,
+        bedrooms: Optional[int] = None,
+        min_bathrooms: Optional[float] = None,
+        min_rent: Optional[int] = None,
+        max_rent: Optional[int] = None,
+        min_square_feet: Optional[int] = None,
+        max_square_feet: Optional[int] = None,
+        available_by: Optional[datetime] = None,
+        sort_by: str = "rent",
+        limit: int = 5,
+    ) -> Tuple[List[Row], int]:
+        """
+        The top ``limit`` available units matching every given criterion,
+        ranked by ``sort_by`` (rent ascending, square feet descending or
+        soonest available) with the other two as tie-breakers, and the total
+        number of matches. Rent is the current price for ``move_in_date``
+        (same rule as UnitPricingRepository.get_current_pricing), falling
+        back to the unit's base rent. Unit filters are served by
+        ix_units_search / ix_units_search_available_date and each candidate's
+        price by ix_unit_pricing_unit_id_move_in_date.
+        """
+        current_pricing = (
+            select(UnitPricing.rent, UnitPricing.special_offer)
+            .where(UnitPricing.unit_id == Unit.id, *current_pricing_conditions(move_in_date))
+            .order_by(UnitPricing.move_in_date.desc())
+            .limit(1)
+            .lateral("current_pricing")
+        )
+        rent = func.coalesce(current_pricing.c.rent, Unit.base_rent)
+
+        conditions = [Unit.community_id == community_id, Unit.is_available == True]
+        if bedrooms is not None:
+            conditions.append(Unit.bedrooms == bedrooms)
+        if min_bathrooms is not None:
+            conditions.append(Unit.bathrooms >= min_bathrooms)
+        if min_square_feet is not None:
+            conditions.append(Unit.square_feet >= min_square_feet)
+        if max_square_feet is not None:
+            conditions.append(Unit.square_feet <= max_square_feet)
+        if available_by is not None:
+            conditions.append((Unit.available_date.is_(None)) | (Unit.available_date <= available_by))
+        if min_rent is not None:
+            conditions.append(rent >= min_rent)
+        if max_rent is not None:
+            conditions.append(rent <= max_rent)
+
+        orderings = {
+            "rent": rent.asc(),
+            "square_feet": Unit.square_feet.desc().nulls_last(),
+            "available_date": Unit.available_date.asc().nulls_first(),
+        }
+        order_by = [orderings[sort_by]] + [orderings[key] for key in UNIT_SEARCH_SORTS if key != sort_by]
+
+        result = await db.execute(
+            select(
+                Unit.id,
+                Unit.unit_number,
+                Unit.bedrooms,
+                Unit.bathrooms,
+                Unit.square_feet,
+                Unit.available_date,
+                rent.label("rent"),
+                current_pricing.c.special_offer,
+                func.count().over().label("total_matches"),
+            )
+            .outerjoin(current_pricing, true())
+            .where(*conditions)
+            .order_by(*order_by, Unit.unit_number)
+            .limit(limit)
+        )
+        rows = result.all()
+        return rows, rows[0].total_matches if rows else 0
+
     async def get_by_bedrooms(self, db: AsyncSession, bedrooms: int, community_id: Optional[str] = None) -> List[Unit]:
         query = select(Unit).where(Unit.bedrooms == bedrooms)
         if community_id:
@@ -1,11 +1,25 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from models import UnitPricing
+from models import Unit, UnitPricing
 from .base import BaseRepository
 
 
+def current_pricing_conditions(move_in_date: datetime) -> tuple:
+    """
+    Price rows that apply to a move-in on ``move_in_date``: on or before
+    it, and in effect now. Callers pick the latest move-in date per unit.
+    """
+    now = datetime.now()
+    return (
+        UnitPricing.move_in_date <= move_in_date,
+        UnitPricing.effective_date <= now,
+        (UnitPricing.expires_date.is_(None)) | (UnitPricing.expires_date > now),
+    )
+
+
 class UnitPricingRepository(BaseRepository[UnitPricing]):
     def __init__(self):
         super().__init__(UnitPricing)
@@ -13,17 +27,79 @@ class UnitPricingRepository(BaseRepository[UnitPricing]):
     async def get_by_unit_id(self, db: AsyncSession, unit_id: str) -> List[UnitPricing]:
         return await self.get_many_by_field(db, "unit_id", unit_id)
 
-    async def get_current_pricing(self, db: AsyncSession, unit_id: str, move_in_date: datetime) -> Optional[UnitPricing]:
+    async def get_inventory_rows(self, db: AsyncSession, community_id: str) -> List[Row]:
         result = await db.execute(
-            select(UnitPricing).where(
-                UnitPricing.unit_id == unit_id,
-                UnitPricing.move_in_date <= move_in_date,
-                UnitPricing.effective_date <= datetime.now(),
-                (UnitPricing.expires_date.is_(None)) | (UnitPricing.expires_date > datetime.now())
-            ).order_by(UnitPricing.move_in_date.desc())
+            select(
+                UnitPricing.unit_id,
+                UnitPricing.rent,
+                UnitPricing.move_in_date,
+                UnitPricing.special_offer,
+                UnitPricing.special_discount,
+                UnitPricing.effective_date,
+                UnitPricing.expires_date,
+            )
+            .join(Unit, Unit.id == UnitPricing.unit_id)
+            .where(Unit.community_id == community_id)
+            .order_by(UnitPricing.unit_id, UnitPricing.move_in_date.desc())
+        )
+        return result.all()
+
+    def _current_pricing_query(self, community_id: str, move_in_date: datetime):
+        # Joined on the unit so a unit ID from another community never prices
+        return (
+            select(UnitPricing)
+            .join(Unit, Unit.id == UnitPricing.unit_id)
+            .where(Unit.community_id == community_id, *current_pricing_conditions(move_in_date))
+        )
+
+    async def get_current_pricing(self, db: AsyncSession, community_id: str, unit_id: str, move_in_date: datetime) -> Optional[UnitPricing]:
+        result = await db.execute(
+            self._current_pricing_query(community_id, move_in_date)
+            .where(UnitPricing.unit_id == unit_id)
+            .order_by(UnitPricing.move_in_date.desc())
+            .limit(1)
         )
         return result.scalar_one_or_none()
 
+    async def get_current_pricing_bulk(self, db: AsyncSession, community_id: str, unit_ids: Iterable[str], move_in_date: datetime) -> Dict[str, UnitPricing]:
+        """Current price for each of the community's units that has one, in a single DISTINCT ON query."""
+        unit_ids = list(dict.fromkeys(unit_ids))
+        if not unit_ids:
+            return {}
+        result = await db.execute(
+            self._current_pricing_query(community_id, move_in_date)
+            .where(UnitPricing.unit_id.in_(unit_ids))
+            .distinct(UnitPricing.unit_id)
+            .order_by(UnitPricing.unit_id, UnitPricing.move_in_date.desc())
+        )
+        return {pricing.unit_id: pricing for pricing in result.scalars().all()}
+
+    async def get_community_specials(self, db: AsyncSession, community_id: str) -> List[Row]:
+        """
+        Specials on the community's available units that are in effect now
+        or start later, with the unit they apply to.
+        """
+        now = datetime.now()
+        result = await db.execute(
+            select(
+                UnitPricing.special_offer,
+                UnitPricing.special_discount,
+                UnitPricing.effective_date,
+                UnitPricing.expires_date,
+                Unit.unit_number,
+                Unit.bedrooms,
+            )
+            .join(Unit, Unit.id == UnitPricing.unit_id)
+            .where(
+                Unit.community_id == community_id,
+                Unit.is_available == True,
+                UnitPricing.special_offer.is_not(None),
+                (UnitPricing.expires_date.is_(None)) | (UnitPricing.expires_date > now)
+            )
+            .order_by(Unit.bedrooms, Unit.unit_number)
+        )
+        return result.all()
+
     async def get_active_specials(self, db: AsyncSession, unit_id: str) -> List[UnitPricing]:
         current_time = datetime.now()
         result = await db.execute(
@@ -0,0 +1,192 @@
+import asyncio
+import itertools
+import math
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select, TableClause, visitors
+from sqlalchemy.sql.dml import UpdateBase
+
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+WRITTEN_TABLES = "routing_written_tables"
+PRIMARY_ONLY = "routing_primary_only"
+
+# Zero when the replica has replayed everything it has received; otherwise
+# the age of the last replayed transaction.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+replica_lag_gauge = registry.gauge(
+    "db_replica_lag_seconds", "Replication lag last measured on each replica", ["replica"]
+)
+replica_healthy_gauge = registry.gauge(
+    "db_replica_healthy", "1 while the replica is within the allowed lag", ["replica"]
+)
+routed_statements_counter = registry.counter(
+    "db_routed_statements_total", "Statements routed by target", ["target"]
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        # Unknown until the first successful lag check
+        self.lag_seconds = math.inf
+
+
+class ReplicaSet:
+    """
+    Read replicas plus a background task that measures their replication
+    lag. Only replicas within ``max_lag_seconds`` are handed out; with none
+    healthy, reads fall back to the primary.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], max_lag_seconds: float, check_interval_seconds: float):
+        self.replicas = [Replica(f"replica_{i}", engine) for i, engine in enumerate(engines)]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._round_robin = itertools.cycle(self.replicas)
+        self._task: Optional[asyncio.Task] = None
+
+    def pick(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = next(self._round_robin)
+            if replica.lag_seconds <= self.max_lag_seconds:
+                return replica
+        return None
+
+    def record_lag(self, replica: Replica, lag_seconds: float) -> None:
+        was_healthy = replica.lag_seconds <= self.max_lag_seconds
+        replica.lag_seconds = lag_seconds
+        healthy = lag_seconds <= self.max_lag_seconds
+        replica_lag_gauge.set(lag_seconds if math.isfinite(lag_seconds) else -1, replica=replica.name)
+        replica_healthy_gauge.set(1 if healthy else 0, replica=replica.name)
+        if healthy and not was_healthy:
+            logger.info(f"Replica {replica.name} in rotation - Lag: {lag_seconds:.2f}s")
+        elif was_healthy and not healthy:
+            logger.warning(f"Replica {replica.name} taken out of rotation - Lag: {lag_seconds:.2f}s")
+
+    async def check_lag(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    lag = float(await connection.scalar(REPLICA_LAG_SQL))
+            except Exception as e:
+                logger.error(f"Replica lag check failed - Replica: {replica.name}, Error: {e}")
+                lag = math.inf
+            self.record_lag(replica, lag)
+
+    def start(self) -> None:
+        if self._task is None and self.replicas:
+            self._task = asyncio.create_task(self._run(), name="replica-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval_seconds)
+
+
+def _read_only_tables(clause) -> Optional[Set[str]]:
+    """
+    Table names a plain SELECT reads, or None if the statement must go to
+    the primary (locking reads, data-modifying CTEs, raw SQL).
+    """
+    if not isinstance(clause, Select) or clause._for_update_arg is not None:
+        return None
+    tables = set()
+    for element in visitors.iterate(clause):
+        if isinstance(element, UpdateBase):
+            return None
+        if isinstance(element, TableClause):
+            tables.add(element.name)
+    return tables
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to a healthy replica and everything else to the
+    primary. Once the session writes to a table, later reads of that table
+    stay on the primary, so a request sees its own writes.
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if not self.replicas or not self.replicas.replicas:
+            return primary
+
+        if isinstance(clause, UpdateBase):
+            self.info.setdefault(WRITTEN_TABLES, set()).add(clause.table.name)
+
+        tables = _read_only_tables(clause)
+        if (
+            tables is None
+            or self._flushing
+            or self.info.get(PRIMARY_ONLY)
+            or not tables.isdisjoint(self.info.get(WRITTEN_TABLES, ()))
+        ):
+            routed_statements_counter.inc(target="primary")
+            return primary
+
+        replica = self.replicas.pick()
+        if replica is None:
+            routed_statements_counter.inc(target="primary_fallback")
+            return primary
+        routed_statements_counter.inc(target=replica.name)
+        return replica.engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _record_flushed_tables(session: Session, flush_context, instances) -> None:
+    if not session.replicas:
+        return
+    written = session.info.setdefault(WRITTEN_TABLES, set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        written.add(obj.__table__.name)
+
+
+def pin_to_primary(db: AsyncSession, *tables: str) -> None:
+    """
+    Read these tables from the primary for the rest of the session, as if
+    the session had written them. Used for rows another request may have
+    just written, which a replica might not have replayed yet.
+    """
+    db.info.setdefault(WRITTEN_TABLES, set()).update(tables)
+
+
+@contextmanager
+def reading_from_primary(db: AsyncSession) -> Iterator[None]:
+    """Route every statement in the block to the primary."""
+    previous = db.info.get(PRIMARY_ONLY)
+    db.info[PRIMARY_ONLY] = True
+    try:
+        yield
+    finally:
+        db.info[PRIMARY_ONLY] = previous
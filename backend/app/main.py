@@ -1,27 +1,90 @@
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from api.v1 import chat as chat_router
 from config import settings
+from core.admission import AdmissionControlMiddleware, RouteClassLimit
 from core.logging import get_logger
+from core.metrics import registry
+from db.availability_summary import AvailabilitySummaryRefresher
+from db.database import engine, replicas
+from db.instrumentation import SQLInstrumentationMiddleware
+from db.notifications import notification_listener
+from db.partitions import PartitionMaintainer
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from services.inventory import INVENTORY_CHANNEL
+from services.leasing import leasing_client
+from services.tool_audit import tool_audit_logger
 
 logger = get_logger(__name__)
 
+partition_maintainer = PartitionMaintainer(engine, settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+summary_refresher = AvailabilitySummaryRefresher(
+    engine,
+    settings.AVAILABILITY_SUMMARY_POLL_INTERVAL_SECONDS,
+    settings.AVAILABILITY_SUMMARY_FULL_REFRESH_SECONDS,
+)
+notification_listener.subscribe(INVENTORY_CHANNEL, summary_refresher.wake)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up...")
+    notification_listener.start()
+    replicas.start()
+    partition_maintainer.start()
+    summary_refresher.start()
+    tool_audit_logger.start()
     yield
     logger.info("Shutting down...")
+    await tool_audit_logger.stop()
+    await leasing_client.close()
+    await summary_refresher.stop()
+    await partition_maintainer.stop()
+    await replicas.stop()
+    await notification_listener.stop()
 
 
 app = FastAPI(lifespan=lifespan)
 
+
+def classify_route(path: str) -> Optional[str]:
+    if not path.startswith("/api/"):
+        return None
+    if path in settings.ADMISSION_LLM_ROUTES:
+        return "llm"
+    return "standard"
+
+
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limits={
+            "llm": RouteClassLimit(
+                max_concurrency=settings.ADMISSION_LLM_MAX_CONCURRENCY,
+                max_queue=settings.ADMISSION_LLM_MAX_QUEUE,
+                queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            ),
+            "standard": RouteClassLimit(
+                max_concurrency=settings.ADMISSION_STANDARD_MAX_CONCURRENCY,
+                max_queue=settings.ADMISSION_STANDARD_MAX_QUEUE,
+                queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            ),
+        },
+        classify=classify_route,
+        retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+
+# Outermost of the two, so queued and shed requests are tracked too
+app.add_middleware(SQLInstrumentationMiddleware, n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD)
+
 origins = [
     settings.FRONTEND_URL,
 ]
 
+# Added last so CORS headers are also applied to shed (503) responses
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -31,3 +94,8 @@ app.add_middleware(
 )
 
 app.include_router(chat_router.router, prefix="/api/v1", tags=["chat"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -2,19 +2,34 @@ from datetime import datetime, timezone
 from enum import Enum as PyEnum
 from typing import List, Optional
 
+from sqlalchemy import BigInteger as SA_BigInteger
 from sqlalchemy import Boolean as SA_Boolean
+from sqlalchemy import CheckConstraint as SA_CheckConstraint
 from sqlalchemy import Column as SA_Column
 from sqlalchemy import DateTime as SA_DateTime
 from sqlalchemy import Enum as SA_Enum
 from sqlalchemy import Float as SA_Float
 from sqlalchemy import ForeignKey as SA_ForeignKey
 from sqlalchemy import Integer as SA_Integer
+from sqlalchemy import LargeBinary as SA_LargeBinary
 from sqlalchemy import String as SA_String
+from sqlalchemy import Identity as SA_Identity
+from sqlalchemy import Index as SA_Index
 from sqlalchemy import Text as SA_Text
+from sqlalchemy import text as sa_text
 from sqlalchemy.dialects.postgresql import JSONB as SA_JSONB
 from sqlalchemy.sql import func
 from sqlmodel import Field, Relationship, SQLModel
 
+from core.ids import nanoid
+
+# Ids are generated in Python when a model is constructed (default_factory),
+# so ORM rows are complete before they are flushed. The column keeps only the
+# server-side nanoid() default: SQLModel would otherwise copy the factory onto
+# the column, and SQLAlchemy does not apply Python-side column defaults to
+# INSERTs carrying CTEs, which would send NULL ids.
+CLIENT_ID_COLUMN = {"default": None, "server_default": func.nanoid()}
+
 
 class ActionType(str, PyEnum):
     PROPOSE_TOUR = "propose_tour"
@@ -33,12 +48,19 @@ class PetType(str, PyEnum):
 
 class Community(SQLModel, table=True):
     __tablename__ = "communities"
+    __table_args__ = (
+        SA_Index(
+            "ix_communities_address_trgm", "address",
+            postgresql_using="gist", postgresql_ops={"address": "gist_trgm_ops"},
+        ),
+    )
     
     id: str = Field(
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     name: str = Field(sa_column=SA_Column(SA_String(255), nullable=False))
     address: str = Field(sa_column=SA_Column(SA_String(500), nullable=False))
@@ -64,12 +86,26 @@ class Community(SQLModel, table=True):
 
 class Unit(SQLModel, table=True):
     __tablename__ = "units"
+    __table_args__ = (
+        SA_Index("ix_units_community_available_bedrooms", "community_id", "is_available", "bedrooms"),
+        # Serve search_units: filter and rank available units without touching the heap
+        SA_Index(
+            "ix_units_search", "community_id", "bedrooms", "square_feet",
+            postgresql_include=["id", "bathrooms", "base_rent", "available_date", "unit_number"],
+            postgresql_where=sa_text("is_available"),
+        ),
+        SA_Index(
+            "ix_units_search_available_date", "community_id", "available_date",
+            postgresql_where=sa_text("is_available"),
+        ),
+    )
     
     id: str = Field(
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     community_id: str = Field(
         sa_column=SA_Column(
@@ -112,7 +148,8 @@ class PetPolicy(SQLModel, table=True):
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     community_id: str = Field(
         sa_column=SA_Column(
@@ -161,16 +198,21 @@ class PetPolicy(SQLModel, table=True):
 
 class UnitPricing(SQLModel, table=True):
     __tablename__ = "unit_pricing"
+    __table_args__ = (
+        # Serves the DISTINCT ON (unit_id) ... ORDER BY move_in_date DESC lookups
+        SA_Index("ix_unit_pricing_unit_id_move_in_date", "unit_id", sa_text("move_in_date DESC")),
+    )
     
     id: str = Field(
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     unit_id: str = Field(
         sa_column=SA_Column(
-            SA_String(50), SA_ForeignKey("units.id"), nullable=False, index=True
+            SA_String(50), SA_ForeignKey("units.id"), nullable=False
         )
     )
     move_in_date: datetime = Field(
@@ -206,14 +248,76 @@ class UnitPricing(SQLModel, table=True):
     unit: Optional[Unit] = Relationship(back_populates="pricing")
 
 
+class UnitAvailabilitySummary(SQLModel, table=True):
+    __tablename__ = "unit_availability_summary"
+    # Recomputed by db.availability_summary from units and their current
+    # pricing; one row per (community, bedroom count) with at least one
+    # available unit. refreshed_at is when the row last changed.
+    
+    community_id: str = Field(
+        sa_column=SA_Column(
+            SA_String(50),
+            SA_ForeignKey("communities.id", ondelete="CASCADE"),
+            primary_key=True,
+        )
+    )
+    bedrooms: int = Field(sa_column=SA_Column(SA_Integer, primary_key=True))
+    available_units: int = Field(sa_column=SA_Column(SA_Integer, nullable=False))
+    min_rent: int = Field(sa_column=SA_Column(SA_Integer, nullable=False))
+    max_rent: int = Field(sa_column=SA_Column(SA_Integer, nullable=False))
+    min_square_feet: Optional[int] = Field(
+        default=None, sa_column=SA_Column(SA_Integer, nullable=True)
+    )
+    max_square_feet: Optional[int] = Field(
+        default=None, sa_column=SA_Column(SA_Integer, nullable=True)
+    )
+    earliest_available_date: Optional[datetime] = Field(
+        default=None, sa_column=SA_Column(SA_DateTime(timezone=True), nullable=True)
+    )
+    refreshed_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=SA_Column(
+            SA_DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+        ),
+    )
+
+
+class UnitAvailabilitySummaryStale(SQLModel, table=True):
+    __tablename__ = "unit_availability_summary_stale"
+    # Communities queued for a summary recompute by statement-level
+    # triggers on units and unit_pricing; drained by the refresher
+    
+    id: Optional[int] = Field(
+        default=None, sa_column=SA_Column(SA_BigInteger, SA_Identity(), primary_key=True)
+    )
+    community_id: str = Field(sa_column=SA_Column(SA_String(50), nullable=False))
+    queued_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=SA_Column(
+            SA_DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+        ),
+    )
+
+
 class TourSlot(SQLModel, table=True):
     __tablename__ = "tour_slots"
+    __table_args__ = (
+        SA_CheckConstraint(
+            "current_bookings >= 0 AND current_bookings <= max_capacity",
+            name="ck_tour_slots_bookings_within_capacity",
+        ),
+    )
     
     id: str = Field(
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     community_id: str = Field(
         sa_column=SA_Column(
@@ -249,12 +353,25 @@ class TourSlot(SQLModel, table=True):
 
 class Lead(SQLModel, table=True):
     __tablename__ = "leads"
+    __table_args__ = (
+        SA_Index("ux_leads_email_lower", sa_text("lower(email)"), unique=True),
+        SA_Index("ix_leads_created_at_id", "created_at", "id"),
+        SA_Index(
+            "ix_leads_name_trgm", "name",
+            postgresql_using="gist", postgresql_ops={"name": "gist_trgm_ops"},
+        ),
+        SA_Index(
+            "ix_leads_email_trgm", "email",
+            postgresql_using="gist", postgresql_ops={"email": "gist_trgm_ops"},
+        ),
+    )
     
     id: str = Field(
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     name: str = Field(sa_column=SA_Column(SA_String(255), nullable=False))
     email: str = Field(
@@ -288,7 +405,8 @@ class Conversation(SQLModel, table=True):
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     lead_id: str = Field(
         sa_column=SA_Column(
@@ -313,18 +431,31 @@ class Conversation(SQLModel, table=True):
     messages: List["Message"] = Relationship(back_populates="conversation")
 
 
+# Full-text search document for messages. Searches must use this exact
+# expression for the planner to match it to the ix_messages_search index.
+MESSAGE_SEARCH_DOCUMENT = "to_tsvector('english', coalesce(message_text, '') || ' ' || coalesce(reply_text, ''))"
+
+
 class Message(SQLModel, table=True):
     __tablename__ = "messages"
+    # Range partitioned by month on created_at (see db/partitions.py), so
+    # created_at is part of the primary key
+    __table_args__ = (
+        SA_Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),
+        SA_Index("ix_messages_search", sa_text(MESSAGE_SEARCH_DOCUMENT), postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: str = Field(
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     conversation_id: str = Field(
         sa_column=SA_Column(
-            SA_String(50), SA_ForeignKey("conversations.id"), nullable=False, index=True
+            SA_String(50), SA_ForeignKey("conversations.id"), nullable=False
         )
     )
     message_text: str = Field(sa_column=SA_Column(SA_Text, nullable=False))
@@ -358,6 +489,7 @@ class Message(SQLModel, table=True):
             SA_DateTime(timezone=True),
             server_default=func.now(),
             nullable=False,
+            primary_key=True,
         ),
     )
     
@@ -365,16 +497,38 @@ class Message(SQLModel, table=True):
     
 class ToolCall(SQLModel, table=True):
     __tablename__ = "tool_calls"
+    # Partitioned like messages
+    __table_args__ = (
+        SA_Index("ix_tool_calls_conversation_id_created_at", "conversation_id", "created_at"),
+        SA_Index("ix_tool_calls_created_at_id", "created_at", "id"),
+        SA_Index("ix_tool_calls_function_name_created_at_id", "function_name", "created_at", "id"),
+        SA_Index(
+            "ix_tool_calls_failed_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=sa_text("NOT success"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: str = Field(
         primary_key=True,
         index=True,
         max_length=50,
-        sa_column_kwargs={"server_default": func.nanoid()},
+        default_factory=nanoid,
+        sa_column_kwargs=CLIENT_ID_COLUMN,
     )
     function_name: str = Field(sa_column=SA_Column(SA_String(100), nullable=False, index=True))
-    arguments: dict = Field(sa_column=SA_Column(SA_JSONB, nullable=False))
-    response: dict = Field(sa_column=SA_Column(SA_JSONB, nullable=False))
+    # Inline payloads are only set on rows written before payload dedup;
+    # newer rows reference tool_call_payloads by hash instead
+    arguments: Optional[dict] = Field(default=None, sa_column=SA_Column(SA_JSONB, nullable=True))
+    response: Optional[dict] = Field(default=None, sa_column=SA_Column(SA_JSONB, nullable=True))
+    arguments_hash: Optional[bytes] = Field(
+        default=None, sa_column=SA_Column(SA_LargeBinary, nullable=True)
+    )
+    response_hash: Optional[bytes] = Field(
+        default=None, sa_column=SA_Column(SA_LargeBinary, nullable=True)
+    )
     execution_time_ms: int = Field(sa_column=SA_Column(SA_Integer, nullable=False))
     success: bool = Field(sa_column=SA_Column(SA_Boolean, nullable=False))
     error_message: Optional[str] = Field(
@@ -383,19 +537,42 @@ class ToolCall(SQLModel, table=True):
     conversation_id: Optional[str] = Field(
         default=None, 
         sa_column=SA_Column(
-            SA_String(50), SA_ForeignKey("conversations.id"), nullable=True, index=True
+            SA_String(50), SA_ForeignKey("conversations.id"), nullable=True
         )
     )
     request_id: Optional[str] = Field(
         default=None, sa_column=SA_Column(SA_String(50), nullable=True, index=True)
     )
+    # Answered from the conversation's tool memo rather than executed
+    memoized: bool = Field(
+        default=False, sa_column=SA_Column(SA_Boolean, server_default=sa_text("false"), nullable=False)
+    )
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=SA_Column(
             SA_DateTime(timezone=True),
             server_default=func.now(),
             nullable=False,
+            primary_key=True,
         ),
     )
     
-    conversation: Optional[Conversation] = Relationship()
\ No newline at end of file
+    conversation: Optional[Conversation] = Relationship()
+
+
+class ToolCallPayload(SQLModel, table=True):
+    __tablename__ = "tool_call_payloads"
+
+    # sha256 of the canonical JSON
+    hash: bytes = Field(sa_column=SA_Column(SA_LargeBinary, primary_key=True))
+    encoding: str = Field(sa_column=SA_Column(SA_String(16), nullable=False))
+    data: bytes = Field(sa_column=SA_Column(SA_LargeBinary, nullable=False))
+    size_bytes: int = Field(sa_column=SA_Column(SA_Integer, nullable=False))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=SA_Column(
+            SA_DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+        ),
+    )
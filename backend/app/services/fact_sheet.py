@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.logging import get_logger
+from core.metrics import registry
+from db.notifications import notification_listener
+from db.repository import AvailabilitySummaryRepository, CommunityRepository, PetPolicyRepository, UnitPricingRepository
+from db.routing import reading_from_primary
+from services.inventory import ALL_COMMUNITIES, INVENTORY_CHANNEL, as_utc
+
+logger = get_logger(__name__)
+
+# Units listed per special before the rest are summarised as a count
+MAX_UNITS_PER_SPECIAL = 8
+
+build_histogram = registry.histogram(
+    "fact_sheet_build_seconds", "Time to load and compile a community fact sheet", ["kind"]
+)
+lookups_counter = registry.counter(
+    "fact_sheet_lookups_total", "Community fact sheet lookups by outcome", ["outcome"]
+)
+size_histogram = registry.histogram(
+    "fact_sheet_chars", "Size of compiled community fact sheets in characters",
+    buckets=(250, 500, 1000, 2000, 4000, 8000),
+)
+
+
+class FactSheet(NamedTuple):
+    community_id: str
+    # Content hash, shown in the prompt so replies can be traced to the facts they saw
+    version: str
+    text: str
+    # Cache invalidation counter the sheet was built at
+    generation: int
+    # When the earliest included special expires or a scheduled one starts
+    valid_until: Optional[datetime]
+
+
+def _money(amount: int) -> str:
+    return f"${amount:,}"
+
+
+def _bedrooms(bedrooms: int) -> str:
+    return "Studio" if bedrooms == 0 else f"{bedrooms} bed"
+
+
+def _date(value: datetime) -> str:
+    return as_utc(value).date().isoformat()
+
+
+def _range(low, high, fmt=str) -> str:
+    if low is None:
+        return ""
+    return fmt(low) if low == high or high is None else f"{fmt(low)}-{fmt(high)}"
+
+
+def _pet_line(policy) -> str:
+    pet_type = str(getattr(policy.pet_type, "value", policy.pet_type)).lower()
+    pets = pet_type if pet_type == "fish" else f"{pet_type}s"
+    if not policy.allowed:
+        return f"{pets} not allowed"
+    terms = []
+    if policy.max_count:
+        terms.append(f"max {policy.max_count}")
+    if policy.weight_limit:
+        terms.append(f"up to {policy.weight_limit} lb")
+    if policy.deposit:
+        terms.append(f"{_money(policy.deposit)} deposit")
+    if policy.fee:
+        terms.append(f"{_money(policy.fee)} fee")
+    if policy.monthly_rent:
+        terms.append(f"{_money(policy.monthly_rent)}/month")
+    if policy.notes:
+        terms.append(policy.notes)
+    return f"{pets} allowed" + (f" ({', '.join(terms)})" if terms else "")
+
+
+def _unit_mix_line(summary) -> str:
+    parts = [f"{summary.available_units} available", _range(summary.min_rent, summary.max_rent, _money)]
+    square_feet = _range(summary.min_square_feet, summary.max_square_feet, lambda value: f"{value:,}")
+    if square_feet:
+        parts.append(f"{square_feet} sq ft")
+    if summary.earliest_available_date:
+        parts.append(f"earliest move-in {_date(summary.earliest_available_date)}")
+    return f"{_bedrooms(summary.bedrooms)}: {', '.join(part for part in parts if part)}"
+
+
+def _special_lines(specials: Sequence, now: datetime) -> List[str]:
+    grouped: Dict[tuple, List] = defaultdict(list)
+    for special in specials:
+        if as_utc(special.effective_date) <= now:
+            grouped[(special.special_offer, special.special_discount, special.expires_date)].append(special)
+
+    lines = []
+    for (offer, discount, expires_date), rows in grouped.items():
+        units = [f"{row.unit_number} ({_bedrooms(row.bedrooms)})" for row in rows[:MAX_UNITS_PER_SPECIAL]]
+        if len(rows) > MAX_UNITS_PER_SPECIAL:
+            units.append(f"+{len(rows) - MAX_UNITS_PER_SPECIAL} more")
+        terms = offer + (f" ({_money(discount)} off)" if discount else "")
+        until = f", until {_date(expires_date)}" if expires_date else ""
+        lines.append(f"{terms}: units {', '.join(units)}{until}")
+    return lines
+
+
+def _valid_until(specials: Iterable, now: datetime) -> Optional[datetime]:
+    # Specials start and end on a schedule, not with a row change
+    boundaries = []
+    for special in specials:
+        effective_date = as_utc(special.effective_date)
+        if effective_date > now:
+            boundaries.append(effective_date)
+        elif special.expires_date is not None:
+            boundaries.append(as_utc(special.expires_date))
+    return min(boundaries, default=None)
+
+
+def compile_fact_sheet(community, pet_policies: Sequence, unit_mix: Sequence, specials: Sequence, generation: int = 0, now: Optional[datetime] = None) -> FactSheet:
+    """
+    A compact plain-text block of the facts leads ask about most: contact
+    details, pet policies, available unit mix and current specials.
+    """
+    now = now or datetime.now(timezone.utc)
+    contact = [community.address] + [value for value in (community.phone, community.email) if value]
+    lines = [f"{community.name}: {'; '.join(contact)}"]
+
+    pets = sorted(pet_policies, key=lambda policy: str(getattr(policy.pet_type, "value", policy.pet_type)))
+    lines.append("Pets: " + ("; ".join(_pet_line(policy) for policy in pets) if pets else "no pet policy on file, hand off pet questions"))
+
+    if unit_mix:
+        lines.append("Available units:")
+        lines.extend(f"- {_unit_mix_line(summary)}" for summary in unit_mix)
+    else:
+        lines.append("Available units: none")
+
+    special_lines = _special_lines(specials, now)
+    if special_lines:
+        lines.append("Current specials:")
+        lines.extend(f"- {line}" for line in special_lines)
+    else:
+        lines.append("Current specials: none")
+
+    text = "\n".join(lines)
+    version = hashlib.sha256(text.encode()).hexdigest()[:12]
+    return FactSheet(community.id, version, text, generation, _valid_until(specials, now))
+
+
+class FactSheetCache:
+    """
+    Compiled fact sheets per community. The rows behind a sheet (units,
+    pet_policies, unit_pricing and communities) all notify
+    ``inventory_changed``, so a sheet is rebuilt only after one of them
+    changes, or once a special it includes expires. While the listener is
+    down every lookup compiles a fresh sheet that is not kept.
+    """
+
+    def __init__(self):
+        self.live = False
+        self._sheets: Dict[str, FactSheet] = {}
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def invalidate(self, community_id: str) -> None:
+        if community_id == ALL_COMMUNITIES:
+            self.invalidate_all()
+            return
+        self._generations[community_id] += 1
+
+    def invalidate_all(self) -> None:
+        for community_id in list(self._generations):
+            self._generations[community_id] += 1
+        self._sheets.clear()
+
+    def set_live(self, live: bool) -> None:
+        self.live = live
+        self.invalidate_all()
+
+    def _current(self, community_id: str) -> Optional[FactSheet]:
+        sheet = self._sheets.get(community_id)
+        if sheet is None or sheet.generation != self._generations[community_id]:
+            return None
+        if sheet.valid_until is not None and sheet.valid_until <= datetime.now(timezone.utc):
+            return None
+        return sheet
+
+    async def get(self, db: AsyncSession, community_id: str) -> Optional[FactSheet]:
+        """The community's fact sheet, or None if the community does not exist."""
+        if not self.live:
+            lookups_counter.inc(outcome="bypass")
+            return await self._build(db, community_id, self._generations[community_id], "bypass")
+
+        sheet = self._current(community_id)
+        if sheet is not None:
+            lookups_counter.inc(outcome="hit")
+            return sheet
+
+        lock = self._locks.setdefault(community_id, asyncio.Lock())
+        async with lock:
+            sheet = self._current(community_id)
+            if sheet is not None:
+                lookups_counter.inc(outcome="hit")
+                return sheet
+
+            generation = self._generations[community_id]
+            kind = "refresh" if community_id in self._sheets else "cold"
+            lookups_counter.inc(outcome=kind)
+            fresh = await self._build(db, community_id, generation, kind)
+            # Same rule as the inventory cache: a build raced by an
+            # invalidation serves this request but is not kept.
+            if fresh is not None and self.live and self._generations[community_id] == generation:
+                self._sheets[community_id] = fresh
+            return fresh
+
+    async def _build(self, db: AsyncSession, community_id: str, generation: int, kind: str) -> Optional[FactSheet]:
+        start_time = time.perf_counter()
+        with reading_from_primary(db):
+            community = await CommunityRepository().get_by_id(db, community_id)
+            if community is None:
+                return None
+            pet_policies = await PetPolicyRepository().get_by_community_id(db, community_id)
+            unit_mix = await AvailabilitySummaryRepository().get_by_community(db, community_id)
+            specials = await UnitPricingRepository().get_community_specials(db, community_id)
+        sheet = compile_fact_sheet(community, pet_policies, unit_mix, specials, generation)
+        build_time = time.perf_counter() - start_time
+        build_histogram.observe(build_time, kind=kind)
+        size_histogram.observe(len(sheet.text))
+        logger.info(f"Fact sheet built ({kind}) - Community: {community_id}, Version: {sheet.version}, Chars: {len(sheet.text)}, Time: {build_time * 1000:.1f}ms")
+        return sheet
+
+
+fact_sheet_cache = FactSheetCache()
+
+
+async def get_fact_sheet(db: AsyncSession, community_id: str) -> Optional[FactSheet]:
+    """
+    The fact sheet for the prompt, built on the request's session inside
+    a savepoint that is always rolled back, so a failed build never
+    affects the caller's transaction. Failures are logged and yield None;
+    the model can still use the tools.
+    """
+    try:
+        savepoint = await db.begin_nested()
+        try:
+            return await fact_sheet_cache.get(db, community_id)
+        finally:
+            await savepoint.rollback()
+    except Exception as e:
+        logger.error(f"Failed to build fact sheet - Community: {community_id}, Error: {e}")
+        return None
+
+
+if settings.FACT_SHEET_ENABLED:
+    notification_listener.subscribe(INVENTORY_CHANNEL, fact_sheet_cache.invalidate)
+    notification_listener.on_connect(lambda: fact_sheet_cache.set_live(True))
+    notification_listener.on_disconnect(lambda: fact_sheet_cache.set_live(False))
@@ -0,0 +1,302 @@
+import asyncio
+import heapq
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.logging import get_logger
+from core.metrics import registry
+from db.notifications import notification_listener
+from db.repository import PetPolicyRepository, UnitPricingRepository, UnitRepository
+from db.routing import reading_from_primary
+
+logger = get_logger(__name__)
+
+INVENTORY_CHANNEL = "inventory_changed"
+ALL_COMMUNITIES = "*"
+
+load_histogram = registry.histogram(
+    "inventory_snapshot_load_seconds", "Time to build a community inventory snapshot", ["kind"]
+)
+invalidations_counter = registry.counter(
+    "inventory_snapshot_invalidations_total", "Snapshot invalidations received", ["scope"]
+)
+lookups_counter = registry.counter(
+    "inventory_snapshot_lookups_total", "Snapshot lookups by outcome", ["outcome"]
+)
+cached_gauge = registry.gauge(
+    "inventory_snapshots_cached", "Community snapshots currently held in memory"
+)
+
+
+class UnitRecord(NamedTuple):
+    id: str
+    unit_number: str
+    bedrooms: int
+    bathrooms: float
+    square_feet: Optional[int]
+    is_available: bool
+    base_rent: int
+    available_date: Optional[datetime]
+
+
+class PetPolicyRecord(NamedTuple):
+    pet_type: str
+    allowed: bool
+    fee: Optional[int]
+    deposit: Optional[int]
+    monthly_rent: Optional[int]
+    max_count: Optional[int]
+    weight_limit: Optional[int]
+    notes: Optional[str]
+
+
+class PricingRecord(NamedTuple):
+    unit_id: str
+    rent: int
+    move_in_date: datetime
+    special_offer: Optional[str]
+    special_discount: Optional[int]
+    effective_date: datetime
+    expires_date: Optional[datetime]
+
+
+class UnitSearch(NamedTuple):
+    """search_units criteria; None means no constraint."""
+    bedrooms: Optional[int] = None
+    min_bathrooms: Optional[float] = None
+    min_rent: Optional[int] = None
+    max_rent: Optional[int] = None
+    min_square_feet: Optional[int] = None
+    max_square_feet: Optional[int] = None
+    available_by: Optional[datetime] = None
+    sort_by: str = "rent"
+
+
+class UnitMatch(NamedTuple):
+    unit: UnitRecord
+    rent: int
+    special_offer: Optional[str]
+
+
+# Same orderings as UnitRepository.search_available_units
+SORT_KEYS = {
+    "rent": lambda match: match.rent,
+    "square_feet": lambda match: (match.unit.square_feet is None, -(match.unit.square_feet or 0)),
+    "available_date": lambda match: (match.unit.available_date is not None, match.unit.available_date and as_utc(match.unit.available_date)),
+}
+
+
+def as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class CommunityInventory:
+    """
+    Immutable, read-optimised view of one community's available units, pet
+    policies and pricing rows.
+    """
+
+    __slots__ = ("community_id", "version", "loaded_at", "units_by_bedrooms", "units_by_id", "pet_policies", "pricing_by_unit")
+
+    def __init__(
+        self,
+        community_id: str,
+        version: int,
+        units_by_bedrooms: Dict[int, Tuple[UnitRecord, ...]],
+        pet_policies: Dict[str, PetPolicyRecord],
+        pricing_by_unit: Dict[str, Tuple[PricingRecord, ...]],
+    ):
+        self.community_id = community_id
+        self.version = version
+        self.loaded_at = time.time()
+        self.units_by_bedrooms = units_by_bedrooms
+        self.units_by_id = {unit.id: unit for units in units_by_bedrooms.values() for unit in units}
+        self.pet_policies = pet_policies
+        self.pricing_by_unit = pricing_by_unit
+
+    def available_units(self, bedrooms: int) -> Tuple[UnitRecord, ...]:
+        return self.units_by_bedrooms.get(bedrooms, ())
+
+    def pet_policy(self, pet_type: str) -> Optional[PetPolicyRecord]:
+        return self.pet_policies.get(pet_type.lower())
+
+    def current_pricing(self, unit_id: str, move_in_date: datetime, now: Optional[datetime] = None) -> Optional[PricingRecord]:
+        """
+        Same rule as UnitPricingRepository.get_current_pricing: the latest
+        move-in price on or before the requested date that is in effect now.
+        """
+        now = now or datetime.now(timezone.utc)
+        move_in_date = as_utc(move_in_date)
+        # Rows are ordered by move_in_date descending
+        for pricing in self.pricing_by_unit.get(unit_id, ()):
+            if pricing.move_in_date > move_in_date or pricing.effective_date > now:
+                continue
+            if pricing.expires_date is not None and pricing.expires_date <= now:
+                continue
+            return pricing
+        return None
+
+
+    def search_units(self, search: UnitSearch, move_in_date: datetime, limit: int, now: Optional[datetime] = None) -> Tuple[List[UnitMatch], int]:
+        """
+        In-memory equivalent of UnitRepository.search_available_units: the
+        top ``limit`` matches and the total number of matches.
+        """
+        now = now or datetime.now(timezone.utc)
+        if search.bedrooms is not None:
+            units = self.units_by_bedrooms.get(search.bedrooms, ())
+        else:
+            units = self.units_by_id.values()
+        available_by = as_utc(search.available_by) if search.available_by else None
+
+        matches = []
+        for unit in units:
+            if search.min_bathrooms is not None and unit.bathrooms < search.min_bathrooms:
+                continue
+            if search.min_square_feet is not None and (unit.square_feet is None or unit.square_feet < search.min_square_feet):
+                continue
+            if search.max_square_feet is not None and (unit.square_feet is None or unit.square_feet > search.max_square_feet):
+                continue
+            if available_by is not None and unit.available_date is not None and as_utc(unit.available_date) > available_by:
+                continue
+            pricing = self.current_pricing(unit.id, move_in_date, now)
+            rent = pricing.rent if pricing else unit.base_rent
+            if search.min_rent is not None and rent < search.min_rent:
+                continue
+            if search.max_rent is not None and rent > search.max_rent:
+                continue
+            matches.append(UnitMatch(unit, rent, pricing.special_offer if pricing else None))
+
+        keys = [SORT_KEYS[search.sort_by]] + [key for name, key in SORT_KEYS.items() if name != search.sort_by]
+        top = heapq.nsmallest(limit, matches, key=lambda match: tuple(key(match) for key in keys) + (match.unit.unit_number,))
+        return top, len(matches)
+
+
+class InventoryCache:
+    """
+    Per-community inventory snapshots, invalidated by Postgres triggers via
+    LISTEN/NOTIFY. Snapshots are only served while the listener connection
+    is up; otherwise callers get None and fall back to querying directly,
+    since invalidations could be missed.
+    """
+
+    def __init__(self):
+        self.live = False
+        self._snapshots: Dict[str, CommunityInventory] = {}
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._all_invalidated_at = 0.0
+
+    def version(self, community_id: str) -> int:
+        return self._versions[community_id]
+
+    def invalidated_at(self, community_id: str) -> float:
+        """
+        Wall-clock time this process last learned the community's inventory
+        may have changed (including when the listener last (re)connected).
+        Anything derived from inventory before then may be stale.
+        """
+        return max(self._invalidated_at.get(community_id, 0.0), self._all_invalidated_at)
+
+    def invalidate(self, community_id: str) -> None:
+        if community_id == ALL_COMMUNITIES:
+            self.invalidate_all()
+            return
+        invalidations_counter.inc(scope="community")
+        self._versions[community_id] += 1
+        self._invalidated_at[community_id] = time.time()
+
+    def invalidate_all(self) -> None:
+        invalidations_counter.inc(scope="all")
+        for community_id in list(self._versions):
+            self._versions[community_id] += 1
+        self._all_invalidated_at = time.time()
+        self._snapshots.clear()
+        cached_gauge.set(0)
+
+    def set_live(self, live: bool) -> None:
+        self.live = live
+        self.invalidate_all()
+
+    async def get(self, db: AsyncSession, community_id: str) -> Optional[CommunityInventory]:
+        if not self.live:
+            lookups_counter.inc(outcome="bypass")
+            return None
+
+        snapshot = self._snapshots.get(community_id)
+        if snapshot is not None and snapshot.version == self._versions[community_id]:
+            lookups_counter.inc(outcome="hit")
+            return snapshot
+
+        lock = self._locks.setdefault(community_id, asyncio.Lock())
+        async with lock:
+            snapshot = self._snapshots.get(community_id)
+            version = self._versions[community_id]
+            if snapshot is not None and snapshot.version == version:
+                lookups_counter.inc(outcome="hit")
+                return snapshot
+
+            kind = "refresh" if snapshot is not None else "cold"
+            lookups_counter.inc(outcome=kind)
+            start_time = time.perf_counter()
+            fresh = await self._load(db, community_id, version)
+            load_time = time.perf_counter() - start_time
+            load_histogram.observe(load_time, kind=kind)
+            logger.info(f"Inventory snapshot loaded ({kind}) - Community: {community_id}, Version: {version}, Time: {load_time * 1000:.1f}ms")
+
+            # An invalidation that landed mid-load leaves this snapshot stale;
+            # it is still fine for the current request but must not be kept.
+            if self.live and self._versions[community_id] == version:
+                self._snapshots[community_id] = fresh
+                cached_gauge.set(len(self._snapshots))
+            return fresh
+
+    async def _load(self, db: AsyncSession, community_id: str, version: int) -> CommunityInventory:
+        # The invalidation came from the primary; a lagging replica could
+        # hand back the pre-change rows and pin them until the next one.
+        with reading_from_primary(db):
+            units = await UnitRepository().get_inventory_rows(db, community_id)
+            policies = await PetPolicyRepository().get_by_community_id(db, community_id)
+            pricing = await UnitPricingRepository().get_inventory_rows(db, community_id)
+
+        units_by_bedrooms: Dict[int, list] = defaultdict(list)
+        for unit in map(UnitRecord._make, units):
+            units_by_bedrooms[unit.bedrooms].append(unit)
+
+        pricing_by_unit: Dict[str, list] = defaultdict(list)
+        for price in map(PricingRecord._make, pricing):
+            pricing_by_unit[price.unit_id].append(price)
+
+        return CommunityInventory(
+            community_id,
+            version,
+            units_by_bedrooms={bedrooms: tuple(rows) for bedrooms, rows in units_by_bedrooms.items()},
+            pet_policies={
+                str(policy.pet_type.value).lower(): PetPolicyRecord(
+                    policy.pet_type,
+                    policy.allowed,
+                    policy.fee,
+                    policy.deposit,
+                    policy.monthly_rent,
+                    policy.max_count,
+                    policy.weight_limit,
+                    policy.notes,
+                )
+                for policy in policies
+            },
+            pricing_by_unit={unit_id: tuple(rows) for unit_id, rows in pricing_by_unit.items()},
+        )
+
+
+inventory_cache = InventoryCache()
+
+if settings.INVENTORY_CACHE_ENABLED:
+    notification_listener.subscribe(INVENTORY_CHANNEL, inventory_cache.invalidate)
+    notification_listener.on_connect(lambda: inventory_cache.set_live(True))
+    notification_listener.on_disconnect(lambda: inventory_cache.set_live(False))
@@ -1,18 +1,159 @@
-import requests
-from typing import Dict, Any
+import asyncio
+import time
 from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 
+import httpx
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception, stop_after_attempt, wait_exponential, wait_random
 
-def propose_tour(lead_preferences: Dict[str, Any]) -> Dict[str, Any]:
-    response = requests.post(
-        "https://api.leasing-system.com/v1/tours/propose",
-        json={
+from config import settings
+from core.ids import nanoid
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+# Responses worth another attempt; anything else is the request's fault
+RETRY_STATUSES = {429, 502, 503, 504}
+
+requests_counter = registry.counter(
+    "leasing_api_requests_total", "Leasing system API calls by outcome", ["endpoint", "outcome"]
+)
+retries_counter = registry.counter(
+    "leasing_api_retries_total", "Leasing system API attempts retried", ["endpoint"]
+)
+duration_histogram = registry.histogram(
+    "leasing_api_duration_seconds", "Leasing system API call time, including retries", ["endpoint"]
+)
+in_flight_gauge = registry.gauge(
+    "leasing_api_in_flight", "Leasing system API requests currently in flight"
+)
+
+
+class LeasingAPIError(Exception):
+    """A leasing system call that failed, after any retries."""
+
+
+def _retryable(error: BaseException) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRY_STATUSES
+    # Timeouts and dropped connections; POSTs are safe to repeat because
+    # every attempt of a call carries the same Idempotency-Key
+    return isinstance(error, httpx.TransportError)
+
+
+class LeasingClient:
+    """
+    One pooled HTTP client for the leasing system, shared by every call so
+    connections (and their TLS sessions) are reused instead of opened per
+    request. At most ``max_concurrency`` requests are in flight at once;
+    failed attempts that may succeed later are retried with jittered
+    exponential backoff, up to ``max_attempts`` attempts in all.
+
+    The underlying client is created on first use, on the running loop,
+    and released by ``close``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout_seconds: float,
+        connect_timeout_seconds: float,
+        max_connections: int,
+        max_concurrency: int,
+        max_attempts: int,
+        backoff_seconds: float = 0.2,
+        max_backoff_seconds: float = 2.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.transport = transport
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self.transport,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _log_retry(self, endpoint: str, state: RetryCallState) -> None:
+        retries_counter.inc(endpoint=endpoint)
+        logger.warning(f"Leasing API {endpoint} attempt {state.attempt_number} failed, retrying: {state.outcome.exception()}")
+
+    async def post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST ``payload`` to ``endpoint`` and return the JSON body, or raise ``LeasingAPIError``."""
+        headers = {"Idempotency-Key": nanoid()}
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential(multiplier=self.backoff_seconds, max=self.max_backoff_seconds) + wait_random(0, self.backoff_seconds),
+            retry=retry_if_exception(_retryable),
+            before_sleep=lambda state: self._log_retry(endpoint, state),
+            reraise=True,
+        )
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    data = await self._send(endpoint, payload, headers)
+            outcome = "success"
+            return data
+        except httpx.TimeoutException as e:
+            outcome = "timeout"
+            raise LeasingAPIError(f"Leasing API {endpoint} timed out: {e!r}") from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise LeasingAPIError(f"Leasing API {endpoint} failed: {e}") from e
+        finally:
+            requests_counter.inc(endpoint=endpoint, outcome=outcome)
+            duration_histogram.observe(time.perf_counter() - start_time, endpoint=endpoint)
+
+    async def _send(self, endpoint: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+        # The slot is held per attempt, never across a backoff sleep
+        async with self._semaphore:
+            in_flight_gauge.inc()
+            try:
+                response = await self.client.post(endpoint, json=payload, headers=headers)
+            finally:
+                in_flight_gauge.dec()
+        response.raise_for_status()
+        return response.json()
+
+
+leasing_client = LeasingClient(
+    base_url=settings.LEASING_API_URL,
+    timeout_seconds=settings.LEASING_API_TIMEOUT_SECONDS,
+    connect_timeout_seconds=settings.LEASING_API_CONNECT_TIMEOUT_SECONDS,
+    max_connections=settings.LEASING_API_MAX_CONNECTIONS,
+    max_concurrency=settings.LEASING_API_MAX_CONCURRENCY,
+    max_attempts=settings.LEASING_API_MAX_ATTEMPTS,
+)
+
+
+async def propose_tour(lead_preferences: Dict[str, Any], client: LeasingClient = leasing_client) -> Dict[str, Any]:
+    data = await client.post(
+        "/tours/propose",
+        {
             "lead_id": lead_preferences.get("lead_id"),
             "preferred_time": lead_preferences.get("preferred_time"),
             "unit_type": lead_preferences.get("unit_type")
-        }
+        },
     )
-    data = response.json()
     return {
         "action": "propose_tour",
         "tour_time": data.get("suggested_time", "11:00 AM"),
@@ -22,35 +163,30 @@ def propose_tour(lead_preferences: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def ask_clarification(unclear_request: str) -> Dict[str, Any]:
-    response = requests.post(
-        "https://api.leasing-system.com/v1/clarification/generate",
-        json={"user_message": unclear_request}
-    )
-    data = response.json()
+async def ask_clarification(unclear_request: str, client: LeasingClient = leasing_client) -> Dict[str, Any]:
+    data = await client.post("/clarification/generate", {"user_message": unclear_request})
     return {
-        "action": "ask_clarification", 
+        "action": "ask_clarification",
         "clarifying_question": data.get("question", "Which date works best for you?"),
         "suggested_options": data.get("options", ["This week", "Next week", "Specific date"]),
         "context": unclear_request
     }
 
 
-def handoff_human(issue_details: Dict[str, Any]) -> Dict[str, Any]:
-    response = requests.post(
-        "https://api.leasing-system.com/v1/handoff/create",
-        json={
+async def handoff_human(issue_details: Dict[str, Any], client: LeasingClient = leasing_client) -> Dict[str, Any]:
+    data = await client.post(
+        "/handoff/create",
+        {
             "reason": issue_details.get("reason"),
             "lead_id": issue_details.get("lead_id"),
             "conversation_history": issue_details.get("conversation_history"),
             "priority": issue_details.get("priority", "normal")
-        }
+        },
     )
-    data = response.json()
     return {
         "action": "handoff_human",
         "agent_id": data.get("assigned_agent_id", "agent_001"),
         "estimated_wait_time": data.get("wait_time_minutes", 5),
         "ticket_id": data.get("ticket_id", "TICKET_12345"),
         "handoff_message": "Connecting you with a human agent who can better assist you."
-    }
\ No newline at end of file
+    }
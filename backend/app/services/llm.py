@@ -4,10 +4,14 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from openai import OpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
-from services.tools import check_availability, check_pet_policy, get_pricing
+from services.tool_memo import ConversationMemo, call_record
+from services.tools import log_tool_call, tool_registry
 from pydantic import BaseModel
 from config import settings
 from core.logging import get_logger
+from db.instrumentation import current_request_id
+from db.repository import ToolCallPayloadRepository
+from db.repository.tool_call_payload import encode_payload
 
 logger = get_logger(__name__)
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
@@ -45,77 +49,6 @@ def _extract_inquiry_data(inquiry_data: Dict[str, Any]) -> Tuple[Dict[str, Any],
     
     return lead, message, preferences, community_id, conversation_history
 
-def _build_tool_schemas() -> List[Dict[str, Any]]:
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "check_availability",
-                "description": "Check available units in a community by bedroom count",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "community_id": {
-                            "type": "string",
-                            "description": "The community ID to search in"
-                        },
-                        "bedrooms": {
-                            "type": "integer",
-                            "description": "Number of bedrooms requested"
-                        }
-                    },
-                    "required": ["community_id", "bedrooms"]
-                }
-            }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "check_pet_policy",
-                "description": "Check pet policy for a specific pet type in a community",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "community_id": {
-                            "type": "string",
-                            "description": "The community ID to check policy for"
-                        },
-                        "pet_type": {
-                            "type": "string",
-                            "description": "Type of pet (e.g., 'cat', 'dog')"
-                        }
-                    },
-                    "required": ["community_id", "pet_type"]
-                }
-            }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_pricing",
-                "description": "Get pricing information for a specific unit",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "community_id": {
-                            "type": "string",
-                            "description": "The community ID"
-                        },
-                        "unit_id": {
-                            "type": "string",
-                            "description": "The unit ID to get pricing for"
-                        },
-                        "move_in_date": {
-                            "type": "string",
-                            "description": "Move-in date in YYYY-MM-DD format"
-                        }
-                    },
-                    "required": ["community_id", "unit_id", "move_in_date"]
-                }
-            }
-        }
-    ]
-
 def _build_preferences_info(preferences: Dict[str, Any]) -> str:
     preferences_info = ""
     if preferences:
@@ -129,11 +62,22 @@ def _build_preferences_info(preferences: Dict[str, Any]) -> str:
     
     return preferences_info
 
-def _build_system_prompt(lead: Dict[str, Any], community_id: str, preferences: Dict[str, Any]) -> str:
+def _build_community_info(fact_sheet: Optional[Dict[str, Any]]) -> str:
+    if not fact_sheet:
+        return ""
+    return f"""
+Community facts (version {fact_sheet['version']}):
+{fact_sheet['text']}
+
+Answer questions about pet policies, contact details, the unit mix and current specials from these facts without calling tools. Use tools for specific units, exact pricing for a move-in date and tour times.
+"""
+
+def _build_system_prompt(lead: Dict[str, Any], community_id: str, preferences: Dict[str, Any], fact_sheet: Optional[Dict[str, Any]] = None) -> str:
     preferences_info = _build_preferences_info(preferences)
+    community_info = _build_community_info(fact_sheet)
     
     return f"""You are a helpful leasing agent assistant for the {community_id} community. 
-
+{community_info}
 Lead information:
 - Name: {lead['name']}
 - Email: {lead['email']}
@@ -145,7 +89,7 @@ Use the available tools to help answer their question. Reference the conversatio
 
 After gathering information and crafting your response, determine the appropriate next action:
 
-1. "propose_tour": Use when you have enough information to suggest a specific tour time and have available units to show
+1. "propose_tour": Use when you have enough information to suggest a specific tour time and have available units to show. Only propose a time returned by find_tour_slots
 2. "ask_clarification": Use when the lead's question is ambiguous or lacks key details beyond what's already provided
 3. "handoff_human": Use when you cannot fulfill the request automatically (no available units, complex lease terms, etc.)
 4. "tour_confirmed": Use when the lead confirms/accepts a previously proposed tour time with responses like "that works", "sounds good", "yes", "perfect", etc. This should end the conversation with a pleasant confirmation message.
@@ -166,38 +110,12 @@ def _build_messages(system_prompt: str, conversation_history: List[Dict[str, Any
     messages.append({"role": "user", "content": message})
     return messages
 
-async def _execute_single_tool(db: AsyncSession, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+async def _execute_single_tool(db: AsyncSession, function_name: str, arguments: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"Executing tool: {function_name} with args: {arguments}")
     tool_start_time = time.time()
     
     try:
-        if function_name == "check_availability":
-            result = await check_availability(
-                db, 
-                arguments["community_id"], 
-                arguments["bedrooms"]
-            )
-            logger.info(f"Availability check completed - Found {len(result.get('units', []))} units")
-        elif function_name == "check_pet_policy":
-            result = await check_pet_policy(
-                db,
-                arguments["community_id"],
-                arguments["pet_type"]
-            )
-            logger.info(f"Pet policy check completed - Allowed: {result.get('allowed', False)}")
-        elif function_name == "get_pricing":
-            move_in_date = datetime.fromisoformat(arguments["move_in_date"])
-            result = await get_pricing(
-                db,
-                arguments["community_id"],
-                arguments["unit_id"],
-                move_in_date
-            )
-            logger.info(f"Pricing check completed - Unit: {arguments['unit_id']}")
-        else:
-            result = {"error": f"Unknown function: {function_name}"}
-            logger.error(f"Unknown function called: {function_name}")
-            
+        result = await tool_registry.execute(db, function_name, arguments, **context)
     except Exception as e:
         result = {"error": f"Tool execution failed: {str(e)}"}
         logger.error(f"Tool {function_name} failed with error: {str(e)}")
@@ -207,18 +125,35 @@ async def _execute_single_tool(db: AsyncSession, function_name: str, arguments:
     
     return result
 
-async def _execute_tool_calls(db: AsyncSession, tool_calls: List[Any], messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+async def _execute_tool_calls(db: AsyncSession, tool_calls: List[Any], messages: List[Dict[str, Any]], memo: Optional[ConversationMemo] = None, context: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     logger.info(f"Tool calls requested: {len(tool_calls)} functions")
-    tools_called = {}
+    records = []
+    payloads = []
     
     for tool_call in tool_calls:
         function_name = tool_call.function.name
         arguments = json.loads(tool_call.function.arguments)
+        tool = tool_registry.get(function_name)
         
-        result = await _execute_single_tool(db, function_name, arguments)
-        tools_called[function_name] = arguments
-        
-        serialized_result = serialize_for_json(result)
+        entry = memo.lookup(tool, arguments) if memo is not None and tool is not None else None
+        if entry is not None:
+            logger.info(f"Tool {function_name} answered from conversation memo")
+            serialized_result, result_hash, executed_at = entry.result, entry.result_hash, entry.executed_at
+            log_tool_call(
+                function_name, arguments, serialized_result, 0, True,
+                conversation_id=(context or {}).get("conversation_id"),
+                request_id=(context or {}).get("request_id"),
+                memoized=True,
+            )
+        else:
+            executed_at = time.time()
+            serialized_result = serialize_for_json(await _execute_single_tool(db, function_name, arguments, context or {}))
+            payload = encode_payload(serialized_result)
+            payloads.append(payload)
+            result_hash = payload.hash
+            if memo is not None and tool is not None:
+                memo.store(tool, arguments, serialized_result, result_hash, executed_at)
+        records.append(call_record(function_name, arguments, result_hash, executed_at, memoized=entry is not None))
         
         messages.append({
             "tool_call_id": tool_call.id,
@@ -227,7 +162,10 @@ async def _execute_tool_calls(db: AsyncSession, tool_calls: List[Any], messages:
             "content": json.dumps(serialized_result)
         })
     
-    return messages, tools_called
+    # The records only carry hashes; the results are committed with the message
+    await ToolCallPayloadRepository().store_many(db, payloads)
+    
+    return messages, {"calls": records}
 
 def _get_response_schema() -> Dict[str, Any]:
     return {
@@ -305,8 +243,8 @@ async def handle_lead_inquiry(db: AsyncSession, inquiry_data: Dict[str, Any]) ->
     start_time = time.time()
     
     lead, message, preferences, community_id, conversation_history = _extract_inquiry_data(inquiry_data)
-    tools = _build_tool_schemas()
-    system_prompt = _build_system_prompt(lead, community_id, preferences)
+    tools = tool_registry.schemas()
+    system_prompt = _build_system_prompt(lead, community_id, preferences, inquiry_data.get("fact_sheet"))
     messages = _build_messages(system_prompt, conversation_history, message)
     
     logger.info(f"Sending request to OpenAI - Model: {settings.OPENAI_MODEL}, Total messages: {len(messages)}")
@@ -328,7 +266,15 @@ async def handle_lead_inquiry(db: AsyncSession, inquiry_data: Dict[str, Any]) ->
     
     if message_response.tool_calls:
         messages.append(message_response)
-        messages, tools_called = await _execute_tool_calls(db, message_response.tool_calls, messages)
+        memo = await ConversationMemo.load(db, inquiry_data.get("conversation_id"), inquiry_data.get("tool_history", ())) if settings.TOOL_MEMO_ENABLED else None
+        # Attributes the tools' audit records, and keeps a turn's calls sampled together
+        context = {
+            "conversation_id": inquiry_data.get("conversation_id"),
+            "request_id": inquiry_data.get("request_id") or current_request_id(),
+        }
+        messages, tools_called = await _execute_tool_calls(db, message_response.tool_calls, messages, memo, context)
+        if memo is not None:
+            memo.report()
         
         structured_response, additional_tokens = _get_structured_response(messages)
         total_tokens += additional_tokens
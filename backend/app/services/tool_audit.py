@@ -0,0 +1,184 @@
+import asyncio
+import random
+import time
+import zlib
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from config import settings
+from core.logging import get_logger
+from core.metrics import registry
+from db.database import get_db_context
+from db.repository import ToolCallRepository
+
+logger = get_logger(__name__)
+
+SessionFactory = Callable[[], AbstractAsyncContextManager]
+
+submitted_counter = registry.counter(
+    "tool_audit_submitted_total", "Tool calls submitted for audit logging by outcome", ["outcome"]
+)
+dropped_counter = registry.counter(
+    "tool_audit_dropped_total", "Tool call audit records dropped before reaching the database", ["reason"]
+)
+written_counter = registry.counter(
+    "tool_audit_written_total", "Tool call audit records written"
+)
+queue_gauge = registry.gauge(
+    "tool_audit_queue_depth", "Tool call audit records waiting to be written"
+)
+flush_histogram = registry.histogram(
+    "tool_audit_flush_seconds", "Time to write one batch of tool call audit records"
+)
+batch_histogram = registry.histogram(
+    "tool_audit_batch_size", "Tool call audit records per batch",
+    buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000),
+)
+
+
+class ToolAuditLogger:
+    """
+    Writes tool call audit records from a background task, in multi-row
+    inserts on a session of its own, so tools never wait on (or share a
+    transaction with) their audit write.
+
+    Failed calls are always kept; successful ones are sampled at
+    ``success_sample_rate``, per request so a turn's calls are kept or
+    skipped together. The queue is bounded: when the database cannot keep
+    up, records are dropped and counted rather than held in memory.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        queue_size: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        success_sample_rate: float,
+        shutdown_timeout_seconds: float = 10.0,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.success_sample_rate = success_sample_rate
+        self.shutdown_timeout_seconds = shutdown_timeout_seconds
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def sampled(self, success: bool, request_id: Optional[str]) -> bool:
+        if not success or self.success_sample_rate >= 1:
+            return True
+        if self.success_sample_rate <= 0:
+            return False
+        if request_id is None:
+            return random.random() < self.success_sample_rate
+        return zlib.crc32(request_id.encode()) / 2**32 < self.success_sample_rate
+
+    def submit(self, tool_call_data: Dict[str, Any]) -> None:
+        """Queue a record for writing; never blocks and never raises."""
+        if not self.sampled(tool_call_data["success"], tool_call_data.get("request_id")):
+            submitted_counter.inc(outcome="sampled_out")
+            return
+        if self._queue is None or self._closing:
+            submitted_counter.inc(outcome="dropped")
+            dropped_counter.inc(reason="not_running")
+            return
+        try:
+            self._queue.put_nowait(tool_call_data)
+        except asyncio.QueueFull:
+            submitted_counter.inc(outcome="dropped")
+            dropped_counter.inc(reason="queue_full")
+            return
+        submitted_counter.inc(outcome="queued")
+        queue_gauge.set(self._queue.qsize())
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._run(), name="tool-audit-logger")
+
+    async def stop(self) -> None:
+        """Write everything still queued, giving up after ``shutdown_timeout_seconds``."""
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._task, self.shutdown_timeout_seconds)
+        except asyncio.TimeoutError:
+            remaining = self._queue.qsize()
+            logger.error(f"Tool audit logger did not drain in {self.shutdown_timeout_seconds}s - Dropping {remaining} records")
+            dropped_counter.inc(remaining, reason="shutdown")
+        self._task = None
+        self._queue = None
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """
+        Up to ``batch_size`` records, waiting at most ``flush_interval_seconds``
+        after the first one for the batch to fill.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[Dict[str, Any]] = []
+        deadline = loop.time() + self.flush_interval_seconds
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0 or self._closing:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                if batch or self._closing:
+                    break
+                deadline = loop.time() + self.flush_interval_seconds
+        queue_gauge.set(self._queue.qsize())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if batch:
+                await self.flush(batch)
+            elif self._closing:
+                return
+
+    async def flush(self, batch: List[Dict[str, Any]]) -> None:
+        start_time = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                await ToolCallRepository().log_many(db, batch)
+            written_counter.inc(len(batch))
+        except (DataError, IntegrityError) as e:
+            if len(batch) == 1:
+                logger.error(f"Failed to write tool call audit record for {batch[0]['function_name']}: {e}")
+                dropped_counter.inc(reason="write_failed")
+                return
+            # Keep the rest of the batch when a single record is at fault
+            logger.warning(f"Batch of {len(batch)} tool call audit records rejected, writing them one by one: {e}")
+            for record in batch:
+                await self.flush([record])
+            return
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} tool call audit records: {e}")
+            dropped_counter.inc(len(batch), reason="write_failed")
+            return
+        finally:
+            flush_histogram.observe(time.perf_counter() - start_time)
+        batch_histogram.observe(len(batch))
+
+
+tool_audit_logger = ToolAuditLogger(
+    session_factory=get_db_context,
+    queue_size=settings.TOOL_AUDIT_QUEUE_SIZE,
+    batch_size=settings.TOOL_AUDIT_BATCH_SIZE,
+    flush_interval_seconds=settings.TOOL_AUDIT_FLUSH_INTERVAL_SECONDS,
+    success_sample_rate=settings.TOOL_AUDIT_SUCCESS_SAMPLE_RATE,
+)
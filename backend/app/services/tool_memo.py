@@ -0,0 +1,149 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.logging import get_logger
+from core.metrics import registry
+from core.serialization import canonical_json
+from db.repository import ToolCallPayloadRepository
+from db.repository.tool_call_payload import encode_payload
+from db.routing import reading_from_primary
+from services.inventory import inventory_cache
+from services.tool_registry import Tool, tool_registry
+
+logger = get_logger(__name__)
+
+lookups_counter = registry.counter(
+    "tool_memo_lookups_total", "Conversation tool memo lookups by outcome", ["tool", "outcome"]
+)
+saved_histogram = registry.histogram(
+    "tool_memo_saved_executions", "Tool executions answered from the memo per turn",
+    buckets=(0, 1, 2, 3, 5, 10),
+)
+
+
+class MemoEntry(NamedTuple):
+    result: Any
+    result_hash: bytes
+    executed_at: float
+    community_id: Optional[str]
+
+
+def call_record(name: str, arguments: Dict[str, Any], result_hash: bytes, executed_at: float, memoized: bool) -> Dict[str, Any]:
+    """
+    One tool call as persisted in Message.tools_called["calls"]. The result
+    itself is in tool_call_payloads, under ``result_hash``.
+    """
+    return {
+        "name": name,
+        "arguments": arguments,
+        "result_hash": result_hash.hex(),
+        "executed_at": datetime.fromtimestamp(executed_at, timezone.utc).isoformat(),
+        "memoized": memoized,
+    }
+
+
+class ConversationMemo:
+    """
+    Results of the conversation's earlier tool calls, keyed on tool name
+    and canonical (validated) arguments, rebuilt each turn by ``load`` from
+    the call records persisted in Message.tools_called, so every worker
+    sees the same memo without sharing state. Only the records still
+    within their tool's TTL have their results read back from
+    tool_call_payloads.
+
+    An entry is reused only while the tool's ``cache_ttl_seconds`` has not
+    elapsed and the inventory listener is live and has not invalidated the
+    entry's community since the entry was executed. Tools with no TTL and
+    results carrying an error are never memoized.
+    """
+
+    def __init__(self, conversation_id: Optional[str]):
+        self.conversation_id = conversation_id
+        self.entries: Dict[str, MemoEntry] = {}
+        self.saved_before = 0
+        self.saved = 0
+
+    @classmethod
+    async def load(cls, db: AsyncSession, conversation_id: Optional[str], history: Iterable[Optional[Dict[str, Any]]] = ()) -> "ConversationMemo":
+        memo = cls(conversation_id)
+        now = time.time()
+        candidates = []
+        for tools_called in history:
+            for record in (tools_called or {}).get("calls", ()):
+                if record.get("memoized"):
+                    memo.saved_before += 1
+                tool = tool_registry.get(record.get("name"))
+                if tool is None or not tool.policy.cache_ttl_seconds:
+                    continue
+                executed_at = datetime.fromisoformat(record["executed_at"]).timestamp()
+                if now - executed_at >= tool.policy.cache_ttl_seconds:
+                    continue
+                if "result_hash" in record:
+                    candidates.append((tool, record, bytes.fromhex(record["result_hash"]), executed_at))
+                elif "result" in record:
+                    # Written before results moved to tool_call_payloads
+                    memo._seed(tool, record.get("arguments") or {}, record["result"], encode_payload(record["result"]).hash, executed_at)
+        if not candidates:
+            return memo
+
+        # Written in the same transaction as the message that references them
+        with reading_from_primary(db):
+            results = await ToolCallPayloadRepository().get_many(db, (result_hash for _, _, result_hash, _ in candidates))
+        for tool, record, result_hash, executed_at in candidates:
+            if result_hash in results:
+                memo._seed(tool, record.get("arguments") or {}, results[result_hash], result_hash, executed_at)
+        return memo
+
+    def _seed(self, tool: Tool, arguments: Dict[str, Any], result: Any, result_hash: bytes, executed_at: float) -> None:
+        key = self._key(tool, arguments)
+        existing = self.entries.get(key) if key else None
+        if key and (existing is None or existing.executed_at < executed_at):
+            self.entries[key] = MemoEntry(result, result_hash, executed_at, arguments.get("community_id"))
+
+    @staticmethod
+    def _key(tool: Tool, arguments: Dict[str, Any]) -> Optional[str]:
+        try:
+            return f"{tool.name}:{canonical_json(tool.validate(arguments))}"
+        except ValidationError:
+            return None
+
+    def lookup(self, tool: Tool, arguments: Dict[str, Any]) -> Optional[MemoEntry]:
+        if not tool.policy.cache_ttl_seconds:
+            return None
+        if not inventory_cache.live:
+            lookups_counter.inc(tool=tool.name, outcome="bypass")
+            return None
+
+        key = self._key(tool, arguments)
+        entry = self.entries.get(key) if key else None
+        if entry is None:
+            outcome = "miss"
+        elif time.time() - entry.executed_at >= tool.policy.cache_ttl_seconds:
+            outcome = "expired"
+        elif entry.community_id and entry.executed_at <= inventory_cache.invalidated_at(entry.community_id):
+            outcome = "invalidated"
+        else:
+            lookups_counter.inc(tool=tool.name, outcome="hit")
+            self.saved += 1
+            return entry
+
+        lookups_counter.inc(tool=tool.name, outcome=outcome)
+        if outcome != "miss":
+            del self.entries[key]
+        return None
+
+    def store(self, tool: Tool, arguments: Dict[str, Any], result: Any, result_hash: bytes, executed_at: float) -> None:
+        if not tool.policy.cache_ttl_seconds or (isinstance(result, dict) and "error" in result):
+            return
+        key = self._key(tool, arguments)
+        if key:
+            self.entries[key] = MemoEntry(result, result_hash, executed_at, arguments.get("community_id"))
+
+    def report(self) -> None:
+        saved_histogram.observe(self.saved)
+        if self.saved:
+            logger.info(f"Tool memo - Conversation: {self.conversation_id}, Saved this turn: {self.saved}, Saved in conversation: {self.saved_before + self.saved}")
@@ -0,0 +1,262 @@
+import asyncio
+import inspect
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError, create_model
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.admission import acquire_within
+from core.circuit_breaker import CircuitBreaker
+from core.logging import get_logger
+from core.metrics import registry
+
+logger = get_logger(__name__)
+
+calls_counter = registry.counter(
+    "tool_calls_total", "Tool executions by outcome", ["tool", "outcome"]
+)
+duration_histogram = registry.histogram(
+    "tool_duration_seconds", "Tool execution time, including waiting for a concurrency slot", ["tool"]
+)
+in_flight_gauge = registry.gauge(
+    "tool_in_flight", "Tool executions currently holding a concurrency slot", ["tool"]
+)
+
+# Transaction-local, so rolling back the tool's savepoint restores the previous value
+SET_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout_ms, true)")
+
+# The database cancels a slow statement at the tool's timeout; this much
+# later the tool is cancelled client-side (it is not waiting on a query)
+BACKSTOP_GRACE_SECONDS = 1.0
+
+# Parameters every tool accepts that are supplied by the caller, never by the model
+CONTEXT_PARAMETERS = {"db", "conversation_id", "request_id"}
+
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    """
+    Execution limits declared with each tool. ``cache_ttl_seconds`` is how
+    long a result may be reused for the same arguments; 0 means never.
+    ``max_concurrency`` caps concurrent executions of the tool across the
+    process, so one slow tool cannot take every pool connection.
+    ``slow_call_seconds`` is the latency its circuit breaker counts as slow.
+    """
+    timeout_seconds: float
+    cache_ttl_seconds: float
+    max_concurrency: int
+    slow_call_seconds: float
+
+
+@dataclass
+class Tool:
+    name: str
+    description: str
+    func: Callable[..., Any]
+    arguments_model: Type[BaseModel]
+    schema: Dict[str, Any]
+    policy: ToolPolicy
+    semaphore: asyncio.Semaphore
+    breaker: CircuitBreaker
+
+    def validate(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse model-supplied arguments into the tool's declared types."""
+        return dict(self.arguments_model.model_validate(arguments))
+
+
+def _strip_titles(schema: Any) -> Any:
+    # Pydantic titles every model and property; they only cost prompt tokens
+    if isinstance(schema, dict):
+        return {key: _strip_titles(value) for key, value in schema.items() if key != "title"}
+    if isinstance(schema, list):
+        return [_strip_titles(item) for item in schema]
+    return schema
+
+
+def _arguments_model(name: str, func: Callable[..., Any]) -> Type[BaseModel]:
+    """
+    A pydantic model of the tool's model-facing parameters, built from its
+    signature. Parameter descriptions come from ``Annotated[..., Field()]``.
+    """
+    fields = {}
+    for parameter in inspect.signature(func).parameters.values():
+        if parameter.name in CONTEXT_PARAMETERS:
+            continue
+        default = ... if parameter.default is inspect.Parameter.empty else parameter.default
+        fields[parameter.name] = (parameter.annotation, default)
+    return create_model(f"{name}_arguments", **fields)
+
+
+def degraded_result(tool: Tool, reason: str, retry_after_seconds: float = 0) -> Dict[str, Any]:
+    """What the model sees instead of a result when a tool is unavailable."""
+    return {
+        "error": f"{tool.name} is temporarily unavailable ({reason}). Do not guess the answer; tell the lead you will follow up or offer to connect them with the leasing team.",
+        "degraded": True,
+        "retry_after_seconds": round(retry_after_seconds),
+    }
+
+
+@asynccontextmanager
+async def read_only_savepoint(db: AsyncSession, timeout_seconds: float) -> AsyncIterator[None]:
+    """
+    Run a tool on the caller's session inside a SAVEPOINT with its timeout
+    as ``statement_timeout``. The savepoint is always rolled back (tools
+    only read), which also restores the timeout and recovers the
+    transaction after a cancelled statement.
+    """
+    savepoint = await db.begin_nested()
+    try:
+        await db.execute(SET_STATEMENT_TIMEOUT, {"timeout_ms": str(max(1, int(timeout_seconds * 1000)))})
+        yield
+    finally:
+        await savepoint.rollback()
+
+
+class ToolRegistry:
+    """
+    Tools the LLM may call, keyed by name. Registering a tool builds its
+    JSON schema and argument validator once, at import.
+
+    Tools run on the caller's session, so a turn never holds a second pool
+    connection; their timeouts are enforced by the database, which leaves
+    the session usable after a slow query is cancelled.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+
+    def tool(
+        self,
+        description: str,
+        timeout_seconds: float,
+        cache_ttl_seconds: float = 0,
+        max_concurrency: int = 16,
+        slow_call_seconds: Optional[float] = None,
+        name: Optional[str] = None,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Register the decorated coroutine function; it is returned unchanged."""
+        def register(func: Callable[..., Any]) -> Callable[..., Any]:
+            tool_name = name or func.__name__
+            if tool_name in self._tools:
+                raise ValueError(f"Tool already registered: {tool_name}")
+            arguments_model = _arguments_model(tool_name, func)
+            policy = ToolPolicy(timeout_seconds, cache_ttl_seconds, max_concurrency, slow_call_seconds or timeout_seconds / 2)
+            self._tools[tool_name] = Tool(
+                name=tool_name,
+                description=description,
+                func=func,
+                arguments_model=arguments_model,
+                schema={
+                    "type": "function",
+                    "function": {
+                        "name": tool_name,
+                        "description": description,
+                        "parameters": _strip_titles(arguments_model.model_json_schema()),
+                    },
+                },
+                policy=policy,
+                semaphore=asyncio.Semaphore(max_concurrency),
+                breaker=CircuitBreaker(
+                    f"tool:{tool_name}",
+                    window=settings.TOOL_BREAKER_WINDOW,
+                    min_calls=settings.TOOL_BREAKER_MIN_CALLS,
+                    failure_rate=settings.TOOL_BREAKER_FAILURE_RATE,
+                    slow_call_seconds=policy.slow_call_seconds,
+                    slow_call_rate=settings.TOOL_BREAKER_SLOW_CALL_RATE,
+                    open_seconds=settings.TOOL_BREAKER_OPEN_SECONDS,
+                ),
+            )
+            return func
+        return register
+
+    def __getitem__(self, name: str) -> Tool:
+        return self._tools[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        return [tool.schema for tool in self._tools.values()]
+
+    async def execute(self, db: AsyncSession, name: str, arguments: Dict[str, Any], **context: Any) -> Dict[str, Any]:
+        """
+        Validate ``arguments`` and run the tool behind its circuit breaker,
+        within its concurrency limit and timeout (which includes time spent
+        waiting for a slot). Problems are returned as ``{"error": ...}`` for
+        the model to read, as the tools themselves do; an open breaker or a
+        timeout gives a degraded result straight away.
+
+        The tools catch their own errors, so a statement the database
+        cancelled comes back as an error result; one that arrives at or
+        past the timeout is counted as a timeout.
+        """
+        tool = self._tools.get(name)
+        if tool is None:
+            logger.error(f"Unknown function called: {name}")
+            return {"error": f"Unknown function: {name}"}
+
+        try:
+            values = tool.validate(arguments)
+        except ValidationError as e:
+            logger.warning(f"Invalid arguments for {name}: {arguments} - {e.error_count()} errors")
+            calls_counter.inc(tool=name, outcome="invalid")
+            return {"error": f"Invalid arguments for {name}: {e}"}
+
+        if not tool.breaker.allow():
+            calls_counter.inc(tool=name, outcome="rejected")
+            logger.warning(f"Tool {name} rejected - Circuit open, retry in {tool.breaker.retry_after():.0f}s")
+            return degraded_result(tool, "circuit open", tool.breaker.retry_after())
+
+        timeout_seconds = tool.policy.timeout_seconds
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            if not await acquire_within(tool.semaphore, timeout_seconds):
+                outcome = "timeout"
+                logger.error(f"Tool {name} timed out after {timeout_seconds}s waiting for a concurrency slot")
+                return degraded_result(tool, f"timed out after {timeout_seconds}s")
+            try:
+                in_flight_gauge.inc(tool=name)
+                remaining = timeout_seconds - (time.perf_counter() - start_time)
+                result = await asyncio.wait_for(self._run(tool, db, values, context, remaining), remaining + BACKSTOP_GRACE_SECONDS)
+            finally:
+                in_flight_gauge.dec(tool=name)
+                tool.semaphore.release()
+
+            if not (isinstance(result, dict) and "error" in result):
+                outcome = "success"
+            elif time.perf_counter() - start_time >= timeout_seconds:
+                outcome = "timeout"
+                logger.error(f"Tool {name} timed out after {timeout_seconds}s: {result['error']}")
+                return degraded_result(tool, f"timed out after {timeout_seconds}s")
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            logger.error(f"Tool {name} cancelled {BACKSTOP_GRACE_SECONDS}s past its {timeout_seconds}s timeout")
+            # Cancelled mid-call, possibly mid-statement: the connection's
+            # state is unknown, so roll back and let the turn reconnect.
+            await db.rollback()
+            return degraded_result(tool, f"timed out after {timeout_seconds}s")
+        except Exception as e:
+            logger.error(f"Tool {name} failed with error: {e}")
+            return {"error": f"Tool execution failed: {e}"}
+        finally:
+            seconds = time.perf_counter() - start_time
+            tool.breaker.record(outcome == "success", seconds)
+            calls_counter.inc(tool=name, outcome=outcome)
+            duration_histogram.observe(seconds, tool=name)
+
+    async def _run(self, tool: Tool, db: AsyncSession, values: Dict[str, Any], context: Dict[str, Any], timeout_seconds: float) -> Dict[str, Any]:
+        async with read_only_savepoint(db, timeout_seconds):
+            return await tool.func(db, **values, **context)
+
+
+tool_registry = ToolRegistry()
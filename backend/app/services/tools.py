@@ -1,14 +1,21 @@
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import Annotated, List, Dict, Any, Literal, Optional
+from datetime import datetime, timezone
 import time
+from pydantic import AwareDatetime, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from db.repository import UnitRepository, PetPolicyRepository, UnitPricingRepository, TourSlotRepository, ToolCallRepository
+from db.repository import UnitRepository, PetPolicyRepository, UnitPricingRepository, TourSlotRepository, AvailabilitySummaryRepository
+from services.inventory import UnitSearch, inventory_cache
+from services.tool_audit import tool_audit_logger
+from services.tool_registry import tool_registry
+from services.tour_slots import tour_slot_cache
 from core.logging import get_logger
 
 logger = get_logger(__name__)
 
-async def log_tool_call(
-    db: AsyncSession,
+CommunityId = Annotated[str, Field(description="The community ID")]
+MoveInDate = Annotated[datetime, Field(description="Move-in date in YYYY-MM-DD format", json_schema_extra={"format": "date"})]
+
+def log_tool_call(
     function_name: str,
     arguments: Dict[str, Any],
     response: Dict[str, Any],
@@ -16,28 +23,31 @@ async def log_tool_call(
     success: bool,
     error_message: Optional[str] = None,
     conversation_id: Optional[str] = None,
-    request_id: Optional[str] = None
+    request_id: Optional[str] = None,
+    memoized: bool = False
 ) -> None:
-    try:
-        tool_call_repo = ToolCallRepository()
-        tool_call_data = {
-            "function_name": function_name,
-            "arguments": arguments,
-            "response": response,
-            "execution_time_ms": execution_time_ms,
-            "success": success,
-            "error_message": error_message,
-            "conversation_id": conversation_id,
-            "request_id": request_id
-        }
-        await tool_call_repo.create(db, tool_call_data)
-    except Exception as e:
-        logger.error(f"Failed to log tool call for {function_name}: {e}")
+    """Hand the call to the background audit logger; the tool does not wait for the write."""
+    tool_audit_logger.submit({
+        "function_name": function_name,
+        "arguments": arguments,
+        "response": response,
+        "execution_time_ms": execution_time_ms,
+        "success": success,
+        "error_message": error_message,
+        "conversation_id": conversation_id,
+        "request_id": request_id,
+        "memoized": memoized,
+        "created_at": datetime.now(timezone.utc)
+    })
 
+@tool_registry.tool(
+    "Check available units in a community by bedroom count",
+    timeout_seconds=5, cache_ttl_seconds=60, max_concurrency=32,
+)
 async def check_availability(
     db: AsyncSession, 
-    community_id: str, 
-    bedrooms: int,
+    community_id: Annotated[str, Field(description="The community ID to search in")], 
+    bedrooms: Annotated[int, Field(description="Number of bedrooms requested")],
     conversation_id: Optional[str] = None,
     request_id: Optional[str] = None
 ) -> Dict[str, Any]:
@@ -48,15 +58,13 @@ async def check_availability(
     logger.info(f"Checking availability - Community: {community_id}, Bedrooms: {bedrooms}")
     
     try:
-        unit_repo = UnitRepository()
-        available_units = await unit_repo.get_available_units(db, community_id)
-        logger.info(f"Retrieved {len(available_units)} total available units")
-        
-        filtered_units = [
-            unit for unit in available_units 
-            if unit.bedrooms == bedrooms
-        ]
-        logger.info(f"Filtered to {len(filtered_units)} units with {bedrooms} bedrooms")
+        inventory = await inventory_cache.get(db, community_id)
+        if inventory is not None:
+            filtered_units = inventory.available_units(bedrooms)
+        else:
+            unit_repo = UnitRepository()
+            filtered_units = await unit_repo.get_available_units_by_bedrooms(db, community_id, bedrooms)
+        logger.info(f"Retrieved {len(filtered_units)} available units with {bedrooms} bedrooms")
         
         units_data = [
             {
@@ -80,8 +88,8 @@ async def check_availability(
         execution_time_ms = int((time.time() - start_time) * 1000)
         logger.info(f"Availability check completed - Returning {len(units_data)} matching units in {execution_time_ms}ms")
         
-        await log_tool_call(
-            db, function_name, arguments, result, execution_time_ms, True,
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
             conversation_id=conversation_id, request_id=request_id
         )
         
@@ -99,17 +107,88 @@ async def check_availability(
         
         logger.error(f"Error checking availability - Community: {community_id}, Bedrooms: {bedrooms}, Error: {e}")
         
-        await log_tool_call(
-            db, function_name, arguments, error_result, execution_time_ms, False,
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
+            error_message=str(e), conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return error_result
+
+@tool_registry.tool(
+    "Overview of available units in a community per bedroom count: number available, rent range, square footage range and earliest move-in date. Use for general questions like 'what do you have?'",
+    timeout_seconds=5, cache_ttl_seconds=60, max_concurrency=32,
+)
+async def get_availability_summary(
+    db: AsyncSession,
+    community_id: Annotated[str, Field(description="The community ID to summarize")],
+    conversation_id: Optional[str] = None,
+    request_id: Optional[str] = None
+) -> Dict[str, Any]:
+    function_name = "get_availability_summary"
+    arguments = {"community_id": community_id}
+    start_time = time.time()
+    
+    logger.info(f"Getting availability summary - Community: {community_id}")
+    
+    try:
+        summary_repo = AvailabilitySummaryRepository()
+        summaries = await summary_repo.get_by_community(db, community_id)
+        
+        bedroom_options = [
+            {
+                "bedrooms": summary.bedrooms,
+                "available_units": summary.available_units,
+                "min_rent": summary.min_rent,
+                "max_rent": summary.max_rent,
+                "min_square_feet": summary.min_square_feet,
+                "max_square_feet": summary.max_square_feet,
+                "earliest_available_date": summary.earliest_available_date
+            }
+            for summary in summaries
+        ]
+        
+        result = {
+            "community_id": community_id,
+            "bedroom_options": bedroom_options,
+            "total_available": sum(option["available_units"] for option in bedroom_options)
+        }
+        
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        logger.info(f"Availability summary completed - {len(bedroom_options)} bedroom options, {result['total_available']} units in {execution_time_ms}ms")
+        
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
+            conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return result
+        
+    except Exception as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        error_result = {
+            "community_id": community_id,
+            "bedroom_options": [],
+            "total_available": 0,
+            "error": str(e)
+        }
+        
+        logger.error(f"Error getting availability summary - Community: {community_id}, Error: {e}")
+        
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
             error_message=str(e), conversation_id=conversation_id, request_id=request_id
         )
         
         return error_result
 
+@tool_registry.tool(
+    "Check pet policy for a specific pet type in a community",
+    timeout_seconds=5, cache_ttl_seconds=300, max_concurrency=32,
+)
 async def check_pet_policy(
     db: AsyncSession, 
-    community_id: str, 
-    pet_type: str,
+    community_id: Annotated[str, Field(description="The community ID to check policy for")], 
+    pet_type: Annotated[str, Field(description="Type of pet (e.g., 'cat', 'dog')")],
     conversation_id: Optional[str] = None,
     request_id: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
@@ -120,16 +199,20 @@ async def check_pet_policy(
     logger.info(f"Checking pet policy - Community: {community_id}, Pet type: {pet_type}")
     
     try:
-        pet_policy_repo = PetPolicyRepository()
-        policy = await pet_policy_repo.get_by_pet_type(db, community_id, pet_type)
+        inventory = await inventory_cache.get(db, community_id)
+        if inventory is not None:
+            policy = inventory.pet_policy(pet_type)
+        else:
+            pet_policy_repo = PetPolicyRepository()
+            policy = await pet_policy_repo.get_by_pet_type(db, community_id, pet_type)
         
         if not policy:
             execution_time_ms = int((time.time() - start_time) * 1000)
             result = None
             logger.info(f"No pet policy found - Community: {community_id}, Pet type: {pet_type}")
             
-            await log_tool_call(
-                db, function_name, arguments, {"policy_found": False}, execution_time_ms, True,
+            log_tool_call(
+                function_name, arguments, {"policy_found": False}, execution_time_ms, True,
                 conversation_id=conversation_id, request_id=request_id
             )
             
@@ -147,8 +230,8 @@ async def check_pet_policy(
         execution_time_ms = int((time.time() - start_time) * 1000)
         logger.info(f"Pet policy found - Community: {community_id}, Pet type: {pet_type}, Allowed: {policy.allowed} in {execution_time_ms}ms")
         
-        await log_tool_call(
-            db, function_name, arguments, result, execution_time_ms, True,
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
             conversation_id=conversation_id, request_id=request_id
         )
         
@@ -164,18 +247,33 @@ async def check_pet_policy(
         
         logger.error(f"Error checking pet policy - Community: {community_id}, Pet type: {pet_type}, Error: {e}")
         
-        await log_tool_call(
-            db, function_name, arguments, error_result, execution_time_ms, False,
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
             error_message=str(e), conversation_id=conversation_id, request_id=request_id
         )
         
         return error_result
 
+def _pricing_result(pricing) -> Dict[str, Any]:
+    return {
+        "unit_id": pricing.unit_id,
+        "rent": pricing.rent,
+        "move_in_date": pricing.move_in_date,
+        "special_offer": pricing.special_offer,
+        "special_discount": pricing.special_discount,
+        "effective_date": pricing.effective_date,
+        "expires_date": pricing.expires_date
+    }
+
+@tool_registry.tool(
+    "Get pricing information for a specific unit",
+    timeout_seconds=5, cache_ttl_seconds=60, max_concurrency=32,
+)
 async def get_pricing(
     db: AsyncSession, 
-    community_id: str, 
-    unit_id: str, 
-    move_in_date: datetime,
+    community_id: CommunityId, 
+    unit_id: Annotated[str, Field(description="The unit ID to get pricing for")], 
+    move_in_date: MoveInDate,
     conversation_id: Optional[str] = None,
     request_id: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
@@ -186,36 +284,32 @@ async def get_pricing(
     logger.info(f"Getting pricing - Community: {community_id}, Unit: {unit_id}, Move-in: {move_in_date.date()}")
     
     try:
-        pricing_repo = UnitPricingRepository()
-        pricing = await pricing_repo.get_current_pricing(db, unit_id, move_in_date)
+        inventory = await inventory_cache.get(db, community_id)
+        if inventory is not None:
+            pricing = inventory.current_pricing(unit_id, move_in_date)
+        else:
+            pricing_repo = UnitPricingRepository()
+            pricing = await pricing_repo.get_current_pricing(db, community_id, unit_id, move_in_date)
         
         if not pricing:
             execution_time_ms = int((time.time() - start_time) * 1000)
             result = None
             logger.info(f"No pricing found - Unit: {unit_id}, Move-in: {move_in_date.date()}")
             
-            await log_tool_call(
-                db, function_name, arguments, {"pricing_found": False}, execution_time_ms, True,
+            log_tool_call(
+                function_name, arguments, {"pricing_found": False}, execution_time_ms, True,
                 conversation_id=conversation_id, request_id=request_id
             )
             
             return result
         
-        result = {
-            "unit_id": pricing.unit_id,
-            "rent": pricing.rent,
-            "move_in_date": pricing.move_in_date,
-            "special_offer": pricing.special_offer,
-            "special_discount": pricing.special_discount,
-            "effective_date": pricing.effective_date,
-            "expires_date": pricing.expires_date
-        }
+        result = _pricing_result(pricing)
         
         execution_time_ms = int((time.time() - start_time) * 1000)
         logger.info(f"Pricing found - Unit: {unit_id}, Rent: ${pricing.rent}, Special: {pricing.special_offer or 'None'} in {execution_time_ms}ms")
         
-        await log_tool_call(
-            db, function_name, arguments, result, execution_time_ms, True,
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
             conversation_id=conversation_id, request_id=request_id
         )
         
@@ -231,8 +325,170 @@ async def get_pricing(
         
         logger.error(f"Error getting pricing - Unit: {unit_id}, Move-in: {move_in_date.date()}, Error: {e}")
         
-        await log_tool_call(
-            db, function_name, arguments, error_result, execution_time_ms, False,
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
+            error_message=str(e), conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return error_result
+
+@tool_registry.tool(
+    "Get current pricing for several units at once; use instead of repeated get_pricing calls when comparing units",
+    timeout_seconds=10, cache_ttl_seconds=60, max_concurrency=16,
+)
+async def get_pricing_bulk(
+    db: AsyncSession,
+    community_id: CommunityId,
+    unit_ids: Annotated[List[str], Field(max_length=50, description="The unit IDs to get pricing for, at most 50")],
+    move_in_date: MoveInDate,
+    conversation_id: Optional[str] = None,
+    request_id: Optional[str] = None
+) -> Dict[str, Any]:
+    function_name = "get_pricing_bulk"
+    arguments = {"community_id": community_id, "unit_ids": unit_ids, "move_in_date": move_in_date.isoformat()}
+    start_time = time.time()
+    
+    logger.info(f"Getting bulk pricing - Community: {community_id}, Units: {len(unit_ids)}, Move-in: {move_in_date.date()}")
+    
+    try:
+        inventory = await inventory_cache.get(db, community_id)
+        if inventory is not None:
+            pricing_by_unit = {}
+            for unit_id in unit_ids:
+                pricing = inventory.current_pricing(unit_id, move_in_date)
+                if pricing is not None:
+                    pricing_by_unit[unit_id] = pricing
+        else:
+            pricing_repo = UnitPricingRepository()
+            pricing_by_unit = await pricing_repo.get_current_pricing_bulk(db, community_id, unit_ids, move_in_date)
+        
+        result = {
+            "pricing": [_pricing_result(pricing_by_unit[unit_id]) for unit_id in unit_ids if unit_id in pricing_by_unit],
+            "units_without_pricing": [unit_id for unit_id in unit_ids if unit_id not in pricing_by_unit]
+        }
+        
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        logger.info(f"Bulk pricing found - Priced: {len(result['pricing'])}/{len(unit_ids)} units in {execution_time_ms}ms")
+        
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
+            conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return result
+        
+    except Exception as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        error_result = {
+            "pricing": [],
+            "units_without_pricing": unit_ids,
+            "error": str(e)
+        }
+        
+        logger.error(f"Error getting bulk pricing - Units: {unit_ids}, Move-in: {move_in_date.date()}, Error: {e}")
+        
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
+            error_message=str(e), conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return error_result
+
+@tool_registry.tool(
+    "Search available units in a community by any combination of bedrooms, bathrooms, rent range, square footage and move-in date, ranked by what the lead cares about most. Prefer this over check_availability when the lead states a budget, size or date",
+    timeout_seconds=5, cache_ttl_seconds=60, max_concurrency=32,
+)
+async def search_units(
+    db: AsyncSession,
+    community_id: CommunityId,
+    bedrooms: Annotated[Optional[int], Field(description="Exact number of bedrooms")] = None,
+    min_bathrooms: Annotated[Optional[float], Field(description="Minimum number of bathrooms")] = None,
+    min_rent: Annotated[Optional[int], Field(description="Minimum monthly rent in dollars")] = None,
+    max_rent: Annotated[Optional[int], Field(description="Maximum monthly rent in dollars")] = None,
+    min_square_feet: Annotated[Optional[int], Field(description="Minimum square footage")] = None,
+    max_square_feet: Annotated[Optional[int], Field(description="Maximum square footage")] = None,
+    available_by: Annotated[Optional[datetime], Field(description="Latest acceptable move-in date in YYYY-MM-DD format; rent is quoted for this date", json_schema_extra={"format": "date"})] = None,
+    sort_by: Annotated[Literal["rent", "square_feet", "available_date"], Field(description="Rank by lowest rent, largest size or soonest availability")] = "rent",
+    limit: Annotated[int, Field(ge=1, le=20, description="Maximum number of units to return")] = 5,
+    conversation_id: Optional[str] = None,
+    request_id: Optional[str] = None
+) -> Dict[str, Any]:
+    function_name = "search_units"
+    search = UnitSearch(bedrooms, min_bathrooms, min_rent, max_rent, min_square_feet, max_square_feet, available_by, sort_by)
+    criteria = {key: value for key, value in search._asdict().items() if value is not None}
+    if available_by is not None:
+        criteria["available_by"] = available_by.isoformat()
+    arguments = {"community_id": community_id, **criteria, "limit": limit}
+    move_in_date = available_by or datetime.now(timezone.utc)
+    start_time = time.time()
+    
+    logger.info(f"Searching units - Community: {community_id}, Criteria: {criteria}, Limit: {limit}")
+    
+    try:
+        inventory = await inventory_cache.get(db, community_id)
+        if inventory is not None:
+            matches, total_matches = inventory.search_units(search, move_in_date, limit)
+            units_data = [
+                {
+                    "id": match.unit.id,
+                    "unit_number": match.unit.unit_number,
+                    "bedrooms": match.unit.bedrooms,
+                    "bathrooms": match.unit.bathrooms,
+                    "square_feet": match.unit.square_feet,
+                    "rent": match.rent,
+                    "special_offer": match.special_offer,
+                    "available_date": match.unit.available_date.isoformat() if match.unit.available_date else None
+                }
+                for match in matches
+            ]
+        else:
+            unit_repo = UnitRepository()
+            rows, total_matches = await unit_repo.search_available_units(db, community_id, move_in_date, limit=limit, **search._asdict())
+            units_data = [
+                {
+                    "id": row.id,
+                    "unit_number": row.unit_number,
+                    "bedrooms": row.bedrooms,
+                    "bathrooms": row.bathrooms,
+                    "square_feet": row.square_feet,
+                    "rent": row.rent,
+                    "special_offer": row.special_offer,
+                    "available_date": row.available_date.isoformat() if row.available_date else None
+                }
+                for row in rows
+            ]
+        
+        result = {
+            "units": units_data,
+            "total_matches": total_matches,
+            "community_id": community_id,
+            "criteria": criteria
+        }
+        
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        logger.info(f"Unit search completed - Returning {len(units_data)} of {total_matches} matching units in {execution_time_ms}ms")
+        
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
+            conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return result
+        
+    except Exception as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        error_result = {
+            "units": [],
+            "total_matches": 0,
+            "community_id": community_id,
+            "criteria": criteria,
+            "error": str(e)
+        }
+        
+        logger.error(f"Error searching units - Community: {community_id}, Criteria: {criteria}, Error: {e}")
+        
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
             error_message=str(e), conversation_id=conversation_id, request_id=request_id
         )
         
@@ -287,8 +543,8 @@ async def get_available_tour_slots(
         execution_time_ms = int((time.time() - start_time) * 1000)
         logger.info(f"Tour slots lookup completed - Returning {len(slots_data)} available slots in {execution_time_ms}ms")
         
-        await log_tool_call(
-            db, function_name, arguments, result, execution_time_ms, True,
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
             conversation_id=conversation_id, request_id=request_id
         )
         
@@ -309,8 +565,78 @@ async def get_available_tour_slots(
         
         logger.error(f"Error getting tour slots - Community: {community_id}, Range: {start_date.date()} to {end_date.date()}, Error: {e}")
         
-        await log_tool_call(
-            db, function_name, arguments, error_result, execution_time_ms, False,
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
+            error_message=str(e), conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return error_result
+
+@tool_registry.tool(
+    "Find open tour slots closest to a preferred time. Only propose tour times returned by this tool",
+    timeout_seconds=5, max_concurrency=32,
+)
+async def find_tour_slots(
+    db: AsyncSession,
+    community_id: CommunityId,
+    preferred_time: Annotated[Optional[AwareDatetime], Field(description="Preferred tour time in ISO 8601 format including its UTC offset, e.g. 2024-03-15T14:00-05:00; omit for the next open slots")] = None,
+    limit: Annotated[int, Field(ge=1, le=20, description="Maximum number of slots to return")] = 5,
+    conversation_id: Optional[str] = None,
+    request_id: Optional[str] = None
+) -> Dict[str, Any]:
+    function_name = "find_tour_slots"
+    now = datetime.now(timezone.utc)
+    preferred_time = preferred_time or now
+    arguments = {"community_id": community_id, "preferred_time": preferred_time.isoformat(), "limit": limit}
+    start_time = time.time()
+    
+    logger.info(f"Finding tour slots - Community: {community_id}, Preferred: {preferred_time.isoformat()}, Limit: {limit}")
+    
+    try:
+        index = await tour_slot_cache.get(db, community_id)
+        slots = index.nearest(preferred_time, limit, now=now)
+        
+        slots_data = [
+            {
+                "id": slot.id,
+                "start_time": slot.start_time.isoformat(),
+                "end_time": slot.end_time.isoformat(),
+                "available_spots": slot.available_spots
+            }
+            for slot in slots
+        ]
+        
+        result = {
+            "slots": slots_data,
+            "total_count": len(slots_data),
+            "community_id": community_id,
+            "preferred_time": preferred_time.isoformat()
+        }
+        
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        logger.info(f"Tour slot search completed - Returning {len(slots_data)} slots in {execution_time_ms}ms")
+        
+        log_tool_call(
+            function_name, arguments, result, execution_time_ms, True,
+            conversation_id=conversation_id, request_id=request_id
+        )
+        
+        return result
+        
+    except Exception as e:
+        execution_time_ms = int((time.time() - start_time) * 1000)
+        error_result = {
+            "slots": [],
+            "total_count": 0,
+            "community_id": community_id,
+            "preferred_time": preferred_time.isoformat(),
+            "error": str(e)
+        }
+        
+        logger.error(f"Error finding tour slots - Community: {community_id}, Preferred: {preferred_time.isoformat()}, Error: {e}")
+        
+        log_tool_call(
+            function_name, arguments, error_result, execution_time_ms, False,
             error_message=str(e), conversation_id=conversation_id, request_id=request_id
         )
         
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.logging import get_logger
+from core.metrics import registry
+from db.notifications import notification_listener
+from db.repository import TourSlotRepository
+from db.routing import reading_from_primary
+from services.inventory import ALL_COMMUNITIES
+
+logger = get_logger(__name__)
+
+TOUR_SLOTS_CHANNEL = "tour_slots_changed"
+
+load_histogram = registry.histogram(
+    "tour_slot_index_load_seconds", "Time to build a community tour slot index", ["kind"]
+)
+invalidations_counter = registry.counter(
+    "tour_slot_index_invalidations_total", "Tour slot index invalidations received", ["scope"]
+)
+lookups_counter = registry.counter(
+    "tour_slot_index_lookups_total", "Tour slot index lookups by outcome", ["outcome"]
+)
+
+
+class SlotRecord(NamedTuple):
+    id: str
+    start_time: datetime
+    end_time: datetime
+    available_spots: int
+
+
+class TourSlotIndex:
+    """
+    A community's open tour slots sorted by start time, with the start
+    times as a parallel list of timestamps so lookups are a bisect.
+    """
+
+    __slots__ = ("community_id", "version", "loaded_at", "slots", "starts")
+
+    def __init__(self, community_id: str, version: int, slots: Sequence[SlotRecord]):
+        self.community_id = community_id
+        self.version = version
+        self.loaded_at = time.time()
+        self.slots = tuple(slots)
+        self.starts = [slot.start_time.timestamp() for slot in self.slots]
+
+    def nearest(self, preferred: datetime, limit: int, now: Optional[datetime] = None) -> List[SlotRecord]:
+        """
+        Up to ``limit`` open slots starting closest to ``preferred``, on
+        either side of it (ties go to the later slot), returned in start
+        order. Slots that have already started are skipped. ``preferred``
+        must carry its UTC offset; slot times are absolute, and a naive
+        time could be hours off in the community's timezone.
+        """
+        if preferred.tzinfo is None:
+            raise ValueError("preferred time must include a UTC offset")
+        starts = self.starts
+        floor = bisect_left(starts, (now or datetime.now(timezone.utc)).timestamp())
+        target = preferred.timestamp()
+        right = max(bisect_left(starts, target), floor)
+        left = right - 1
+        picked = []
+        while len(picked) < limit and (left >= floor or right < len(starts)):
+            if right >= len(starts) or (left >= floor and target - starts[left] < starts[right] - target):
+                picked.append(left)
+                left -= 1
+            else:
+                picked.append(right)
+                right += 1
+        return [self.slots[i] for i in sorted(picked)]
+
+
+class TourSlotCache:
+    """
+    Per-community tour slot indexes, invalidated by a trigger on tour_slots
+    via LISTEN/NOTIFY whenever a slot is booked, cancelled or edited. While
+    the listener is down every lookup builds a fresh index that is not
+    kept, since invalidations could be missed.
+    """
+
+    def __init__(self):
+        self.live = False
+        self._indexes: Dict[str, TourSlotIndex] = {}
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def invalidate(self, community_id: str) -> None:
+        if community_id == ALL_COMMUNITIES:
+            self.invalidate_all()
+            return
+        invalidations_counter.inc(scope="community")
+        self._versions[community_id] += 1
+
+    def invalidate_all(self) -> None:
+        invalidations_counter.inc(scope="all")
+        for community_id in list(self._versions):
+            self._versions[community_id] += 1
+        self._indexes.clear()
+
+    def set_live(self, live: bool) -> None:
+        self.live = live
+        self.invalidate_all()
+
+    async def get(self, db: AsyncSession, community_id: str) -> TourSlotIndex:
+        if not self.live:
+            lookups_counter.inc(outcome="bypass")
+            return await self._load(db, community_id, self._versions[community_id], "bypass")
+
+        index = self._indexes.get(community_id)
+        if index is not None and index.version == self._versions[community_id]:
+            lookups_counter.inc(outcome="hit")
+            return index
+
+        lock = self._locks.setdefault(community_id, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(community_id)
+            version = self._versions[community_id]
+            if index is not None and index.version == version:
+                lookups_counter.inc(outcome="hit")
+                return index
+
+            kind = "refresh" if index is not None else "cold"
+            lookups_counter.inc(outcome=kind)
+            fresh = await self._load(db, community_id, version, kind)
+            # Same rule as the inventory cache: a load raced by an
+            # invalidation serves this request but is not kept.
+            if self.live and self._versions[community_id] == version:
+                self._indexes[community_id] = fresh
+            return fresh
+
+    async def _load(self, db: AsyncSession, community_id: str, version: int, kind: str) -> TourSlotIndex:
+        start_time = time.perf_counter()
+        # Bookings are written to the primary; a replica may not have them yet
+        with reading_from_primary(db):
+            rows = await TourSlotRepository().get_open_slot_rows(db, community_id, datetime.now(timezone.utc))
+        index = TourSlotIndex(community_id, version, [SlotRecord._make(row) for row in rows])
+        load_time = time.perf_counter() - start_time
+        load_histogram.observe(load_time, kind=kind)
+        logger.info(f"Tour slot index loaded ({kind}) - Community: {community_id}, Slots: {len(index.slots)}, Time: {load_time * 1000:.1f}ms")
+        return index
+
+
+tour_slot_cache = TourSlotCache()
+
+if settings.TOUR_SLOT_INDEX_ENABLED:
+    notification_listener.subscribe(TOUR_SLOTS_CHANNEL, tour_slot_cache.invalidate)
+    notification_listener.on_connect(lambda: tour_slot_cache.set_live(True))
+    notification_listener.on_disconnect(lambda: tour_slot_cache.set_live(False))
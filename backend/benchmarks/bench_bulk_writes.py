@@ -0,0 +1,100 @@
+"""
+Compare single-row repository writes (create / update, one flush each)
+with the set-based create_many / update_many / upsert_many paths, using
+tool_calls rows, and per-call audit logging with the audit logger's
+batched log_many.
+
+    poetry run python benchmarks/bench_bulk_writes.py --rows 5000
+"""
+import argparse
+import asyncio
+import time
+
+from common import SessionLocal
+from sqlalchemy import delete
+
+from config import settings
+from db.repository import ToolCallRepository
+from models import ToolCall
+
+MARKER = "benchmark-bulk-writes"
+
+
+def make_rows(count: int):
+    return [
+        {
+            "function_name": "check_availability",
+            "arguments": {"community_id": "benchmark", "bedrooms": i % 4},
+            "response": {"units": [], "total_count": 0},
+            "execution_time_ms": i % 50,
+            "success": True,
+            "request_id": MARKER,
+        }
+        for i in range(count)
+    ]
+
+
+async def timed(label: str, rows: int, fn) -> None:
+    async with SessionLocal() as db:
+        start = time.perf_counter()
+        await fn(db)
+        await db.commit()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:9.1f} ms   {rows / elapsed:10.0f} rows/s")
+
+
+async def main(count: int) -> None:
+    repo = ToolCallRepository()
+    rows = make_rows(count)
+    ids = []
+
+    async def single_insert(db):
+        for row in rows:
+            tool_call = await repo.create(db, row)
+            ids.append((tool_call.id, tool_call.created_at))
+
+    async def bulk_insert(db):
+        await repo.create_many(db, rows)
+
+    async def single_log(db):
+        for row in rows:
+            await repo.log(db, row)
+
+    async def batched_log(db):
+        for start in range(0, len(rows), settings.TOOL_AUDIT_BATCH_SIZE):
+            await repo.log_many(db, rows[start:start + settings.TOOL_AUDIT_BATCH_SIZE])
+
+    async def single_update(db):
+        for id, _ in ids:
+            await repo.update(db, id, {"success": False, "error_message": "benchmark"})
+
+    async def bulk_update(db):
+        await repo.update_many(db, [{"id": id, "success": True, "error_message": None} for id, _ in ids])
+
+    async def bulk_upsert(db):
+        # tool_calls is partitioned, so its primary key includes created_at
+        await repo.upsert_many(
+            db,
+            [{"id": id, "created_at": created_at, **row} for (id, created_at), row in zip(ids, rows)],
+            conflict_columns=("id", "created_at"),
+        )
+
+    try:
+        await timed("create (row by row)", count, single_insert)
+        await timed("create_many", count, bulk_insert)
+        await timed("update (row by row)", count, single_update)
+        await timed("update_many", count, bulk_update)
+        await timed("upsert_many (all conflicts)", count, bulk_upsert)
+        await timed("log (row by row)", count, single_log)
+        await timed(f"log_many ({settings.TOOL_AUDIT_BATCH_SIZE} per batch)", count, batched_log)
+    finally:
+        async with SessionLocal() as db:
+            await db.execute(delete(ToolCall).where(ToolCall.request_id == MARKER))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
@@ -0,0 +1,42 @@
+"""
+Compare the old check_availability path (load every available Unit ORM
+object, filter bedrooms in Python) with the SQL-filtered projection.
+
+    poetry run python benchmarks/bench_check_availability.py --units 50000
+"""
+import argparse
+import asyncio
+
+from common import SessionLocal, measure, report, scratch_community, seed_units
+
+from db.repository import UnitRepository
+
+
+async def main(units: int, iterations: int) -> None:
+    repo = UnitRepository()
+
+    async with scratch_community("benchmark: check_availability") as community_id:
+        await seed_units(community_id, units)
+        print(f"Seeded {units} units in community {community_id}")
+
+        async with SessionLocal() as db:
+            async def orm_and_python_filter():
+                db.expunge_all()
+                available = await repo.get_available_units(db, community_id)
+                return [unit for unit in available if unit.bedrooms == 2]
+
+            async def sql_filter_and_projection():
+                return await repo.get_available_units_by_bedrooms(db, community_id, 2)
+
+            assert len(await orm_and_python_filter()) == len(await sql_filter_and_projection())
+
+            report("ORM load + Python filter", await measure(orm_and_python_filter, iterations))
+            report("SQL filter + column projection", await measure(sql_filter_and_projection, iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.units, args.iterations))
@@ -0,0 +1,111 @@
+"""
+Compare primary keys generated by the plpgsql nanoid() default with ids
+generated in Python (core.ids), both for id generation alone and for
+message inserts row by row and as multi-row INSERTs.
+
+    poetry run python benchmarks/bench_client_ids.py --rows 5000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from common import SessionLocal, scratch_community
+from sqlalchemy import delete, func, insert, text
+
+from core.ids import nanoid, nanoids
+from db.repository import MessageRepository
+from models import Message
+
+MARKER = "benchmark-client-ids"
+CHUNK_SIZE = 1000
+
+
+def make_rows(conversation_id: str, count: int):
+    return [
+        {
+            "conversation_id": conversation_id,
+            "message_text": f"Do you have a 2 bedroom available in March? ({i})",
+            "reply_text": "Yes, unit 204 is available from March 1st.",
+            "request_id": MARKER,
+            "created_at": datetime.now(timezone.utc),
+        }
+        for i in range(count)
+    ]
+
+
+async def timed(label: str, count: int, unit: str, fn) -> None:
+    async with SessionLocal() as db:
+        start = time.perf_counter()
+        await fn(db)
+        await db.commit()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms   {count / elapsed:10.0f} {unit}/s")
+
+
+async def main(count: int) -> None:
+    repo = MessageRepository()
+    table = Message.__table__
+
+    async with scratch_community("benchmark client ids") as community_id:
+        async with SessionLocal() as db:
+            lead_id = await db.scalar(
+                text("INSERT INTO leads (name, email) VALUES ('Benchmark', :email) RETURNING id"),
+                {"email": f"{MARKER}@example.com"},
+            )
+            conversation_id = await db.scalar(
+                text("INSERT INTO conversations (lead_id, community_id) VALUES (:lead_id, :community_id) RETURNING id"),
+                {"lead_id": lead_id, "community_id": community_id},
+            )
+            await db.commit()
+        rows = make_rows(conversation_id, count)
+
+        async def server_ids(db):
+            await db.execute(text("SELECT nanoid() FROM generate_series(1, :count)"), {"count": count})
+
+        async def client_ids(db):
+            for _ in range(count):
+                nanoid()
+
+        async def client_ids_batched(db):
+            nanoids(count)
+
+        async def server_single(db):
+            # What the ORM did before: INSERT ... RETURNING id to learn the key
+            for row in rows:
+                await db.execute(insert(table).values(id=func.nanoid(), **row).returning(table.c.id))
+
+        async def client_single(db):
+            # The key is known up front, so nothing needs to come back
+            for row in rows:
+                await db.execute(insert(table).values(id=nanoid(), **row))
+
+        async def server_multi_row(db):
+            for start in range(0, count, CHUNK_SIZE):
+                chunk = rows[start:start + CHUNK_SIZE]
+                await db.execute(insert(table).values([{"id": func.nanoid(), **row} for row in chunk]))
+
+        async def client_multi_row(db):
+            await repo.create_many(db, rows, chunk_size=CHUNK_SIZE)
+
+        try:
+            await timed("nanoid() in Postgres", count, "ids", server_ids)
+            await timed("core.ids.nanoid()", count, "ids", client_ids)
+            await timed("core.ids.nanoids(count)", count, "ids", client_ids_batched)
+            await timed("insert, server id (row by row)", count, "rows", server_single)
+            await timed("insert, client id (row by row)", count, "rows", client_single)
+            await timed("insert, server id (multi-row)", count, "rows", server_multi_row)
+            await timed("insert, client id (multi-row)", count, "rows", client_multi_row)
+        finally:
+            async with SessionLocal() as db:
+                await db.execute(delete(Message).where(Message.request_id == MARKER))
+                await db.execute(text("DELETE FROM conversations WHERE id = :id"), {"id": conversation_id})
+                await db.execute(text("DELETE FROM leads WHERE id = :id"), {"id": lead_id})
+                await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
@@ -0,0 +1,93 @@
+"""
+Throughput of leasing system calls against the local stand-in server
+(run here under uvicorn, with injected latency): the old blocking
+``requests.post`` per call, an async client opened per call, and the
+shared pooled ``LeasingClient``. Needs no database.
+
+    poetry run python benchmarks/bench_leasing_client.py --calls 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import common  # noqa: F401  (puts app/ on the path)
+import httpx
+import requests
+import uvicorn
+
+from services.leasing import LeasingClient, ask_clarification
+
+# The stand-in is a test double, kept with the tests
+sys.path.insert(0, str(Path(__file__).parent.parent / "tests"))
+from leasing_standin import create_app  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_standin(latency_seconds: float) -> str:
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(latency_seconds), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+async def run(label: str, calls: int, concurrency: int, call) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await call(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    seconds = time.perf_counter() - start
+    print(f"{label:<40} {calls / seconds:8.1f} calls/s   {seconds * 1000 / calls:8.2f} ms/call wall")
+
+
+async def main(calls: int, concurrency: int, latency_seconds: float) -> None:
+    base_url = start_standin(latency_seconds)
+    print(f"Stand-in at {base_url}, {latency_seconds * 1000:.0f} ms latency, {calls} calls, concurrency {concurrency}")
+
+    async def blocking_requests(i: int) -> None:
+        # What the old module did; it holds the event loop for the whole round trip
+        requests.post(f"{base_url}/clarification/generate", json={"user_message": f"question {i}"}).json()
+
+    async def client_per_call(i: int) -> None:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            (await client.post("/clarification/generate", json={"user_message": f"question {i}"})).json()
+
+    pooled = LeasingClient(
+        base_url=base_url,
+        timeout_seconds=10.0,
+        connect_timeout_seconds=3.0,
+        max_connections=concurrency,
+        max_concurrency=concurrency,
+        max_attempts=3,
+    )
+
+    async def pooled_client(i: int) -> None:
+        await ask_clarification(f"question {i}", client=pooled)
+
+    await run("requests.post per call (blocking)", calls, concurrency, blocking_requests)
+    await run("AsyncClient per call", calls, concurrency, client_per_call)
+    await run("Shared pooled LeasingClient", calls, concurrency, pooled_client)
+    await pooled.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.latency))
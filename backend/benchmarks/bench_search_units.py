@@ -0,0 +1,107 @@
+"""
+Compare answering "2 bedrooms under $2,000, at least 900 sq ft, available
+within 60 days" the way the model had to before search_units (every
+available unit with that bedroom count plus bulk pricing, filtered and
+ranked in Python) against the single ranked query, with and without the
+search indexes, and against the in-memory inventory snapshot.
+
+    poetry run python benchmarks/bench_search_units.py --units 100000
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from common import SessionLocal, measure, report, scratch_community, seed_units
+from sqlalchemy import text
+
+from db.database import engine
+from db.repository import UnitPricingRepository, UnitRepository
+from services.inventory import InventoryCache, UnitSearch
+
+LIMIT = 5
+SEARCH_INDEXES = ("ix_units_search", "ix_units_search_available_date")
+
+
+async def seed_pricing(community_id: str) -> None:
+    # A current move-in price for every third unit, some of them discounted below base rent
+    async with SessionLocal() as db:
+        await db.execute(
+            text("""
+            INSERT INTO unit_pricing (unit_id, move_in_date, rent, special_offer, effective_date)
+            SELECT id,
+                   now() - interval '1 day',
+                   base_rent + CASE WHEN square_feet % 2 = 0 THEN -150 ELSE 75 END,
+                   CASE WHEN square_feet % 2 = 0 THEN 'One month free' END,
+                   now() - interval '1 day'
+            FROM units
+            WHERE community_id = :community_id AND abs(hashtext(id)) % 3 = 0
+            """),
+            {"community_id": community_id},
+        )
+        await db.commit()
+    # Index-only scans need an up-to-date visibility map, as autovacuum keeps it in production
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("VACUUM ANALYZE units, unit_pricing"))
+
+
+async def main(units: int, iterations: int) -> None:
+    unit_repo = UnitRepository()
+    pricing_repo = UnitPricingRepository()
+    cache = InventoryCache()
+    cache.live = True
+
+    async with scratch_community("benchmark: search_units") as community_id:
+        await seed_units(community_id, units)
+        await seed_pricing(community_id)
+        print(f"Seeded {units} units in community {community_id}")
+
+        now = datetime.now(timezone.utc)
+        search = UnitSearch(bedrooms=2, max_rent=2000, min_square_feet=900, available_by=now + timedelta(days=60))
+
+        async with SessionLocal() as db:
+            async def fetch_all_and_filter():
+                candidates = await unit_repo.get_inventory_rows(db, community_id)
+                candidates = [unit for unit in candidates if unit.bedrooms == search.bedrooms]
+                pricing = await pricing_repo.get_current_pricing_bulk(db, community_id, [unit.id for unit in candidates], search.available_by)
+                matches = []
+                for unit in candidates:
+                    rent = pricing[unit.id].rent if unit.id in pricing else unit.base_rent
+                    if rent <= search.max_rent and unit.square_feet >= search.min_square_feet and unit.available_date <= search.available_by:
+                        matches.append((rent, -unit.square_feet, unit.available_date, unit.unit_number, unit.id))
+                matches.sort()
+                return [match[-1] for match in matches[:LIMIT]], len(matches)
+
+            async def ranked_query():
+                rows, total = await unit_repo.search_available_units(
+                    db, community_id, search.available_by, limit=LIMIT, **search._asdict()
+                )
+                return [row.id for row in rows], total
+
+            async def inventory_snapshot():
+                inventory = await cache.get(db, community_id)
+                matches, total = inventory.search_units(search, search.available_by, LIMIT, now=now)
+                return [match.unit.id for match in matches], total
+
+            expected = await fetch_all_and_filter()
+            assert await ranked_query() == expected
+            assert await inventory_snapshot() == expected
+            print(f"{expected[1]} matching units")
+
+            report("Fetch all + filter in Python", await measure(fetch_all_and_filter, iterations))
+            report("Ranked query, search indexes", await measure(ranked_query, iterations))
+            report("Inventory snapshot (warm)", await measure(inventory_snapshot, iterations))
+
+            # DDL is transactional: drop the indexes for one measurement and roll back
+            for index in SEARCH_INDEXES:
+                await db.execute(text(f"DROP INDEX {index}"))
+            report("Ranked query, no search indexes", await measure(ranked_query, iterations))
+            await db.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.units, args.iterations))
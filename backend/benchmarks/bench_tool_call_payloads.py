@@ -0,0 +1,151 @@
+"""
+Replay a production-like tool call mix through the old inline-JSONB write
+path and through the deduplicated payload store, and compare the bytes
+stored and the insert throughput.
+
+The mix is dominated by repeated check_availability lookups for a handful
+of communities (identical responses until inventory changes), with pet
+policy and pricing lookups alongside.
+
+    poetry run python benchmarks/bench_tool_call_payloads.py --calls 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from common import SessionLocal
+from sqlalchemy import delete, func, or_, select, text
+
+from db.repository import ToolCallRepository
+from models import ToolCall, ToolCallPayload
+
+MARKER = "benchmark-payloads"
+COMMUNITIES = 8
+
+
+def availability(community: int, bedrooms: int):
+    return {
+        "units": [
+            {
+                "id": f"{MARKER}-unit-{community}-{bedrooms}-{i}",
+                "unit_number": f"{bedrooms}{i:02d}",
+                "bedrooms": bedrooms,
+                "bathrooms": 1 + (i % 3) * 0.5,
+                "square_feet": 600 + i * 25,
+                "is_available": True,
+            }
+            for i in range(12 + community)
+        ],
+        "total_count": 12 + community,
+        "community_id": f"{MARKER}-community-{community}",
+        "bedrooms_requested": bedrooms,
+    }
+
+
+def make_workload(calls: int, seed: int = 7):
+    rng = random.Random(seed)
+    workload = []
+    for _ in range(calls):
+        community = rng.randrange(COMMUNITIES)
+        community_id = f"{MARKER}-community-{community}"
+        kind = rng.random()
+        if kind < 0.6:
+            bedrooms = rng.randrange(4)
+            call = ("check_availability", {"community_id": community_id, "bedrooms": bedrooms}, availability(community, bedrooms))
+        elif kind < 0.8:
+            pet_type = rng.choice(["dog", "cat", "bird"])
+            call = (
+                "check_pet_policy",
+                {"community_id": community_id, "pet_type": pet_type},
+                {"pet_type": pet_type, "allowed": pet_type != "bird", "deposit": 300, "monthly_fee": 35, "weight_limit": 50, "max_count": 2},
+            )
+        else:
+            unit = rng.randrange(40)
+            move_in = f"2024-{rng.randrange(3, 9):02d}-01T00:00:00+00:00"
+            call = (
+                "get_pricing",
+                {"community_id": community_id, "unit_id": f"{MARKER}-unit-{unit}", "move_in_date": move_in},
+                {"unit_id": f"{MARKER}-unit-{unit}", "rent": 1800 + unit * 10, "move_in_date": move_in, "special_offer": None,
+                 "special_discount": None, "effective_date": "2024-01-01T00:00:00+00:00", "expires_date": None},
+            )
+        workload.append(call)
+    return workload
+
+
+def row(request_id: str, function_name: str, arguments, response):
+    return {
+        "function_name": function_name,
+        "arguments": arguments,
+        "response": response,
+        "execution_time_ms": 3,
+        "success": True,
+        "request_id": request_id,
+    }
+
+
+async def replay(label: str, request_id: str, workload, write) -> None:
+    async with SessionLocal() as db:
+        start = time.perf_counter()
+        for i, (function_name, arguments, response) in enumerate(workload):
+            await write(db, row(request_id, function_name, arguments, response))
+            # Roughly one commit per conversation turn
+            if i % 4 == 3:
+                await db.commit()
+        await db.commit()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed * 1000:9.1f} ms   {len(workload) / elapsed:8.0f} calls/s")
+
+
+async def stored_bytes(request_id: str) -> int:
+    async with SessionLocal() as db:
+        rows = await db.scalar(
+            text("SELECT COALESCE(sum(pg_column_size(t.*)), 0) FROM tool_calls t WHERE request_id = :request_id"),
+            {"request_id": request_id},
+        )
+        payloads = await db.scalar(
+            text("""
+            SELECT COALESCE(sum(pg_column_size(p.*)), 0) FROM tool_call_payloads p
+            WHERE p.hash IN (
+                SELECT arguments_hash FROM tool_calls WHERE request_id = :request_id
+                UNION SELECT response_hash FROM tool_calls WHERE request_id = :request_id
+            )
+            """),
+            {"request_id": request_id},
+        )
+    return rows + payloads
+
+
+async def main(calls: int) -> None:
+    repo = ToolCallRepository()
+    workload = make_workload(calls)
+    inline_marker, dedup_marker = f"{MARKER}-inline", f"{MARKER}-dedup"
+
+    try:
+        await replay("inline JSONB (before)", inline_marker, workload, repo.create)
+        await replay("payload store (after)", dedup_marker, workload, repo.log)
+
+        inline_bytes = await stored_bytes(inline_marker)
+        dedup_bytes = await stored_bytes(dedup_marker)
+        async with SessionLocal() as db:
+            distinct = await db.scalar(
+                select(func.count(func.distinct(ToolCall.response_hash))).where(ToolCall.request_id == dedup_marker)
+            )
+        print(f"{'inline JSONB bytes':<24} {inline_bytes:12,d}")
+        print(f"{'payload store bytes':<24} {dedup_bytes:12,d}   ({distinct} distinct responses, {100 * (1 - dedup_bytes / inline_bytes):.1f}% smaller)")
+    finally:
+        async with SessionLocal() as db:
+            markers = [inline_marker, dedup_marker]
+            hashes = select(ToolCall.arguments_hash).where(ToolCall.request_id == dedup_marker).union(
+                select(ToolCall.response_hash).where(ToolCall.request_id == dedup_marker)
+            )
+            await db.execute(delete(ToolCallPayload).where(ToolCallPayload.hash.in_(hashes)))
+            await db.execute(delete(ToolCall).where(or_(*(ToolCall.request_id == marker for marker in markers))))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls))
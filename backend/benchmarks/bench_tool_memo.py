@@ -0,0 +1,98 @@
+"""
+Replay scripted multi-turn conversations through the tool execution path
+with and without the conversation tool memo, and report how many tool
+executions (each a lookup plus an audit insert) the memo saves per
+conversation. The follow-up pattern mirrors production: most turns re-ask
+availability and pet policy with identical arguments.
+
+    poetry run python benchmarks/bench_tool_memo.py --conversations 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from common import SessionLocal, scratch_community, seed_units
+from sqlalchemy import text
+
+from db.notifications import notification_listener
+from services.inventory import inventory_cache
+from services.llm import _execute_tool_calls
+from services.tool_memo import ConversationMemo
+
+MARKER = "benchmark-tool-memo"
+
+
+def script(community_id: str):
+    availability = ("check_availability", {"community_id": community_id, "bedrooms": 2})
+    pets = ("check_pet_policy", {"community_id": community_id, "pet_type": "dog"})
+    return [
+        [availability, pets],
+        [availability, ("get_pricing", {"community_id": community_id, "unit_id": "B2", "move_in_date": "2030-03-01"})],
+        [availability, pets],
+        [("get_availability_summary", {"community_id": community_id})],
+        [availability, ("find_tour_slots", {"community_id": community_id})],
+        [availability, pets],
+    ]
+
+
+def tool_calls(turn):
+    return [
+        SimpleNamespace(id=f"call_{i}", function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+        for i, (name, arguments) in enumerate(turn)
+    ]
+
+
+async def replay(community_id: str, conversations: int, memoize: bool):
+    executed = saved = 0
+    start = time.perf_counter()
+    for _ in range(conversations):
+        tool_history = []
+        for turn in script(community_id):
+            async with SessionLocal() as db:
+                memo = ConversationMemo(MARKER, tool_history) if memoize else None
+                _, tools_called = await _execute_tool_calls(db, tool_calls(turn), [], memo)
+                await db.commit()
+            tool_history.append(tools_called)
+            for record in tools_called["calls"]:
+                saved += record["memoized"]
+                executed += not record["memoized"]
+    return executed, saved, time.perf_counter() - start
+
+
+async def main(conversations: int) -> None:
+    notification_listener.start()
+    async with scratch_community("benchmark: tool memo") as community_id:
+        await seed_units(community_id, 200)
+        async with SessionLocal() as db:
+            await db.execute(
+                text("INSERT INTO pet_policies (community_id, pet_type, allowed, deposit) VALUES (:id, 'DOG', true, 300)"),
+                {"id": community_id},
+            )
+            await db.commit()
+        while not inventory_cache.live:
+            await asyncio.sleep(0.05)
+
+        started = datetime.now(timezone.utc)
+        try:
+            for label, memoize in (("without memo", False), ("with memo", True)):
+                executed, saved, elapsed = await replay(community_id, conversations, memoize)
+                print(
+                    f"{label:<14} executed {executed / conversations:5.1f}/conversation   "
+                    f"saved {saved / conversations:5.1f}/conversation   {elapsed * 1000 / conversations:7.1f} ms/conversation"
+                )
+        finally:
+            async with SessionLocal() as db:
+                # The replayed calls carry no request id
+                await db.execute(text("DELETE FROM tool_calls WHERE created_at >= :started AND request_id IS NULL"), {"started": started})
+                await db.commit()
+    await notification_listener.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.conversations))
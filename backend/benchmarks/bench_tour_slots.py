@@ -0,0 +1,72 @@
+"""
+Compare answering "open tour slots nearest a preferred time" with a
+date-range query per call (get_available_slots over a window around the
+preferred time) against the in-memory interval index.
+
+    poetry run python benchmarks/bench_tour_slots.py --slots 5000
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from common import SessionLocal, measure, report, scratch_community
+from sqlalchemy import text
+
+from db.repository import TourSlotRepository
+from services.tour_slots import TourSlotCache
+
+LIMIT = 5
+WINDOW = timedelta(days=3)
+
+
+async def seed_slots(community_id: str, count: int) -> None:
+    # Hourly slots, every third one already full
+    async with SessionLocal() as db:
+        await db.execute(
+            text("""
+            INSERT INTO tour_slots (community_id, start_time, end_time, max_capacity, current_bookings, is_available)
+            SELECT :community_id,
+                   date_trunc('hour', now()) + g * interval '1 hour',
+                   date_trunc('hour', now()) + g * interval '1 hour' + interval '30 minutes',
+                   2,
+                   CASE WHEN g % 3 = 0 THEN 2 ELSE 0 END,
+                   g % 3 <> 0
+            FROM generate_series(1, :count) AS g
+            """),
+            {"community_id": community_id, "count": count},
+        )
+        await db.execute(text("ANALYZE tour_slots"))
+        await db.commit()
+
+
+async def main(slots: int, iterations: int) -> None:
+    repo = TourSlotRepository()
+    cache = TourSlotCache()
+    cache.live = True
+
+    async with scratch_community("benchmark: tour slots") as community_id:
+        await seed_slots(community_id, slots)
+        print(f"Seeded {slots} tour slots in community {community_id}")
+        preferred = datetime.now(timezone.utc) + timedelta(hours=slots // 2)
+
+        async with SessionLocal() as db:
+            async def range_query():
+                found = await repo.get_available_slots(db, community_id, preferred - WINDOW, preferred + WINDOW)
+                return sorted(found, key=lambda slot: abs(slot.start_time - preferred))[:LIMIT]
+
+            async def interval_index():
+                index = await cache.get(db, community_id)
+                return index.nearest(preferred, LIMIT)
+
+            assert {slot.id for slot in await range_query()} == {slot.id for slot in await interval_index()}
+
+            report("range query + sort", await measure(range_query, iterations))
+            report("interval index (warm)", await measure(interval_index, iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slots", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.slots, args.iterations))
@@ -0,0 +1,86 @@
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+# Benchmarks import app modules the same way the app does (without the 'app.' prefix)
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from sqlalchemy import text  # noqa: E402
+
+from db.database import SessionLocal  # noqa: E402
+
+
+async def measure(fn: Callable[[], Awaitable[object]], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        await fn()
+
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def report(label: str, stats: Dict[str, float]) -> None:
+    print(f"{label:<40} p50 {stats['p50_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms   mean {stats['mean_ms']:8.2f} ms")
+
+
+@asynccontextmanager
+async def scratch_community(name: str):
+    """
+    Create a throwaway community and remove it (and everything seeded under
+    it by the benchmark) afterwards.
+    """
+    async with SessionLocal() as db:
+        result = await db.execute(
+            text("INSERT INTO communities (name, address) VALUES (:name, 'benchmark') RETURNING id"),
+            {"name": name},
+        )
+        community_id = result.scalar_one()
+        await db.commit()
+
+    try:
+        yield community_id
+    finally:
+        async with SessionLocal() as db:
+            await db.execute(
+                text("DELETE FROM unit_pricing WHERE unit_id IN (SELECT id FROM units WHERE community_id = :id)"),
+                {"id": community_id},
+            )
+            for table in ("units", "pet_policies", "tour_slots"):
+                await db.execute(text(f"DELETE FROM {table} WHERE community_id = :id"), {"id": community_id})
+            await db.execute(text("DELETE FROM communities WHERE id = :id"), {"id": community_id})
+            await db.commit()
+
+
+async def seed_units(community_id: str, count: int) -> None:
+    async with SessionLocal() as db:
+        await db.execute(
+            text("""
+            INSERT INTO units (community_id, unit_number, bedrooms, bathrooms, square_feet,
+                               description, base_rent, is_available, available_date)
+            SELECT :community_id,
+                   'B' || g,
+                   g % 4,
+                   1 + (g % 3) * 0.5,
+                   450 + (g % 40) * 25,
+                   repeat('Bright corner unit with updated kitchen. ', 20),
+                   1200 + (g % 60) * 25,
+                   g % 5 <> 0,
+                   now() + ((g % 120) || ' days')::interval
+            FROM generate_series(1, :count) AS g
+            """),
+            {"community_id": community_id, "count": count},
+        )
+        await db.execute(text("ANALYZE units"))
+        await db.commit()
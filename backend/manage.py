@@ -1,7 +1,13 @@
+import asyncio
 import sys
+from pathlib import Path
 
-from seeds.seeds import Seeder
-from app.config import settings
+# App modules import each other without the 'app.' prefix; this has to
+# happen before the seeds import, which pulls in the models
+sys.path.insert(0, str(Path(__file__).parent / "app"))
+
+from seeds.seeds import Seeder  # noqa: E402
+from app.config import settings  # noqa: E402
 
 
 def seed_database():
@@ -9,6 +15,22 @@ def seed_database():
     seeder.run()
     print("Seeding completed")
 
+
+def maintain_partitions():
+    from db.database import engine
+    from db.partitions import run_maintenance
+
+    async def run():
+        try:
+            await run_maintenance(engine)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+    print("Partition maintenance completed")
+
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "seed":
-        seed_database()
\ No newline at end of file
+        seed_database()
+    elif len(sys.argv) > 1 and sys.argv[1] == "partitions":
+        maintain_partitions()
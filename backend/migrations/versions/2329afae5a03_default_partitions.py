@@ -0,0 +1,140 @@
+import sqlmodel
+"""default partitions
+
+Revision ID: 2329afae5a03
+Revises: fae0f058e49b
+Create Date: 2026-10-20 00:41:09.265718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2329afae5a03'
+down_revision: Union[str, Sequence[str], None] = 'fae0f058e49b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONED_TABLES = ('messages', 'tool_calls')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A row whose month has no partition (maintenance fell behind, or a
+    # clock far off) lands in <parent>_default instead of failing the
+    # insert. A partition cannot be created over rows the default
+    # partition already holds, so when maintenance reaches such a month it
+    # moves them into a standalone table and attaches that instead. Besides
+    # the look-ahead window, every month found in the default partition
+    # (up to the window's end) is given its partition.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent text, from_month date, months_ahead integer)
+        RETURNS integer
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        default_partition text := parent || '_default';
+        month_start date;
+        last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead))::date;
+        lower_bound timestamptz;
+        upper_bound timestamptz;
+        partition_name text;
+        spilled boolean;
+        created integer := 0;
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('partition_maintenance:' || parent));
+        FOR month_start IN EXECUTE format(
+            'SELECT month FROM ('
+            '    SELECT generate_series(date_trunc(''month'', %L::date), %L::date, interval ''1 month'')::date AS month'
+            '    UNION'
+            '    SELECT date_trunc(''month'', created_at AT TIME ZONE ''UTC'')::date FROM %I'
+            ') AS months WHERE month <= %L ORDER BY month',
+            from_month, last_month, default_partition, last_month
+        ) LOOP
+            partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYY_MM'));
+            lower_bound := month_start::timestamp AT TIME ZONE 'UTC';
+            upper_bound := (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'SELECT EXISTS (SELECT 1 FROM %I WHERE created_at >= %L AND created_at < %L)',
+                    default_partition, lower_bound, upper_bound
+                ) INTO spilled;
+                IF spilled THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                        partition_name, parent
+                    );
+                    EXECUTE format(
+                        'WITH moved AS (DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                        'INSERT INTO %I SELECT * FROM moved',
+                        default_partition, lower_bound, upper_bound, partition_name
+                    );
+                    EXECUTE format(
+                        'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                        parent, partition_name, lower_bound, upper_bound
+                    );
+                ELSE
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, parent, lower_bound, upper_bound
+                    );
+                END IF;
+                created := created + 1;
+            END IF;
+        END LOOP;
+        RETURN created;
+    END
+    $$;
+    """)
+    for table in PARTITIONED_TABLES:
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in PARTITIONED_TABLES:
+        op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM {table}_default) THEN
+                RAISE EXCEPTION '{table}_default is not empty; run partition maintenance first';
+            END IF;
+        END
+        $$;
+        DROP TABLE {table}_default;
+        """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent text, from_month date, months_ahead integer)
+        RETURNS integer
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        month_start date := date_trunc('month', from_month)::date;
+        last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead))::date;
+        partition_name text;
+        created integer := 0;
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('partition_maintenance:' || parent));
+        WHILE month_start <= last_month LOOP
+            partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYY_MM'));
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name,
+                    parent,
+                    month_start::timestamp AT TIME ZONE 'UTC',
+                    (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                created := created + 1;
+            END IF;
+            month_start := (month_start + interval '1 month')::date;
+        END LOOP;
+        RETURN created;
+    END
+    $$;
+    """)
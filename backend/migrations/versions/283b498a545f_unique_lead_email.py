@@ -0,0 +1,57 @@
+import sqlmodel
+"""unique lead email
+
+Revision ID: 283b498a545f
+Revises: db9a42a5d8e7
+Create Date: 2026-10-19 09:12:04.118520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '283b498a545f'
+down_revision: Union[str, Sequence[str], None] = 'db9a42a5d8e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Collapse leads that differ only by email case onto the oldest row so the
+    # unique index can be built; their conversations move with them.
+    op.execute("""
+    WITH ranked AS (
+        SELECT id,
+               first_value(id) OVER (
+                   PARTITION BY lower(email) ORDER BY created_at, id
+               ) AS keep_id
+        FROM leads
+    )
+    UPDATE conversations c
+    SET lead_id = r.keep_id
+    FROM ranked r
+    WHERE c.lead_id = r.id AND r.id <> r.keep_id
+    """)
+    op.execute("""
+    DELETE FROM leads l
+    USING (
+        SELECT id,
+               first_value(id) OVER (
+                   PARTITION BY lower(email) ORDER BY created_at, id
+               ) AS keep_id
+        FROM leads
+    ) r
+    WHERE l.id = r.id AND r.id <> r.keep_id
+    """)
+    op.create_index(
+        'ux_leads_email_lower', 'leads', [sa.text('lower(email)')], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_leads_email_lower', table_name='leads')
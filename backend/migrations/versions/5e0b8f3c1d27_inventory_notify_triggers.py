@@ -0,0 +1,94 @@
+import sqlmodel
+"""inventory notify triggers
+
+Revision ID: 5e0b8f3c1d27
+Revises: 9c41d7e2a0b5
+Create Date: 2026-10-19 11:20:31.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b8f3c1d27'
+down_revision: Union[str, Sequence[str], None] = '9c41d7e2a0b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INVENTORY_TABLES = ('units', 'pet_policies', 'unit_pricing')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Payload is the affected community id. NOTIFY folds identical payloads
+    # within a transaction, so bulk edits to one community send one message.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_inventory_changed() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        new_community text;
+        old_community text;
+    BEGIN
+        IF TG_TABLE_NAME = 'unit_pricing' THEN
+            IF TG_OP <> 'DELETE' THEN
+                SELECT community_id INTO new_community FROM units WHERE id = NEW.unit_id;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                SELECT community_id INTO old_community FROM units WHERE id = OLD.unit_id;
+            END IF;
+        ELSE
+            IF TG_OP <> 'DELETE' THEN
+                new_community := NEW.community_id;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                old_community := OLD.community_id;
+            END IF;
+        END IF;
+
+        IF new_community IS NOT NULL THEN
+            PERFORM pg_notify('inventory_changed', new_community);
+        END IF;
+        IF old_community IS NOT NULL AND old_community IS DISTINCT FROM new_community THEN
+            PERFORM pg_notify('inventory_changed', old_community);
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION notify_inventory_truncated() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        PERFORM pg_notify('inventory_changed', '*');
+        RETURN NULL;
+    END
+    $$;
+    """)
+    for table in INVENTORY_TABLES:
+        op.execute(f"""
+        CREATE TRIGGER {table}_inventory_changed
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_inventory_changed();
+        CREATE TRIGGER {table}_inventory_truncated
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_inventory_truncated();
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in INVENTORY_TABLES:
+        op.execute(f"""
+        DROP TRIGGER IF EXISTS {table}_inventory_truncated ON {table};
+        DROP TRIGGER IF EXISTS {table}_inventory_changed ON {table};
+        """)
+    op.execute("""
+    DROP FUNCTION IF EXISTS notify_inventory_truncated();
+    DROP FUNCTION IF EXISTS notify_inventory_changed();
+    """)
@@ -0,0 +1,51 @@
+import sqlmodel
+"""trigram gist indexes
+
+Revision ID: 725b3a14fe51
+Revises: c5e2b8d4f613
+Create Date: 2026-10-19 23:12:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '725b3a14fe51'
+down_revision: Union[str, Sequence[str], None] = 'c5e2b8d4f613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_communities_address_trgm', 'communities', 'address'),
+    ('ix_leads_name_trgm', 'leads', 'name'),
+    ('ix_leads_email_trgm', 'leads', 'email'),
+]
+
+
+def recreate(using: str, opclass: str) -> None:
+    for index_name, table, column in TRIGRAM_INDEXES:
+        op.drop_index(index_name, table_name=table)
+        op.create_index(
+            index_name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using=using,
+            postgresql_ops={column: opclass},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # GiST serves ORDER BY col <-> query as a KNN scan that stops at the
+    # LIMIT; GIN can only hand back every match for a sort
+    recreate('gist', 'gist_trgm_ops')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    recreate('gin', 'gin_trgm_ops')
@@ -0,0 +1,34 @@
+import sqlmodel
+"""units availability index
+
+Revision ID: 9c41d7e2a0b5
+Revises: 283b498a545f
+Create Date: 2026-10-19 10:02:47.553190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41d7e2a0b5'
+down_revision: Union[str, Sequence[str], None] = '283b498a545f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_units_community_available_bedrooms',
+        'units',
+        ['community_id', 'is_available', 'bedrooms'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_units_community_available_bedrooms', table_name='units')
@@ -0,0 +1,44 @@
+import sqlmodel
+"""unit search indexes
+
+Revision ID: a3c8f1d5e927
+Revises: b7d3e9a1c246
+Create Date: 2026-10-19 21:03:18.204519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8f1d5e927'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e9a1c246'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_units_search',
+        'units',
+        ['community_id', 'bedrooms', 'square_feet'],
+        unique=False,
+        postgresql_include=['id', 'bathrooms', 'base_rent', 'available_date', 'unit_number'],
+        postgresql_where=sa.text('is_available'),
+    )
+    op.create_index(
+        'ix_units_search_available_date',
+        'units',
+        ['community_id', 'available_date'],
+        unique=False,
+        postgresql_where=sa.text('is_available'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_units_search_available_date', table_name='units')
+    op.drop_index('ix_units_search', table_name='units')
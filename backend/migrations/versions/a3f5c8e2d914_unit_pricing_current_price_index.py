@@ -0,0 +1,37 @@
+import sqlmodel
+"""unit pricing current price index
+
+Revision ID: a3f5c8e2d914
+Revises: f6c0d2e4a871
+Create Date: 2026-10-19 16:22:47.503128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f5c8e2d914'
+down_revision: Union[str, Sequence[str], None] = 'f6c0d2e4a871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_unit_pricing_unit_id_move_in_date',
+        'unit_pricing',
+        ['unit_id', sa.text('move_in_date DESC')],
+        unique=False,
+    )
+    # The composite index covers lookups by unit_id alone
+    op.drop_index('ix_unit_pricing_unit_id', table_name='unit_pricing')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_unit_pricing_unit_id', 'unit_pricing', ['unit_id'], unique=False)
+    op.drop_index('ix_unit_pricing_unit_id_move_in_date', table_name='unit_pricing')
@@ -0,0 +1,29 @@
+import sqlmodel
+"""tool call memoized
+
+Revision ID: b41c7e9d2f56
+Revises: 2329afae5a03
+Create Date: 2026-10-20 02:12:37.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41c7e9d2f56'
+down_revision: Union[str, Sequence[str], None] = '2329afae5a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tool_calls', sa.Column('memoized', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tool_calls', 'memoized')
@@ -0,0 +1,46 @@
+import sqlmodel
+"""keyset pagination indexes
+
+Revision ID: b7d3e9a14c62
+Revises: 5e0b8f3c1d27
+Create Date: 2026-10-19 12:41:08.216734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e9a14c62'
+down_revision: Union[str, Sequence[str], None] = '5e0b8f3c1d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_leads_created_at_id', 'leads', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tool_calls_created_at_id', 'tool_calls', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_tool_calls_function_name_created_at_id',
+        'tool_calls',
+        ['function_name', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_tool_calls_failed_created_at_id',
+        'tool_calls',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('NOT success'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tool_calls_failed_created_at_id', table_name='tool_calls')
+    op.drop_index('ix_tool_calls_function_name_created_at_id', table_name='tool_calls')
+    op.drop_index('ix_tool_calls_created_at_id', table_name='tool_calls')
+    op.drop_index('ix_leads_created_at_id', table_name='leads')
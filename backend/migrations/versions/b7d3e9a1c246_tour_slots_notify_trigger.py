@@ -0,0 +1,75 @@
+import sqlmodel
+"""tour slots notify trigger
+
+Revision ID: b7d3e9a1c246
+Revises: d9b2e6f0c417
+Create Date: 2026-10-19 20:12:44.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e9a1c246'
+down_revision: Union[str, Sequence[str], None] = 'd9b2e6f0c417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Payload is the affected community id, as for inventory_changed; a
+    # separate channel keeps bookings from invalidating inventory snapshots.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_tour_slots_changed() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        new_community text;
+        old_community text;
+    BEGIN
+        IF TG_OP <> 'DELETE' THEN
+            new_community := NEW.community_id;
+            PERFORM pg_notify('tour_slots_changed', new_community);
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            old_community := OLD.community_id;
+            IF old_community IS DISTINCT FROM new_community THEN
+                PERFORM pg_notify('tour_slots_changed', old_community);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION notify_tour_slots_truncated() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        PERFORM pg_notify('tour_slots_changed', '*');
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE TRIGGER tour_slots_changed
+        AFTER INSERT OR UPDATE OR DELETE ON tour_slots
+        FOR EACH ROW EXECUTE FUNCTION notify_tour_slots_changed();
+    CREATE TRIGGER tour_slots_truncated
+        AFTER TRUNCATE ON tour_slots
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_tour_slots_truncated();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+    DROP TRIGGER IF EXISTS tour_slots_truncated ON tour_slots;
+    DROP TRIGGER IF EXISTS tour_slots_changed ON tour_slots;
+    DROP FUNCTION IF EXISTS notify_tour_slots_truncated();
+    DROP FUNCTION IF EXISTS notify_tour_slots_changed();
+    """)
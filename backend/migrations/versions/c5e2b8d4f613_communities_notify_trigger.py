@@ -0,0 +1,53 @@
+import sqlmodel
+"""communities notify trigger
+
+Revision ID: c5e2b8d4f613
+Revises: a3c8f1d5e927
+Create Date: 2026-10-19 21:47:02.913650
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2b8d4f613'
+down_revision: Union[str, Sequence[str], None] = 'a3c8f1d5e927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Contact details feed the community fact sheet, which is invalidated on
+    # inventory_changed like the rest of its rows. Community edits are rare,
+    # so also dropping the community's inventory snapshot costs nothing.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_community_changed() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify('inventory_changed', OLD.id);
+        ELSE
+            PERFORM pg_notify('inventory_changed', NEW.id);
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE TRIGGER communities_inventory_changed
+        AFTER UPDATE OR DELETE ON communities
+        FOR EACH ROW EXECUTE FUNCTION notify_community_changed();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+    DROP TRIGGER IF EXISTS communities_inventory_changed ON communities;
+    DROP FUNCTION IF EXISTS notify_community_changed();
+    """)
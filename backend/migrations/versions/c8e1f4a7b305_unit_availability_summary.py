@@ -0,0 +1,150 @@
+import sqlmodel
+"""unit availability summary
+
+Revision ID: c8e1f4a7b305
+Revises: a3f5c8e2d914
+Create Date: 2026-10-19 17:48:12.390561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f4a7b305'
+down_revision: Union[str, Sequence[str], None] = 'a3f5c8e2d914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Transition tables are only allowed on single-event triggers
+EVENTS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_units',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_units NEW TABLE AS new_units',
+    'DELETE': 'REFERENCING OLD TABLE AS old_units',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'unit_availability_summary',
+        sa.Column('community_id', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column('bedrooms', sa.Integer(), nullable=False),
+        sa.Column('available_units', sa.Integer(), nullable=False),
+        sa.Column('min_rent', sa.Integer(), nullable=False),
+        sa.Column('max_rent', sa.Integer(), nullable=False),
+        sa.Column('min_square_feet', sa.Integer(), nullable=True),
+        sa.Column('max_square_feet', sa.Integer(), nullable=True),
+        sa.Column('earliest_available_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['community_id'], ['communities.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('community_id', 'bedrooms'),
+    )
+
+    # Each touched (community_id, bedrooms) group is recomputed from units
+    # rather than adjusted by deltas, since min/max cannot be maintained
+    # incrementally on delete. The per-group advisory lock serialises
+    # concurrent writers to a group, and because every plpgsql statement
+    # takes a fresh snapshot under READ COMMITTED, the recompute after the
+    # lock sees everything committed before it. Groups are locked in sorted
+    # order so that multi-group statements cannot deadlock each other.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION refresh_unit_availability_summary(target_community text, target_bedrooms integer)
+        RETURNS void
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock(
+            hashtext('unit_availability_summary'),
+            hashtext(target_community || ':' || target_bedrooms)
+        );
+        DELETE FROM unit_availability_summary
+        WHERE community_id = target_community AND bedrooms = target_bedrooms;
+        INSERT INTO unit_availability_summary (
+            community_id, bedrooms, available_units, min_rent, max_rent,
+            min_square_feet, max_square_feet, earliest_available_date, refreshed_at
+        )
+        SELECT community_id, bedrooms, count(*), min(base_rent), max(base_rent),
+               min(square_feet), max(square_feet), min(available_date), now()
+        FROM units
+        WHERE community_id = target_community AND bedrooms = target_bedrooms AND is_available
+        GROUP BY community_id, bedrooms;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION unit_availability_summary_changed() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        grp record;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            FOR grp IN SELECT DISTINCT community_id, bedrooms FROM new_units ORDER BY 1, 2 LOOP
+                PERFORM refresh_unit_availability_summary(grp.community_id, grp.bedrooms);
+            END LOOP;
+        ELSIF TG_OP = 'DELETE' THEN
+            FOR grp IN SELECT DISTINCT community_id, bedrooms FROM old_units ORDER BY 1, 2 LOOP
+                PERFORM refresh_unit_availability_summary(grp.community_id, grp.bedrooms);
+            END LOOP;
+        ELSE
+            FOR grp IN
+                SELECT community_id, bedrooms FROM old_units
+                UNION
+                SELECT community_id, bedrooms FROM new_units
+                ORDER BY 1, 2
+            LOOP
+                PERFORM refresh_unit_availability_summary(grp.community_id, grp.bedrooms);
+            END LOOP;
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION unit_availability_summary_truncated() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        DELETE FROM unit_availability_summary;
+        RETURN NULL;
+    END
+    $$;
+    """)
+    for event, referencing in EVENTS.items():
+        op.execute(f"""
+        CREATE TRIGGER units_availability_summary_{event.lower()}
+            AFTER {event} ON units
+            {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION unit_availability_summary_changed();
+        """)
+    op.execute("""
+    CREATE TRIGGER units_availability_summary_truncate
+        AFTER TRUNCATE ON units
+        FOR EACH STATEMENT EXECUTE FUNCTION unit_availability_summary_truncated();
+
+    INSERT INTO unit_availability_summary (
+        community_id, bedrooms, available_units, min_rent, max_rent,
+        min_square_feet, max_square_feet, earliest_available_date, refreshed_at
+    )
+    SELECT community_id, bedrooms, count(*), min(base_rent), max(base_rent),
+           min(square_feet), max(square_feet), min(available_date), now()
+    FROM units
+    WHERE is_available
+    GROUP BY community_id, bedrooms;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for event in (*EVENTS, 'TRUNCATE'):
+        op.execute(f'DROP TRIGGER IF EXISTS units_availability_summary_{event.lower()} ON units')
+    op.execute("""
+    DROP FUNCTION IF EXISTS unit_availability_summary_truncated();
+    DROP FUNCTION IF EXISTS unit_availability_summary_changed();
+    DROP FUNCTION IF EXISTS refresh_unit_availability_summary(text, integer);
+    """)
+    op.drop_table('unit_availability_summary')
@@ -0,0 +1,40 @@
+import sqlmodel
+"""tour slot capacity check
+
+Revision ID: d41f6a8c2e93
+Revises: b7d3e9a14c62
+Create Date: 2026-10-19 13:27:52.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f6a8c2e93'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e9a14c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Clamp anything already oversold so the constraint can be added
+    op.execute("""
+    UPDATE tour_slots
+    SET current_bookings = LEAST(GREATEST(current_bookings, 0), max_capacity),
+        is_available = is_available AND current_bookings < max_capacity
+    WHERE current_bookings < 0 OR current_bookings > max_capacity
+    """)
+    op.create_check_constraint(
+        'ck_tour_slots_bookings_within_capacity',
+        'tour_slots',
+        'current_bookings >= 0 AND current_bookings <= max_capacity',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_tour_slots_bookings_within_capacity', 'tour_slots', type_='check')
@@ -0,0 +1,58 @@
+import sqlmodel
+"""search indexes
+
+Revision ID: d9b2e6f0c417
+Revises: c8e1f4a7b305
+Create Date: 2026-10-19 18:34:55.120847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9b2e6f0c417'
+down_revision: Union[str, Sequence[str], None] = 'c8e1f4a7b305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_INDEXES = [
+    ('ix_communities_address_trgm', 'communities', 'address'),
+    ('ix_leads_name_trgm', 'leads', 'name'),
+    ('ix_leads_email_trgm', 'leads', 'email'),
+]
+
+# Must match models.MESSAGE_SEARCH_DOCUMENT
+MESSAGE_SEARCH_DOCUMENT = "to_tsvector('english', coalesce(message_text, '') || ' ' || coalesce(reply_text, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table, column in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name,
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+    # Created on the partitioned parent, so every partition gets one
+    op.create_index(
+        'ix_messages_search',
+        'messages',
+        [sa.text(MESSAGE_SEARCH_DOCUMENT)],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_search', table_name='messages')
+    for index_name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table)
+    # pg_trgm is left installed; other objects may depend on it
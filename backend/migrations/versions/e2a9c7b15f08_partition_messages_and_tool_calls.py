@@ -0,0 +1,178 @@
+import sqlmodel
+"""partition messages and tool_calls
+
+Revision ID: e2a9c7b15f08
+Revises: d41f6a8c2e93
+Create Date: 2026-10-19 14:05:36.771290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c7b15f08'
+down_revision: Union[str, Sequence[str], None] = 'd41f6a8c2e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+# Secondary indexes recreated on the partitioned parents (and so on every partition)
+INDEXES = {
+    'messages': [
+        ('ix_messages_id', ['id'], None),
+        ('ix_messages_conversation_id_created_at', ['conversation_id', 'created_at'], None),
+        ('ix_messages_request_id', ['request_id'], None),
+    ],
+    'tool_calls': [
+        ('ix_tool_calls_id', ['id'], None),
+        ('ix_tool_calls_conversation_id_created_at', ['conversation_id', 'created_at'], None),
+        ('ix_tool_calls_function_name', ['function_name'], None),
+        ('ix_tool_calls_request_id', ['request_id'], None),
+        ('ix_tool_calls_created_at_id', ['created_at', 'id'], None),
+        ('ix_tool_calls_function_name_created_at_id', ['function_name', 'created_at', 'id'], None),
+        ('ix_tool_calls_failed_created_at_id', ['created_at', 'id'], 'NOT success'),
+    ],
+}
+DROPPED_INDEXES = {
+    'messages': ['ix_messages_conversation_id'],
+    'tool_calls': ['ix_tool_calls_conversation_id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both functions take an advisory lock per parent so that several app
+    # workers running maintenance at once do not race on CREATE/DETACH.
+    # Partitions are named <parent>_pYYYY_MM and cover one UTC month.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent text, from_month date, months_ahead integer)
+        RETURNS integer
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        month_start date := date_trunc('month', from_month)::date;
+        last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead))::date;
+        partition_name text;
+        created integer := 0;
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('partition_maintenance:' || parent));
+        WHILE month_start <= last_month LOOP
+            partition_name := format('%s_p%s', parent, to_char(month_start, 'YYYY_MM'));
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name,
+                    parent,
+                    month_start::timestamp AT TIME ZONE 'UTC',
+                    (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                created := created + 1;
+            END IF;
+            month_start := (month_start + interval '1 month')::date;
+        END LOOP;
+        RETURN created;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION expire_monthly_partitions(parent text, keep_months integer, drop_expired boolean)
+        RETURNS SETOF text
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        cutoff date := (date_trunc('month', now() AT TIME ZONE 'UTC') - make_interval(months => keep_months))::date;
+        partition_name text;
+    BEGIN
+        PERFORM pg_advisory_xact_lock(hashtext('partition_maintenance:' || parent));
+        FOR partition_name IN
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = parent::regclass
+              AND c.relname ~ ('^' || parent || '_p[0-9]{4}_[0-9]{2}$')
+            ORDER BY c.relname
+        LOOP
+            CONTINUE WHEN to_date(right(partition_name, 7), 'YYYY_MM') >= cutoff;
+            EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, partition_name);
+            IF drop_expired THEN
+                EXECUTE format('DROP TABLE %I', partition_name);
+            END IF;
+            RETURN NEXT partition_name;
+        END LOOP;
+    END
+    $$;
+    """)
+
+    for table, indexes in INDEXES.items():
+        legacy = f'{table}_unpartitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+        op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+        for index_name, _, _ in indexes:
+            op.execute(f'DROP INDEX IF EXISTS {index_name}')
+        for index_name in DROPPED_INDEXES[table]:
+            op.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+        # The partition key has to be part of the primary key
+        op.execute(f"""
+        CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE (created_at);
+        ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at);
+        ALTER TABLE {table} ADD CONSTRAINT {table}_conversation_id_fkey
+            FOREIGN KEY (conversation_id) REFERENCES conversations (id);
+        SELECT ensure_monthly_partitions(
+            '{table}',
+            (COALESCE((SELECT min(created_at) FROM {legacy}), now()) AT TIME ZONE 'UTC')::date,
+            {MONTHS_AHEAD}
+        );
+        INSERT INTO {table} SELECT * FROM {legacy};
+        DROP TABLE {legacy};
+        """)
+        for index_name, columns, where in indexes:
+            op.create_index(
+                index_name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, indexes in INDEXES.items():
+        partitioned = f'{table}_partitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+        op.execute(f'ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey')
+        for index_name, _, _ in indexes:
+            op.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+        op.execute(f"""
+        CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+        ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id);
+        ALTER TABLE {table} ADD CONSTRAINT {table}_conversation_id_fkey
+            FOREIGN KEY (conversation_id) REFERENCES conversations (id);
+        INSERT INTO {table} SELECT * FROM {partitioned};
+        DROP TABLE {partitioned};
+        """)
+        for index_name, columns, where in indexes:
+            if index_name.endswith('_conversation_id_created_at'):
+                continue
+            op.create_index(
+                index_name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+            )
+        for index_name in DROPPED_INDEXES[table]:
+            op.create_index(index_name, table, ['conversation_id'], unique=False)
+
+    op.execute("""
+    DROP FUNCTION IF EXISTS expire_monthly_partitions(text, integer, boolean);
+    DROP FUNCTION IF EXISTS ensure_monthly_partitions(text, date, integer);
+    """)
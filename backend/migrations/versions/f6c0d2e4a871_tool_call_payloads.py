@@ -0,0 +1,72 @@
+import sqlmodel
+"""tool call payloads
+
+Revision ID: f6c0d2e4a871
+Revises: e2a9c7b15f08
+Create Date: 2026-10-19 15:12:44.093517
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c0d2e4a871'
+down_revision: Union[str, Sequence[str], None] = 'e2a9c7b15f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tool_call_payloads',
+        sa.Column('hash', sa.LargeBinary(), nullable=False),
+        sa.Column('encoding', sa.String(length=16), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('hash'),
+    )
+    # Already compressed (or tiny); skip TOAST's own compression attempt
+    op.execute("ALTER TABLE tool_call_payloads ALTER COLUMN data SET STORAGE EXTERNAL")
+
+    op.add_column('tool_calls', sa.Column('arguments_hash', sa.LargeBinary(), nullable=True))
+    op.add_column('tool_calls', sa.Column('response_hash', sa.LargeBinary(), nullable=True))
+    # Existing rows keep their inline payloads; new rows only carry hashes
+    op.alter_column('tool_calls', 'arguments', nullable=True)
+    op.alter_column('tool_calls', 'response', nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Payloads may be zlib-compressed, so inline them back from Python
+    connection = op.get_bind()
+    op.execute("CREATE TEMPORARY TABLE decoded_payloads (hash bytea PRIMARY KEY, payload jsonb) ON COMMIT DROP")
+    rows = connection.execute(sa.text("SELECT hash, encoding, data FROM tool_call_payloads")).fetchall()
+    if rows:
+        connection.execute(
+            sa.text("INSERT INTO decoded_payloads VALUES (:hash, CAST(:payload AS jsonb))"),
+            [
+                {
+                    "hash": row.hash,
+                    "payload": (zlib.decompress(row.data) if row.encoding == 'zlib' else bytes(row.data)).decode(),
+                }
+                for row in rows
+            ],
+        )
+    op.execute("""
+    UPDATE tool_calls t
+    SET arguments = COALESCE(t.arguments, a.payload),
+        response = COALESCE(t.response, r.payload)
+    FROM decoded_payloads a, decoded_payloads r
+    WHERE a.hash = t.arguments_hash AND r.hash = t.response_hash
+    """)
+    op.alter_column('tool_calls', 'response', nullable=False)
+    op.alter_column('tool_calls', 'arguments', nullable=False)
+    op.drop_column('tool_calls', 'response_hash')
+    op.drop_column('tool_calls', 'arguments_hash')
+    op.drop_table('tool_call_payloads')
@@ -0,0 +1,324 @@
+import sqlmodel
+"""unit availability summary queue
+
+Revision ID: fae0f058e49b
+Revises: 725b3a14fe51
+Create Date: 2026-10-19 23:58:21.733904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fae0f058e49b'
+down_revision: Union[str, Sequence[str], None] = '725b3a14fe51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Transition tables are only allowed on single-event triggers
+EVENTS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+QUEUED_TABLES = ('units', 'unit_pricing')
+
+# The rule UnitPricingRepository.get_current_pricing applies for a move-in now
+CURRENT_RENT = """
+    SELECT rent FROM unit_pricing
+    WHERE unit_id = units.id
+      AND move_in_date <= now()
+      AND effective_date <= now()
+      AND (expires_date IS NULL OR expires_date > now())
+    ORDER BY move_in_date DESC
+    LIMIT 1
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for event in (*EVENTS, 'TRUNCATE'):
+        op.execute(f'DROP TRIGGER IF EXISTS units_availability_summary_{event.lower()} ON units')
+    op.execute("""
+    DROP FUNCTION IF EXISTS unit_availability_summary_truncated();
+    DROP FUNCTION IF EXISTS unit_availability_summary_changed();
+    DROP FUNCTION IF EXISTS refresh_unit_availability_summary(text, integer);
+    """)
+
+    op.create_table(
+        'unit_availability_summary_stale',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('community_id', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column('queued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    # Writers only queue the communities they touched: a plain INSERT into
+    # a table with no unique key never waits on another transaction, so
+    # writes no longer lock anything shared. The recompute runs later in
+    # the refresher's own READ COMMITTED transaction (db.availability_summary),
+    # where each statement sees everything committed before it.
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION refresh_unit_availability_summary(target_community text)
+        RETURNS void
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        IF current_setting('transaction_isolation') <> 'read committed' THEN
+            RAISE EXCEPTION 'unit availability summaries must be refreshed under READ COMMITTED';
+        END IF;
+        PERFORM pg_advisory_xact_lock(hashtext('unit_availability_summary'), hashtext(target_community));
+        -- Rows are only written when they change, so an unchanged
+        -- community sends no inventory_changed notification
+        WITH fresh AS (
+            SELECT community_id, bedrooms, count(*) AS available_units,
+                   min(rent) AS min_rent, max(rent) AS max_rent,
+                   min(square_feet) AS min_square_feet, max(square_feet) AS max_square_feet,
+                   min(available_date) AS earliest_available_date
+            FROM (
+                SELECT units.community_id, units.bedrooms, units.square_feet, units.available_date,
+                       coalesce(current_pricing.rent, units.base_rent) AS rent
+                FROM units
+                LEFT JOIN LATERAL ({CURRENT_RENT}) AS current_pricing ON true
+                WHERE units.community_id = target_community AND units.is_available
+            ) AS available
+            GROUP BY community_id, bedrooms
+        ),
+        removed AS (
+            DELETE FROM unit_availability_summary
+            WHERE community_id = target_community
+              AND bedrooms NOT IN (SELECT bedrooms FROM fresh)
+        )
+        INSERT INTO unit_availability_summary (
+            community_id, bedrooms, available_units, min_rent, max_rent,
+            min_square_feet, max_square_feet, earliest_available_date, refreshed_at
+        )
+        SELECT community_id, bedrooms, available_units, min_rent, max_rent,
+               min_square_feet, max_square_feet, earliest_available_date, now()
+        FROM fresh
+        ON CONFLICT (community_id, bedrooms) DO UPDATE SET
+            available_units = excluded.available_units,
+            min_rent = excluded.min_rent,
+            max_rent = excluded.max_rent,
+            min_square_feet = excluded.min_square_feet,
+            max_square_feet = excluded.max_square_feet,
+            earliest_available_date = excluded.earliest_available_date,
+            refreshed_at = excluded.refreshed_at
+        WHERE (
+            unit_availability_summary.available_units, unit_availability_summary.min_rent,
+            unit_availability_summary.max_rent, unit_availability_summary.min_square_feet,
+            unit_availability_summary.max_square_feet, unit_availability_summary.earliest_available_date
+        ) IS DISTINCT FROM (
+            excluded.available_units, excluded.min_rent, excluded.max_rent,
+            excluded.min_square_feet, excluded.max_square_feet, excluded.earliest_available_date
+        );
+    END
+    $$;
+
+    -- Claims up to batch_size queued entries (SKIP LOCKED, so concurrent
+    -- refreshers split the queue) and recomputes their communities. Every
+    -- refresher locks its communities in sorted order, so they cannot
+    -- deadlock each other, and writers take none of these locks.
+    CREATE OR REPLACE FUNCTION refresh_stale_unit_availability_summaries(batch_size integer)
+        RETURNS integer
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        claimed text[];
+        target text;
+    BEGIN
+        WITH batch AS (
+            DELETE FROM unit_availability_summary_stale
+            WHERE id IN (
+                SELECT id FROM unit_availability_summary_stale
+                ORDER BY id
+                LIMIT batch_size
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING community_id
+        )
+        SELECT array_agg(community_id) INTO claimed FROM batch;
+        IF claimed IS NULL THEN
+            RETURN 0;
+        END IF;
+        FOR target IN SELECT DISTINCT unnest(claimed) ORDER BY 1 LOOP
+            PERFORM refresh_unit_availability_summary(target);
+        END LOOP;
+        RETURN cardinality(claimed);
+    END
+    $$;
+
+    -- Prices take effect and expire without a write; the refresher calls
+    -- this periodically to pick those up. One worker at a time does it.
+    CREATE OR REPLACE FUNCTION refresh_all_unit_availability_summaries()
+        RETURNS integer
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        target text;
+        refreshed integer := 0;
+    BEGIN
+        IF NOT pg_try_advisory_xact_lock(hashtext('unit_availability_summary_all')) THEN
+            RETURN 0;
+        END IF;
+        FOR target IN SELECT id FROM communities ORDER BY 1 LOOP
+            PERFORM refresh_unit_availability_summary(target);
+            refreshed := refreshed + 1;
+        END LOOP;
+        RETURN refreshed;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION queue_unit_availability_summary() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            INSERT INTO unit_availability_summary_stale (community_id)
+            SELECT DISTINCT community_id FROM unit_availability_summary;
+        ELSIF TG_TABLE_NAME = 'unit_pricing' THEN
+            IF TG_OP <> 'DELETE' THEN
+                INSERT INTO unit_availability_summary_stale (community_id)
+                SELECT DISTINCT units.community_id FROM new_rows JOIN units ON units.id = new_rows.unit_id;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                INSERT INTO unit_availability_summary_stale (community_id)
+                SELECT DISTINCT units.community_id FROM old_rows JOIN units ON units.id = old_rows.unit_id;
+            END IF;
+        ELSE
+            IF TG_OP <> 'DELETE' THEN
+                INSERT INTO unit_availability_summary_stale (community_id)
+                SELECT DISTINCT community_id FROM new_rows;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                INSERT INTO unit_availability_summary_stale (community_id)
+                SELECT DISTINCT community_id FROM old_rows;
+            END IF;
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+    """)
+    for table in QUEUED_TABLES:
+        for event, referencing in EVENTS.items():
+            op.execute(f"""
+            CREATE TRIGGER {table}_availability_summary_{event.lower()}
+                AFTER {event} ON {table}
+                {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION queue_unit_availability_summary();
+            """)
+        op.execute(f"""
+        CREATE TRIGGER {table}_availability_summary_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION queue_unit_availability_summary();
+        """)
+    # The summary now changes after the write that caused it, so it
+    # notifies on its own; the fact sheet is rebuilt from the new rows
+    op.execute("""
+    CREATE TRIGGER unit_availability_summary_inventory_changed
+        AFTER INSERT OR UPDATE OR DELETE ON unit_availability_summary
+        FOR EACH ROW EXECUTE FUNCTION notify_inventory_changed();
+
+    SELECT refresh_all_unit_availability_summaries();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS unit_availability_summary_inventory_changed ON unit_availability_summary')
+    for table in QUEUED_TABLES:
+        for event in (*EVENTS, 'TRUNCATE'):
+            op.execute(f'DROP TRIGGER IF EXISTS {table}_availability_summary_{event.lower()} ON {table}')
+    op.execute("""
+    DROP FUNCTION IF EXISTS queue_unit_availability_summary();
+    DROP FUNCTION IF EXISTS refresh_all_unit_availability_summaries();
+    DROP FUNCTION IF EXISTS refresh_stale_unit_availability_summaries(integer);
+    DROP FUNCTION IF EXISTS refresh_unit_availability_summary(text);
+    """)
+    op.drop_table('unit_availability_summary_stale')
+
+    # Back to c8e1f4a7b305's synchronous triggers
+    op.execute("""
+    CREATE OR REPLACE FUNCTION refresh_unit_availability_summary(target_community text, target_bedrooms integer)
+        RETURNS void
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock(
+            hashtext('unit_availability_summary'),
+            hashtext(target_community || ':' || target_bedrooms)
+        );
+        DELETE FROM unit_availability_summary
+        WHERE community_id = target_community AND bedrooms = target_bedrooms;
+        INSERT INTO unit_availability_summary (
+            community_id, bedrooms, available_units, min_rent, max_rent,
+            min_square_feet, max_square_feet, earliest_available_date, refreshed_at
+        )
+        SELECT community_id, bedrooms, count(*), min(base_rent), max(base_rent),
+               min(square_feet), max(square_feet), min(available_date), now()
+        FROM units
+        WHERE community_id = target_community AND bedrooms = target_bedrooms AND is_available
+        GROUP BY community_id, bedrooms;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION unit_availability_summary_changed() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    DECLARE
+        grp record;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            FOR grp IN SELECT DISTINCT community_id, bedrooms FROM new_units ORDER BY 1, 2 LOOP
+                PERFORM refresh_unit_availability_summary(grp.community_id, grp.bedrooms);
+            END LOOP;
+        ELSIF TG_OP = 'DELETE' THEN
+            FOR grp IN SELECT DISTINCT community_id, bedrooms FROM old_units ORDER BY 1, 2 LOOP
+                PERFORM refresh_unit_availability_summary(grp.community_id, grp.bedrooms);
+            END LOOP;
+        ELSE
+            FOR grp IN
+                SELECT community_id, bedrooms FROM old_units
+                UNION
+                SELECT community_id, bedrooms FROM new_units
+                ORDER BY 1, 2
+            LOOP
+                PERFORM refresh_unit_availability_summary(grp.community_id, grp.bedrooms);
+            END LOOP;
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE OR REPLACE FUNCTION unit_availability_summary_truncated() RETURNS trigger
+        LANGUAGE plpgsql
+    AS
+    $$
+    BEGIN
+        DELETE FROM unit_availability_summary;
+        RETURN NULL;
+    END
+    $$;
+    """)
+    for event, referencing in EVENTS.items():
+        referencing = referencing.replace('_rows', '_units')
+        op.execute(f"""
+        CREATE TRIGGER units_availability_summary_{event.lower()}
+            AFTER {event} ON units
+            {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION unit_availability_summary_changed();
+        """)
+    op.execute("""
+    CREATE TRIGGER units_availability_summary_truncate
+        AFTER TRUNCATE ON units
+        FOR EACH STATEMENT EXECUTE FUNCTION unit_availability_summary_truncated();
+    """)
@@ -14,6 +14,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 @pytest.fixture
 def mock_db_session():
     session = AsyncMock(spec=AsyncSession)
+    # Awaiting begin_nested() starts the savepoint, as with AsyncSessionTransaction
+    session.begin_nested = AsyncMock(return_value=AsyncMock())
     return session
 
 
@@ -0,0 +1,109 @@
+"""
+A local stand-in for the leasing system API, implementing the three
+endpoints ``services.leasing`` calls, so integration and throughput tests
+run without the real service. Latency and a rate of 503 responses can be
+injected to exercise timeouts and retries.
+
+    LEASING_STANDIN_LATENCY_SECONDS=0.05 poetry run uvicorn leasing_standin:app --app-dir tests --port 8100
+    LEASING_API_URL=http://localhost:8100/v1 poetry run fastapi dev app/main.py
+"""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class TourProposal(BaseModel):
+    lead_id: Optional[str] = None
+    preferred_time: Optional[str] = None
+    unit_type: Optional[str] = None
+
+
+class ClarificationRequest(BaseModel):
+    user_message: str
+
+
+class HandoffRequest(BaseModel):
+    reason: Optional[str] = None
+    lead_id: Optional[str] = None
+    conversation_history: Optional[List[Dict[str, Any]]] = None
+    priority: str = "normal"
+
+
+class StandInState:
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.tickets_created = 0
+        self.idempotency_keys: List[Optional[str]] = []
+        # Handoff tickets by Idempotency-Key, so a retried create returns the same ticket
+        self.tickets: Dict[str, str] = {}
+
+
+def create_app(latency_seconds: float = 0.0, failure_rate: float = 0.0, fail_first: int = 0, seed: Optional[int] = None) -> FastAPI:
+    """
+    ``failure_rate`` of requests get a 503, as do the first ``fail_first``
+    requests. Counters are on ``app.state.standin``.
+    """
+    app = FastAPI(title="Leasing system stand-in")
+    state = app.state.standin = StandInState()
+    rng = random.Random(seed)
+
+    @app.middleware("http")
+    async def simulate(request, call_next):
+        state.requests += 1
+        state.idempotency_keys.append(request.headers.get("idempotency-key"))
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            if latency_seconds:
+                await asyncio.sleep(latency_seconds)
+            if state.requests <= fail_first or rng.random() < failure_rate:
+                return JSONResponse({"detail": "Service unavailable"}, status_code=503)
+            return await call_next(request)
+        finally:
+            state.in_flight -= 1
+
+    @app.post("/v1/tours/propose")
+    async def propose(proposal: TourProposal):
+        tomorrow = datetime.now() + timedelta(days=1)
+        return {
+            "suggested_time": "10:00 AM" if proposal.preferred_time is None else proposal.preferred_time,
+            "suggested_date": tomorrow.strftime("%Y-%m-%d"),
+            "unit_id": "B101" if proposal.unit_type == "2BR" else "A101",
+        }
+
+    @app.post("/v1/clarification/generate")
+    async def clarification(request: ClarificationRequest):
+        return {
+            "question": "Which day would you like to visit?",
+            "options": ["Weekday morning", "Weekday evening", "Weekend"],
+        }
+
+    @app.post("/v1/handoff/create")
+    async def handoff(request: HandoffRequest, idempotency_key: Optional[str] = Header(default=None)):
+        ticket_id = state.tickets.get(idempotency_key) if idempotency_key else None
+        if ticket_id is None:
+            state.tickets_created += 1
+            ticket_id = f"TICKET_{state.tickets_created:05d}"
+            if idempotency_key:
+                state.tickets[idempotency_key] = ticket_id
+        return {
+            "assigned_agent_id": "agent_standin",
+            "wait_time_minutes": 1 if request.priority == "high" else 5,
+            "ticket_id": ticket_id,
+        }
+
+    return app
+
+
+app = create_app(
+    latency_seconds=float(os.environ.get("LEASING_STANDIN_LATENCY_SECONDS", 0)),
+    failure_rate=float(os.environ.get("LEASING_STANDIN_FAILURE_RATE", 0)),
+)
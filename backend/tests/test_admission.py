@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+import httpx
+from core.admission import AdmissionControlMiddleware, RouteClassLimit, _abandon_acquire, acquire_within, rejected_counter
+from core.metrics import registry
+
+
+def build_app(release: asyncio.Event, max_concurrency: int = 1, max_queue: int = 0, queue_timeout: float = 0.05):
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return AdmissionControlMiddleware(
+        slow_app,
+        limits={"llm": RouteClassLimit(max_concurrency, max_queue, queue_timeout)},
+        classify=lambda path: "llm" if path == "/reply" else None,
+        retry_after_seconds=3,
+    )
+
+
+class TestAdmissionControl:
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """Test excess requests are shed with 503 and Retry-After"""
+
+        release = asyncio.Event()
+        app = build_app(release)
+        before = rejected_counter.value(route_class="llm", reason="queue_full")
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/reply"))
+            await asyncio.sleep(0.01)
+
+            rejected = await client.get("/reply")
+            assert rejected.status_code == 503
+            assert rejected.headers["retry-after"] == "3"
+            assert rejected.json()["reason"] == "queue_full"
+
+            release.set()
+            assert (await first).status_code == 200
+
+        assert rejected_counter.value(route_class="llm", reason="queue_full") == before + 1
+        assert app.limiters["llm"].in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_queued_request_times_out(self):
+        """Test queued requests are shed once the queue timeout elapses"""
+
+        release = asyncio.Event()
+        app = build_app(release, max_queue=1)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/reply"))
+            await asyncio.sleep(0.01)
+
+            queued = await client.get("/reply")
+            assert queued.status_code == 503
+            assert queued.json()["reason"] == "queue_timeout"
+
+            release.set()
+            await first
+
+        assert app.limiters["llm"].waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_queued_request_admitted_when_slot_frees(self):
+        """Test a queued request is served once the in-flight one completes"""
+
+        release = asyncio.Event()
+        app = build_app(release, max_queue=1, queue_timeout=1.0)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/reply"))
+            second = asyncio.create_task(client.get("/reply"))
+            await asyncio.sleep(0.01)
+            assert app.limiters["llm"].waiting == 1
+
+            release.set()
+            assert (await first).status_code == 200
+            assert (await second).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_unclassified_routes_bypass_limits(self):
+        """Test routes outside any class are never shed"""
+
+        release = asyncio.Event()
+        release.set()
+        app = build_app(release, max_concurrency=1)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/metrics")
+            assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_acquire_within_never_leaks_a_permit(self):
+        """Test timed-out, cancelled and raced acquisitions all leave the semaphore's permits intact"""
+
+        semaphore = asyncio.Semaphore(1)
+        assert await acquire_within(semaphore, 0.01) is True
+        assert await acquire_within(semaphore, 0.01) is False
+
+        waiter = asyncio.create_task(acquire_within(semaphore, 5))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        # The holder releases and the pending acquire is woken, but it is
+        # abandoned before it runs, as when the timeout fires at that moment
+        acquire = asyncio.ensure_future(semaphore.acquire())
+        await asyncio.sleep(0)
+        semaphore.release()
+        _abandon_acquire(semaphore, acquire)
+        await asyncio.sleep(0)
+        assert not semaphore.locked()
+
+        # The acquire completes before it is abandoned
+        acquire = asyncio.ensure_future(semaphore.acquire())
+        await asyncio.sleep(0)
+        assert semaphore.locked()
+        _abandon_acquire(semaphore, acquire)
+        assert not semaphore.locked()
+        assert await acquire_within(semaphore, 0.01) is True
+
+    def test_metrics_rendered(self):
+        """Test queue depth and rejections are exposed in the metrics output"""
+
+        output = registry.render()
+        assert "# TYPE admission_queue_depth gauge" in output
+        assert "# TYPE admission_rejected_total counter" in output
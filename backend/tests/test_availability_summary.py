@@ -0,0 +1,179 @@
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from db.availability_summary import AvailabilitySummaryRefresher, refreshed_counter
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+WRITERS = 40
+
+
+def mock_engine(*results):
+    connection = AsyncMock()
+    connection.scalar.side_effect = list(results)
+    engine = MagicMock()
+    engine.execution_options.return_value = engine
+    engine.begin.return_value.__aenter__.return_value = connection
+    return engine, connection
+
+
+class TestAvailabilitySummaryRefresher:
+
+    @pytest.mark.asyncio
+    async def test_drains_queue_in_read_committed_batches(self):
+        """Test the queue is drained batch by batch until a short batch, each in a READ COMMITTED transaction"""
+
+        engine, connection = mock_engine(100, 100, 7)
+        refresher = AvailabilitySummaryRefresher(engine, poll_interval_seconds=1, full_refresh_interval_seconds=300)
+        before = refreshed_counter.value(kind="queued")
+
+        assert await refresher.refresh_pending() == 207
+
+        engine.execution_options.assert_called_once_with(isolation_level="READ COMMITTED")
+        assert engine.begin.call_count == 3
+        assert [call[0][1] for call in connection.scalar.call_args_list] == [{"batch_size": 100}] * 3
+        assert refreshed_counter.value(kind="queued") == before + 207
+
+    @pytest.mark.asyncio
+    async def test_full_refresh_only_once_per_interval(self):
+        """Test everything is recomputed on the first pass, then only queued communities until the interval passes"""
+
+        engine, connection = mock_engine(12, 0, 0)
+        refresher = AvailabilitySummaryRefresher(engine, poll_interval_seconds=1, full_refresh_interval_seconds=300)
+
+        await refresher._refresh()
+        await refresher._refresh()
+
+        statements = [str(call[0][0]) for call in connection.scalar.call_args_list]
+        assert statements == [
+            "SELECT refresh_all_unit_availability_summaries()",
+            "SELECT refresh_stale_unit_availability_summaries(:batch_size)",
+            "SELECT refresh_stale_unit_availability_summaries(:batch_size)",
+        ]
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestAvailabilitySummaryOnDatabase:
+
+    @pytest.fixture
+    async def engine(self):
+        engine = create_async_engine(
+            TEST_DATABASE_URL.replace("postgresql", "postgresql+asyncpg", 1),
+            pool_size=20,
+            max_overflow=0,
+        )
+        yield engine
+        await engine.dispose()
+
+    @pytest.fixture
+    async def communities(self, engine):
+        now = datetime.now(timezone.utc)
+        community_ids = []
+        async with engine.begin() as connection:
+            for _ in range(2):
+                community_id = await connection.scalar(
+                    text("INSERT INTO communities (name, address) VALUES ('summary stress', 'test') RETURNING id")
+                )
+                community_ids.append(community_id)
+                # A 2BR unit per writer, so writers share summary groups but no rows
+                for bedrooms, count in ((1, 3), (2, WRITERS)):
+                    for number in range(count):
+                        await connection.execute(
+                            text("""
+                            INSERT INTO units (community_id, unit_number, bedrooms, bathrooms, square_feet, base_rent, is_available)
+                            VALUES (:community_id, :unit_number, :bedrooms, 1, 700, 1000, true)
+                            """),
+                            {"community_id": community_id, "unit_number": f"{bedrooms}{number:02d}", "bedrooms": bedrooms},
+                        )
+            # One 1BR unit in the first community is currently priced under
+            # its base rent; a cheaper price that starts tomorrow must not count
+            priced_unit = await connection.scalar(
+                text("SELECT id FROM units WHERE community_id = :id AND unit_number = '100'"), {"id": community_ids[0]}
+            )
+            for rent, effective_date in ((900, now - timedelta(days=1)), (500, now + timedelta(days=1))):
+                await connection.execute(
+                    text("""
+                    INSERT INTO unit_pricing (unit_id, move_in_date, rent, effective_date)
+                    VALUES (:unit_id, :move_in_date, :rent, :effective_date)
+                    """),
+                    {"unit_id": priced_unit, "move_in_date": now - timedelta(days=30), "rent": rent, "effective_date": effective_date},
+                )
+        yield community_ids
+        async with engine.begin() as connection:
+            for community_id in community_ids:
+                await connection.execute(
+                    text("DELETE FROM unit_pricing WHERE unit_id IN (SELECT id FROM units WHERE community_id = :id)"),
+                    {"id": community_id},
+                )
+                await connection.execute(text("DELETE FROM units WHERE community_id = :id"), {"id": community_id})
+                await connection.execute(text("DELETE FROM communities WHERE id = :id"), {"id": community_id})
+                await connection.execute(
+                    text("DELETE FROM unit_availability_summary_stale WHERE community_id = :id"), {"id": community_id}
+                )
+
+    @pytest.mark.asyncio
+    async def test_cross_community_writers_do_not_deadlock(self, engine, communities):
+        """Test writers touching two communities in opposite orders, at mixed isolation levels, all commit and the summary converges"""
+
+        first, second = communities
+
+        async def write(i: int):
+            order = (first, second) if i % 2 else (second, first)
+            isolation_level = "REPEATABLE READ" if i % 4 < 2 else "READ COMMITTED"
+            async with engine.connect() as connection:
+                connection = await connection.execution_options(isolation_level=isolation_level)
+                async with connection.begin():
+                    for community_id in order:
+                        await connection.execute(
+                            text("""
+                            UPDATE units SET square_feet = :square_feet, is_available = :available
+                            WHERE community_id = :community_id AND unit_number = :unit_number
+                            """),
+                            {
+                                "square_feet": 700 + i,
+                                "available": i % 5 != 0,
+                                "community_id": community_id,
+                                "unit_number": f"2{i:02d}",
+                            },
+                        )
+                        await asyncio.sleep(0.005)
+
+        await asyncio.gather(*(write(i) for i in range(WRITERS)))
+
+        async with engine.connect() as connection:
+            queued = await connection.scalar(
+                text("SELECT count(*) FROM unit_availability_summary_stale WHERE community_id IN (:a, :b)"),
+                {"a": first, "b": second},
+            )
+        assert queued > 0
+
+        refresher = AvailabilitySummaryRefresher(engine, poll_interval_seconds=1, full_refresh_interval_seconds=300)
+        await refresher.refresh_pending()
+
+        async with engine.connect() as connection:
+            summary = (await connection.execute(
+                text("""
+                SELECT community_id, bedrooms, available_units, min_rent, max_rent, max_square_feet
+                FROM unit_availability_summary WHERE community_id IN (:a, :b)
+                """),
+                {"a": first, "b": second},
+            )).all()
+            expected = (await connection.execute(
+                text("""
+                SELECT community_id, bedrooms, count(*), max(square_feet)
+                FROM units WHERE community_id IN (:a, :b) AND is_available
+                GROUP BY community_id, bedrooms
+                """),
+                {"a": first, "b": second},
+            )).all()
+
+        by_group = {(row.community_id, row.bedrooms): row for row in summary}
+        assert len(by_group) == len(expected)
+        for community_id, bedrooms, available_units, max_square_feet in expected:
+            row = by_group[(community_id, bedrooms)]
+            assert (row.available_units, row.max_square_feet) == (available_units, max_square_feet)
+        assert (by_group[(first, 1)].min_rent, by_group[(first, 1)].max_rent) == (900, 1000)
+        assert (by_group[(second, 1)].min_rent, by_group[(second, 1)].max_rent) == (1000, 1000)
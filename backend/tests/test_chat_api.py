@@ -5,6 +5,8 @@ import httpx
 from datetime import datetime
 from main import app
 from api.v1.chat import StartChatRequest, ReplyRequest, Lead, Preferences
+from db.routing import WRITTEN_TABLES
+from services.fact_sheet import FactSheet
 
 
 class TestChatAPI:
@@ -27,10 +29,14 @@ class TestChatAPI:
             MockCommunity("comm_2", "Oak Valley", "456 Oak Ave", "555-0200", "info@oakvalley.com")
         ]
         
-        with patch('api.v1.chat.CommunityRepository') as mock_repo_class:
+        with patch('api.v1.chat.CommunityRepository') as mock_repo_class, \
+             patch('api.v1.chat.AvailabilitySummaryRepository') as mock_summary_repo_class:
             mock_repo = AsyncMock()
             mock_repo.get_all.return_value = mock_communities
             mock_repo_class.return_value = mock_repo
+            mock_summary_repo = AsyncMock()
+            mock_summary_repo.get_available_counts.return_value = {"comm_1": 12}
+            mock_summary_repo_class.return_value = mock_summary_repo
             
             with patch('api.v1.chat.get_db_session') as mock_get_db:
                 mock_get_db.return_value = AsyncMock()
@@ -43,18 +49,18 @@ class TestChatAPI:
                     assert len(data) == 2
                     assert data[0]["name"] == "Sunset Gardens"
                     assert data[1]["name"] == "Oak Valley"
+                    assert data[0]["available_units"] == 12
+                    assert data[1]["available_units"] == 0
 
     @pytest.mark.asyncio
     async def test_start_chat_success(self):
         """Test successful chat initiation"""
         
-        mock_lead = MagicMock()
-        mock_lead.id = "lead_123"
-        mock_lead.name = "John Doe"
-        mock_lead.email = "john@example.com"
-        
-        mock_conversation = MagicMock()
-        mock_conversation.id = "conv_456"
+        mock_started = MagicMock()
+        mock_started.lead_id = "lead_123"
+        mock_started.name = "John Doe"
+        mock_started.email = "john@example.com"
+        mock_started.conversation_id = "conv_456"
         
         request_data = {
             "lead": {
@@ -70,17 +76,12 @@ class TestChatAPI:
         }
         
         with patch('api.v1.chat.LeadRepository') as mock_lead_repo_class, \
-             patch('api.v1.chat.ConversationRepository') as mock_conv_repo_class, \
              patch('api.v1.chat.get_db_session') as mock_get_db:
             
             mock_lead_repo = AsyncMock()
-            mock_lead_repo.create_or_get_by_email.return_value = mock_lead
+            mock_lead_repo.create_with_conversation.return_value = mock_started
             mock_lead_repo_class.return_value = mock_lead_repo
             
-            mock_conv_repo = AsyncMock()
-            mock_conv_repo.create.return_value = mock_conversation
-            mock_conv_repo_class.return_value = mock_conv_repo
-            
             mock_get_db.return_value = AsyncMock()
             
             async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
@@ -92,6 +93,8 @@ class TestChatAPI:
                 assert data["conversation_id"] == "conv_456"
                 assert "John" in data["message"]
                 assert "2-bedroom" in data["message"]
+                mock_lead_repo.create_with_conversation.assert_called_once()
+                assert mock_lead_repo.create_with_conversation.call_args[0][2] == "community_123"
 
     @pytest.mark.asyncio
     async def test_reply_stream_availability_success(self):
@@ -115,10 +118,13 @@ class TestChatAPI:
              patch('api.v1.chat.LeadRepository') as mock_lead_repo_class, \
              patch('api.v1.chat.ConversationRepository') as mock_conv_repo_class, \
              patch('api.v1.chat.MessageRepository') as mock_msg_repo_class, \
+             patch('api.v1.chat.get_fact_sheet') as mock_get_fact_sheet, \
              patch('api.v1.chat.handle_lead_inquiry') as mock_handle_inquiry:
             
             # Mock database context
             mock_db = AsyncMock()
+            mock_db.info = {}
+            mock_get_fact_sheet.return_value = FactSheet("community_123", "3f9a2c1b0d4e", "Pets: cats allowed", 0, None)
             mock_get_db_context.return_value.__aenter__.return_value = mock_db
             
             # Mock repositories
@@ -165,8 +171,15 @@ class TestChatAPI:
                 
                 # Verify repositories were called
                 mock_lead_repo.get_by_id.assert_called_once_with(mock_db, "lead_123")
+                assert mock_db.info[WRITTEN_TABLES] == {"leads", "conversations", "messages"}
                 mock_conv_repo.get_by_id.assert_called_once_with(mock_db, "conv_456")
+                mock_get_fact_sheet.assert_awaited_once_with(mock_db, "community_123")
+                assert mock_handle_inquiry.call_args[0][1]["fact_sheet"] == {"version": "3f9a2c1b0d4e", "text": "Pets: cats allowed"}
                 mock_msg_repo.create.assert_called_once()
+                mock_msg_repo.update.assert_not_called()
+                message_data = mock_msg_repo.create.call_args[0][1]
+                assert len(message_data["id"]) == 21
+                assert message_data["reply_text"] == mock_response.response_text
 
     @pytest.mark.asyncio
     async def test_reply_stream_error_handling(self):
@@ -176,6 +189,7 @@ class TestChatAPI:
              patch('api.v1.chat.LeadRepository') as mock_lead_repo_class:
             
             mock_db = AsyncMock()
+            mock_db.info = {}
             mock_get_db_context.return_value.__aenter__.return_value = mock_db
             
             # Mock lead not found scenario
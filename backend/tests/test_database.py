@@ -0,0 +1,289 @@
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+from db.database import build_engine_options
+from db.instrumentation import (
+    SQLInstrumentationMiddleware, StatementTimer, current_method, current_request, repository_method,
+    slow_statements_counter, statement_duration_histogram, tracking_request,
+)
+from db.repository import BaseRepository
+from db.partitions import (
+    check_default_partition, default_partition_rows_gauge, ensure_partitions, expire_partitions, partitions_expired_counter,
+)
+from db.routing import ReplicaSet, RoutingSession, reading_from_primary
+from models import TourSlot, Unit
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from db.pool import InstrumentedAsyncQueuePool, checkout_timeout_counter, overflow_counter
+from core.metrics import registry
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class TestEngineOptions:
+
+    def test_pool_settings_applied(self):
+        """Test pool sizing and statement timeout come from settings"""
+
+        with patch('db.database.settings') as mock_settings:
+            mock_settings.DB_PGBOUNCER_MODE = False
+            mock_settings.DB_STATEMENT_TIMEOUT_MS = 5000
+            mock_settings.DB_POOL_SIZE = 7
+            mock_settings.DB_MAX_OVERFLOW = 3
+
+            options = build_engine_options("primary")
+
+        assert options["poolclass"] is InstrumentedAsyncQueuePool
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    def test_pgbouncer_mode_disables_statement_cache(self):
+        """Test PgBouncer mode disables prepared statement caching"""
+
+        with patch('db.database.settings') as mock_settings:
+            mock_settings.DB_PGBOUNCER_MODE = True
+            mock_settings.DB_STATEMENT_TIMEOUT_MS = 5000
+
+            connect_args = build_engine_options("primary")["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+        assert connect_args["command_timeout"] == 5
+        assert "server_settings" not in connect_args
+
+
+class TestInstrumentedPool:
+
+    @pytest.mark.asyncio
+    async def test_overflow_and_timeout_recorded(self):
+        """Test overflow connections and checkout timeouts are counted"""
+
+        pool = InstrumentedAsyncQueuePool(
+            lambda: MagicMock(), pool_size=1, max_overflow=1, timeout=0.01, logging_name="test_pool"
+        )
+
+        first = await greenlet_spawn(pool.connect)
+        second = await greenlet_spawn(pool.connect)
+        assert overflow_counter.value(pool="test_pool") == 1
+
+        with pytest.raises(exc.TimeoutError):
+            await greenlet_spawn(pool.connect)
+        assert checkout_timeout_counter.value(pool="test_pool") == 1
+
+        output = registry.render()
+        assert 'db_pool_checked_out_connections{pool="test_pool"} 2' in output
+        assert 'db_pool_checkout_wait_seconds_count{pool="test_pool"} 3' in output
+
+        first.close()
+        second.close()
+
+
+class TestRoutingSession:
+
+    @pytest.fixture
+    def session(self):
+        primary = create_async_engine("postgresql+asyncpg://u:p@primary/db")
+        replicas = ReplicaSet(
+            [create_async_engine("postgresql+asyncpg://u:p@replica/db")],
+            max_lag_seconds=1.0,
+            check_interval_seconds=1.0,
+        )
+        replicas.record_lag(replicas.replicas[0], 0.1)
+        session = AsyncSession(primary, sync_session_class=RoutingSession, replicas=replicas)
+        session.sync_session.primary = primary.sync_engine
+        session.sync_session.replica = replicas.replicas[0].engine.sync_engine
+        return session.sync_session
+
+    def test_plain_selects_go_to_replica(self, session):
+        """Test reads are routed to a healthy replica and writes to the primary"""
+
+        assert session.get_bind(clause=select(Unit)) is session.replica
+        assert session.get_bind(clause=select(Unit).with_for_update()) is session.primary
+        assert session.get_bind(clause=update(Unit).values(is_available=False)) is session.primary
+
+    def test_read_your_writes(self, session):
+        """Test tables written in the session are read from the primary"""
+
+        session.get_bind(clause=update(TourSlot).values(current_bookings=1))
+
+        assert session.get_bind(clause=select(TourSlot)) is session.primary
+        assert session.get_bind(clause=select(Unit)) is session.replica
+
+    def test_data_modifying_cte_goes_to_primary(self, session):
+        """Test a SELECT wrapping an INSERT ... RETURNING is not sent to a replica"""
+
+        cte = update(Unit).values(is_available=False).returning(Unit.id).cte("changed")
+        assert session.get_bind(clause=select(cte.c.id)) is session.primary
+
+    def test_lagging_replica_falls_back_to_primary(self, session):
+        """Test a replica beyond the allowed lag is taken out of rotation"""
+
+        session.replicas.record_lag(session.replicas.replicas[0], 5.0)
+        assert session.get_bind(clause=select(Unit)) is session.primary
+
+    def test_reading_from_primary(self, session):
+        """Test reads can be forced onto the primary for a block"""
+
+        with reading_from_primary(session):
+            assert session.get_bind(clause=select(Unit)) is session.primary
+        assert session.get_bind(clause=select(Unit)) is session.replica
+
+
+class TestPartitionMaintenance:
+
+    @pytest.mark.asyncio
+    async def test_expired_partitions_are_counted(self):
+        """Test retention reports and counts the partitions it detached"""
+
+        connection = AsyncMock()
+        connection.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=iter(["tool_calls_p2024_01", "tool_calls_p2024_02"]))
+        )
+
+        expired = await expire_partitions(connection, "tool_calls", keep_months=6, drop=False)
+
+        assert expired == ["tool_calls_p2024_01", "tool_calls_p2024_02"]
+        assert connection.execute.call_args[0][1] == {"table": "tool_calls", "keep_months": 6, "drop": False}
+        assert partitions_expired_counter.value(table="tool_calls") == 2
+
+    @pytest.mark.asyncio
+    async def test_rows_left_in_default_partition_are_reported(self, caplog):
+        """Test rows left in the default partition set the gauge and log a warning"""
+
+        connection = AsyncMock()
+        connection.scalar.return_value = 3
+
+        assert await check_default_partition(connection, "messages") == 3
+
+        assert str(connection.scalar.call_args[0][0]) == "SELECT count(*) FROM messages_default"
+        assert default_partition_rows_gauge.value(table="messages") == 3
+        assert "Rows left in the default partition - Table: messages, Rows: 3" in caplog.text
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestDefaultPartition:
+
+    @pytest.fixture
+    async def engine(self):
+        engine = create_async_engine(TEST_DATABASE_URL.replace("postgresql", "postgresql+asyncpg", 1))
+        yield engine
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM tool_calls WHERE function_name = 'default_partition_probe'"))
+            await connection.execute(text("DROP TABLE IF EXISTS tool_calls_p2001_01"))
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_unpartitioned_months_are_split_out_of_default(self, engine):
+        """Test rows without a partition are accepted, then moved into their month's partition by maintenance"""
+
+        insert = text("""
+        INSERT INTO tool_calls (function_name, execution_time_ms, success, created_at)
+        VALUES ('default_partition_probe', 1, true, :created_at)
+        """)
+        async with engine.begin() as connection:
+            await connection.execute(insert, {"created_at": datetime(2001, 1, 15, tzinfo=timezone.utc)})
+            await connection.execute(insert, {"created_at": datetime(2099, 1, 15, tzinfo=timezone.utc)})
+
+        async with engine.begin() as connection:
+            await ensure_partitions(connection, "tool_calls", months_ahead=3)
+            left = await check_default_partition(connection, "tool_calls")
+
+        async with engine.connect() as connection:
+            split = await connection.scalar(
+                text("SELECT count(*) FROM tool_calls_p2001_01 WHERE function_name = 'default_partition_probe'")
+            )
+            partition = await connection.scalar(
+                text("SELECT tableoid::regclass::text FROM tool_calls WHERE created_at = '2099-01-15 00:00+00'")
+            )
+
+        assert split == 1
+        assert left == 1
+        assert partition == "tool_calls_default"
+
+
+class TestStatementInstrumentation:
+
+    @staticmethod
+    def run_statement(timer, statement="SELECT 1", seconds=0.01, options=None):
+        context = MagicMock(execution_options=options or {})
+        with patch('db.instrumentation.time.perf_counter', side_effect=[100.0, 100.0 + seconds]):
+            timer.before_cursor_execute(None, None, statement, (), context, False)
+            timer.after_cursor_execute(None, None, statement, (), context, False)
+
+    @pytest.mark.asyncio
+    async def test_repository_methods_are_tagged(self):
+        """Test statements are attributed to the outermost repository method, per subclass"""
+
+        class ProbeRepository(BaseRepository):
+            async def outer(self, db):
+                return await self.inner(db)
+
+            async def inner(self, db):
+                return current_method()
+
+            async def get_by_id(self, db, id):
+                return current_method()
+
+        repo = ProbeRepository(Unit)
+
+        assert await repo.outer(None) == "ProbeRepository.outer"
+        assert await repo.get_by_id(None, "unit_1") == "ProbeRepository.get_by_id"
+        assert current_method() == "unattributed"
+
+    def test_statements_recorded_per_request_and_method(self):
+        """Test each statement is timed into the request totals and the method histogram"""
+
+        timer = StatementTimer(MagicMock(), threshold_ms=0, explain=False)
+
+        with tracking_request("req-1") as stats:
+            with repository_method("UnitRepository.get_by_id"):
+                self.run_statement(timer, seconds=0.25)
+                self.run_statement(timer, seconds=0.5)
+            self.run_statement(timer, seconds=0.5, options={"skip_instrumentation": True})
+
+        assert stats.statements == 2
+        assert stats.seconds == pytest.approx(0.75)
+        assert stats.methods["UnitRepository.get_by_id"].statements == 2
+        assert statement_duration_histogram.count(method="UnitRepository.get_by_id") >= 2
+
+    def test_slow_statements_logged(self, caplog):
+        """Test statements over the threshold are counted and logged with the request id"""
+
+        timer = StatementTimer(MagicMock(), threshold_ms=100, explain=False)
+        before = slow_statements_counter.value(method="unattributed")
+
+        with tracking_request("req-slow"):
+            self.run_statement(timer, "SELECT * FROM units", seconds=0.05)
+            self.run_statement(timer, "SELECT * FROM units WHERE bedrooms = $1", seconds=0.2)
+
+        assert slow_statements_counter.value(method="unattributed") == before + 1
+        assert "RequestID: req-slow, Time: 200.0ms, SQL: SELECT * FROM units WHERE bedrooms = $1" in caplog.text
+
+    def test_slow_statements_explained_once_per_interval(self):
+        """Test repeated slow statements are only explained once, and writes outside DML are not"""
+
+        timer = StatementTimer(MagicMock(), threshold_ms=100, explain=True)
+
+        assert timer._should_explain("SELECT * FROM units")
+        assert not timer._should_explain("SELECT * FROM units")
+        assert not timer._should_explain("COMMIT")
+
+    @pytest.mark.asyncio
+    async def test_middleware_flags_n_plus_one(self, caplog):
+        """Test a request running one method many times is reported as a likely N+1"""
+
+        async def app(scope, receive, send):
+            for _ in range(3):
+                current_request().record("UnitRepository.get_by_id", 0.001)
+
+        middleware = SQLInstrumentationMiddleware(app, n_plus_one_threshold=3)
+        await middleware({"type": "http", "path": "/api/v1/chat/reply"}, None, None)
+
+        assert "Statements: 3" in caplog.text
+        assert "Possible N+1" in caplog.text
+        assert "UnitRepository.get_by_id x3" in caplog.text
@@ -0,0 +1,165 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone, timedelta
+from models import PetType
+from services.fact_sheet import FactSheetCache, compile_fact_sheet, fact_sheet_cache, get_fact_sheet
+
+NOW = datetime(2024, 2, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def community():
+    community = MagicMock(id="community_123", address="1 Main St", phone="555-0100", email=None)
+    community.name = "Sunset Apartments"
+    return community
+
+
+def pet_policies():
+    return [
+        MagicMock(pet_type=PetType.DOG, allowed=True, fee=None, deposit=300, monthly_rent=50, max_count=2, weight_limit=50, notes=None),
+        MagicMock(pet_type=PetType.CAT, allowed=True, fee=100, deposit=None, monthly_rent=25, max_count=None, weight_limit=None, notes=None),
+        MagicMock(pet_type=PetType.BIRD, allowed=False),
+    ]
+
+
+def unit_mix():
+    return [
+        MagicMock(bedrooms=0, available_units=2, min_rent=1400, max_rent=1400, min_square_feet=450, max_square_feet=500, earliest_available_date=None),
+        MagicMock(bedrooms=2, available_units=5, min_rent=2400, max_rent=2600, min_square_feet=1100, max_square_feet=1250, earliest_available_date=datetime(2024, 2, 15, tzinfo=timezone.utc)),
+    ]
+
+
+def special(unit_number, bedrooms, effective_date, expires_date=None, offer="One month free", discount=None):
+    return MagicMock(unit_number=unit_number, bedrooms=bedrooms, special_offer=offer, special_discount=discount, effective_date=effective_date, expires_date=expires_date)
+
+
+@pytest.fixture
+def fact_sheet_repos():
+    with patch('services.fact_sheet.CommunityRepository') as mock_community_repo_class, \
+         patch('services.fact_sheet.PetPolicyRepository') as mock_policy_repo_class, \
+         patch('services.fact_sheet.AvailabilitySummaryRepository') as mock_summary_repo_class, \
+         patch('services.fact_sheet.UnitPricingRepository') as mock_pricing_repo_class:
+
+        mock_community_repo = AsyncMock()
+        mock_community_repo.get_by_id.return_value = community()
+        mock_community_repo_class.return_value = mock_community_repo
+
+        mock_policy_repo_class.return_value = AsyncMock(get_by_community_id=AsyncMock(return_value=pet_policies()))
+        mock_summary_repo_class.return_value = AsyncMock(get_by_community=AsyncMock(return_value=unit_mix()))
+        mock_pricing_repo = AsyncMock()
+        mock_pricing_repo.get_community_specials.return_value = []
+        mock_pricing_repo_class.return_value = mock_pricing_repo
+
+        yield mock_community_repo, mock_pricing_repo
+
+
+class TestCompileFactSheet:
+
+    def test_compiles_compact_versioned_text(self):
+        """Test contact details, pet policies, unit mix and active specials are all in the sheet"""
+
+        specials = [
+            special("101", 2, NOW - timedelta(days=1), NOW + timedelta(days=10), discount=500),
+            special("102", 2, NOW - timedelta(days=1), NOW + timedelta(days=10), discount=500),
+            special("201", 0, NOW + timedelta(days=3), offer="Waived deposit"),
+        ]
+        sheet = compile_fact_sheet(community(), pet_policies(), unit_mix(), specials, generation=4, now=NOW)
+
+        assert sheet.text == "\n".join([
+            "Sunset Apartments: 1 Main St; 555-0100",
+            "Pets: birds not allowed; cats allowed ($100 fee, $25/month); dogs allowed (max 2, up to 50 lb, $300 deposit, $50/month)",
+            "Available units:",
+            "- Studio: 2 available, $1,400, 450-500 sq ft",
+            "- 2 bed: 5 available, $2,400-$2,600, 1,100-1,250 sq ft, earliest move-in 2024-02-15",
+            "Current specials:",
+            "- One month free ($500 off): units 101 (2 bed), 102 (2 bed), until 2024-02-11",
+        ])
+        assert sheet.generation == 4
+        assert len(sheet.version) == 12
+        # The scheduled special starts before the active one expires
+        assert sheet.valid_until == NOW + timedelta(days=3)
+
+    def test_version_follows_content(self):
+        """Test the version changes with the facts and only with the facts"""
+
+        first = compile_fact_sheet(community(), pet_policies(), unit_mix(), [], generation=1, now=NOW)
+        same = compile_fact_sheet(community(), pet_policies(), unit_mix(), [], generation=2, now=NOW + timedelta(hours=1))
+        changed = compile_fact_sheet(community(), pet_policies()[:2], unit_mix(), [], now=NOW)
+
+        assert first.version == same.version
+        assert first.version != changed.version
+        assert first.valid_until is None
+        assert "Current specials: none" in first.text
+
+
+class TestFactSheetCache:
+
+    @pytest.mark.asyncio
+    async def test_rebuilt_only_after_invalidation(self, mock_db_session, fact_sheet_repos):
+        """Test a sheet is compiled once and rebuilt after its community's rows change"""
+
+        mock_community_repo, _ = fact_sheet_repos
+        cache = FactSheetCache()
+        cache.set_live(True)
+
+        first = await cache.get(mock_db_session, "community_123")
+        assert await cache.get(mock_db_session, "community_123") is first
+        assert mock_community_repo.get_by_id.await_count == 1
+
+        cache.invalidate("community_456")
+        assert await cache.get(mock_db_session, "community_123") is first
+
+        cache.invalidate("community_123")
+        rebuilt = await cache.get(mock_db_session, "community_123")
+        assert rebuilt is not first
+        assert rebuilt.version == first.version
+        assert mock_community_repo.get_by_id.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_special_and_bypass_rebuild(self, mock_db_session, fact_sheet_repos):
+        """Test a sheet is rebuilt once a special in it expires, and never kept while the listener is down"""
+
+        mock_community_repo, mock_pricing_repo = fact_sheet_repos
+        mock_pricing_repo.get_community_specials.return_value = [
+            special("101", 2, datetime.now(timezone.utc) - timedelta(days=1), datetime.now(timezone.utc) - timedelta(seconds=1))
+        ]
+        cache = FactSheetCache()
+        cache.set_live(True)
+        await cache.get(mock_db_session, "community_123")
+        await cache.get(mock_db_session, "community_123")
+        assert mock_community_repo.get_by_id.await_count == 2
+
+        cache.set_live(False)
+        mock_pricing_repo.get_community_specials.return_value = []
+        await cache.get(mock_db_session, "community_123")
+        await cache.get(mock_db_session, "community_123")
+        assert mock_community_repo.get_by_id.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_unknown_community(self, mock_db_session, fact_sheet_repos):
+        """Test a missing community yields no sheet"""
+
+        mock_community_repo, _ = fact_sheet_repos
+        mock_community_repo.get_by_id.return_value = None
+        cache = FactSheetCache()
+        cache.set_live(True)
+
+        assert await cache.get(mock_db_session, "community_999") is None
+
+    @pytest.mark.asyncio
+    async def test_built_on_request_session_in_savepoint(self, mock_db_session, fact_sheet_repos):
+        """Test the sheet is read on the caller's session, in a savepoint that is rolled back even on failure"""
+
+        mock_community_repo, _ = fact_sheet_repos
+        savepoint = mock_db_session.begin_nested.return_value
+
+        with patch.object(fact_sheet_cache, "live", False):
+            sheet = await get_fact_sheet(mock_db_session, "community_123")
+        assert sheet.text.startswith("Sunset Apartments")
+        mock_community_repo.get_by_id.assert_awaited_once_with(mock_db_session, "community_123")
+        savepoint.rollback.assert_awaited_once()
+
+        mock_community_repo.get_by_id.side_effect = Exception("canceling statement due to statement timeout")
+        with patch.object(fact_sheet_cache, "live", False):
+            assert await get_fact_sheet(mock_db_session, "community_123") is None
+        assert savepoint.rollback.await_count == 2
+        mock_db_session.rollback.assert_not_called()
@@ -0,0 +1,159 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone, timedelta
+from models import PetType
+from services.inventory import InventoryCache, CommunityInventory, PricingRecord, UnitRecord, UnitSearch
+
+
+def pricing_row(rent, move_in, effective=None, expires=None):
+    return PricingRecord(
+        "unit_1", rent, move_in, None, None,
+        effective or datetime(2024, 1, 1, tzinfo=timezone.utc), expires
+    )
+
+
+@pytest.fixture
+def inventory_repos():
+    with patch('services.inventory.UnitRepository') as mock_unit_repo_class, \
+         patch('services.inventory.PetPolicyRepository') as mock_policy_repo_class, \
+         patch('services.inventory.UnitPricingRepository') as mock_pricing_repo_class:
+
+        mock_unit_repo = AsyncMock()
+        mock_unit_repo.get_inventory_rows.return_value = [
+            ("unit_1", "101", 2, 2.0, 1200, True, 2500, None),
+            ("unit_2", "102", 2, 2.0, 1100, True, 2400, None),
+            ("unit_3", "201", 1, 1.0, 800, True, 1800, None),
+        ]
+        mock_unit_repo_class.return_value = mock_unit_repo
+
+        mock_policy_repo = AsyncMock()
+        mock_policy_repo.get_by_community_id.return_value = [
+            MagicMock(pet_type=PetType.DOG, allowed=True, fee=None, deposit=300, monthly_rent=50, max_count=2, weight_limit=50, notes=None)
+        ]
+        mock_policy_repo_class.return_value = mock_policy_repo
+
+        mock_pricing_repo = AsyncMock()
+        mock_pricing_repo.get_inventory_rows.return_value = []
+        mock_pricing_repo_class.return_value = mock_pricing_repo
+
+        yield mock_unit_repo
+
+
+class TestCommunityInventory:
+
+    def test_current_pricing_matches_repository_rule(self):
+        """Test the latest in-effect price on or before the move-in date is chosen"""
+
+        now = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        inventory = CommunityInventory("community_123", 0, {}, {}, {
+            "unit_1": (
+                pricing_row(2700, datetime(2024, 5, 1, tzinfo=timezone.utc)),
+                pricing_row(2600, datetime(2024, 3, 1, tzinfo=timezone.utc), expires=now - timedelta(days=1)),
+                pricing_row(2500, datetime(2024, 2, 1, tzinfo=timezone.utc)),
+            )
+        })
+
+        assert inventory.current_pricing("unit_1", datetime(2024, 4, 1), now=now).rent == 2500
+        assert inventory.current_pricing("unit_1", datetime(2024, 6, 1), now=now).rent == 2700
+        assert inventory.current_pricing("unit_1", datetime(2024, 1, 1), now=now) is None
+        assert inventory.current_pricing("unit_2", datetime(2024, 6, 1), now=now) is None
+
+    def test_search_units_filters_on_current_rent_and_ranks(self):
+        """Test every criterion is applied, rent comes from current pricing, and results follow sort_by"""
+
+        now = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        march = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+        def unit(unit_id, bedrooms, bathrooms, square_feet, base_rent, available_date=None):
+            return UnitRecord(unit_id, unit_id.upper(), bedrooms, bathrooms, square_feet, True, base_rent, available_date)
+
+        units = {
+            2: (
+                unit("a", 2, 2.0, 1000, 2100),
+                unit("b", 2, 1.0, 950, 1900, datetime(2024, 2, 15, tzinfo=timezone.utc)),
+                unit("c", 2, 2.0, 1200, 1950),
+                unit("d", 2, 2.0, 1100, 1800, datetime(2024, 4, 1, tzinfo=timezone.utc)),
+                unit("e", 2, 2.0, 800, 1500),
+            ),
+            1: (unit("f", 1, 1.0, 700, 1400),),
+        }
+        pricing = {"a": (PricingRecord("a", 1850, datetime(2024, 1, 1, tzinfo=timezone.utc), "One month free", None, now, None),)}
+        inventory = CommunityInventory("community_123", 0, units, {}, pricing)
+
+        search = UnitSearch(bedrooms=2, max_rent=2000, min_square_feet=900, available_by=march)
+        matches, total = inventory.search_units(search, march, limit=2, now=now)
+        assert total == 3
+        assert [(match.unit.id, match.rent, match.special_offer) for match in matches] == [("a", 1850, "One month free"), ("b", 1900, None)]
+
+        by_size, _ = inventory.search_units(search._replace(sort_by="square_feet"), march, limit=5, now=now)
+        assert [match.unit.id for match in by_size] == ["c", "a", "b"]
+
+        two_baths, total = inventory.search_units(UnitSearch(min_bathrooms=2, sort_by="available_date"), now, limit=5, now=now)
+        assert total == 4
+        assert [match.unit.id for match in two_baths] == ["e", "a", "c", "d"]
+
+
+class TestInventoryCache:
+
+    @pytest.mark.asyncio
+    async def test_bypassed_until_listener_is_live(self, mock_db_session, inventory_repos):
+        """Test snapshots are not served while invalidations could be missed"""
+
+        cache = InventoryCache()
+        assert await cache.get(mock_db_session, "community_123") is None
+        inventory_repos.get_inventory_rows.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_indexes_and_reuse(self, mock_db_session, inventory_repos):
+        """Test snapshot is built once and indexed by bedrooms and pet type"""
+
+        cache = InventoryCache()
+        cache.set_live(True)
+
+        inventory = await cache.get(mock_db_session, "community_123")
+        assert [unit.id for unit in inventory.available_units(2)] == ["unit_1", "unit_2"]
+        assert inventory.available_units(3) == ()
+        assert isinstance(inventory.units_by_id["unit_3"], UnitRecord)
+        assert inventory.pet_policy("Dog").deposit == 300
+        assert inventory.pet_policy("cat") is None
+
+        assert await cache.get(mock_db_session, "community_123") is inventory
+        inventory_repos.get_inventory_rows.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reloads_only_that_community(self, mock_db_session, inventory_repos):
+        """Test a notification for one community only refreshes that community"""
+
+        cache = InventoryCache()
+        cache.set_live(True)
+
+        first = await cache.get(mock_db_session, "community_123")
+        other = await cache.get(mock_db_session, "community_456")
+
+        cache.invalidate("community_123")
+
+        assert await cache.get(mock_db_session, "community_123") is not first
+        assert await cache.get(mock_db_session, "community_456") is other
+
+        cache.invalidate("*")
+        assert await cache.get(mock_db_session, "community_456") is not other
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load_is_not_cached(self, mock_db_session, inventory_repos):
+        """Test a snapshot invalidated mid-load is returned but not kept"""
+
+        cache = InventoryCache()
+        cache.set_live(True)
+
+        rows = inventory_repos.get_inventory_rows.return_value
+
+        async def invalidate_while_loading(db, community_id):
+            cache.invalidate(community_id)
+            return rows
+
+        inventory_repos.get_inventory_rows.side_effect = invalidate_while_loading
+        await cache.get(mock_db_session, "community_123")
+
+        inventory_repos.get_inventory_rows.side_effect = None
+        await cache.get(mock_db_session, "community_123")
+        assert inventory_repos.get_inventory_rows.call_count == 2
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+import httpx
+from services.leasing import LeasingAPIError, LeasingClient, ask_clarification, handoff_human, propose_tour, retries_counter
+from leasing_standin import create_app
+
+
+def build_client(standin, max_concurrency: int = 4, max_attempts: int = 3, timeout_seconds: float = 5.0) -> LeasingClient:
+    return LeasingClient(
+        base_url="http://standin/v1",
+        timeout_seconds=timeout_seconds,
+        connect_timeout_seconds=1.0,
+        max_connections=max_concurrency,
+        max_concurrency=max_concurrency,
+        max_attempts=max_attempts,
+        backoff_seconds=0.001,
+        max_backoff_seconds=0.01,
+        transport=httpx.ASGITransport(app=standin),
+    )
+
+
+class TestLeasingClient:
+
+    @pytest.mark.asyncio
+    async def test_endpoints_against_standin(self):
+        """Test the three leasing calls map the stand-in's responses"""
+
+        standin = create_app()
+        client = build_client(standin)
+        try:
+            tour = await propose_tour({"lead_id": "lead_1", "preferred_time": "2:00 PM", "unit_type": "2BR"}, client=client)
+            clarification = await ask_clarification("sometime soon?", client=client)
+            handoff = await handoff_human({"reason": "lease question", "lead_id": "lead_1", "priority": "high"}, client=client)
+        finally:
+            await client.close()
+
+        assert tour["action"] == "propose_tour"
+        assert tour["tour_time"] == "2:00 PM"
+        assert tour["unit_id"] == "B101"
+        assert tour["confirmation_required"] is True
+
+        assert clarification["clarifying_question"] == "Which day would you like to visit?"
+        assert clarification["context"] == "sometime soon?"
+
+        assert handoff["ticket_id"] == "TICKET_00001"
+        assert handoff["estimated_wait_time"] == 1
+        assert standin.state.standin.requests == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_unavailable_with_same_idempotency_key(self):
+        """Test 503s are retried, every attempt of a call carrying the same Idempotency-Key"""
+
+        standin = create_app(fail_first=2)
+        client = build_client(standin)
+        before = retries_counter.value(endpoint="/handoff/create")
+        try:
+            handoff = await handoff_human({"reason": "lease question"}, client=client)
+        finally:
+            await client.close()
+
+        assert handoff["ticket_id"] == "TICKET_00001"
+        keys = standin.state.standin.idempotency_keys
+        assert len(keys) == 3
+        assert keys[0] is not None and len(set(keys)) == 1
+        assert retries_counter.value(endpoint="/handoff/create") == before + 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """Test a persistently unavailable service raises LeasingAPIError after max_attempts"""
+
+        standin = create_app(failure_rate=1.0)
+        client = build_client(standin, max_attempts=3)
+        try:
+            with pytest.raises(LeasingAPIError, match="503"):
+                await ask_clarification("when?", client=client)
+        finally:
+            await client.close()
+
+        assert standin.state.standin.requests == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        """Test a rejected request fails on the first attempt"""
+
+        standin = create_app()
+        client = build_client(standin)
+        try:
+            with pytest.raises(LeasingAPIError, match="422"):
+                await client.post("/clarification/generate", {})
+        finally:
+            await client.close()
+
+        assert standin.state.standin.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_timeouts_are_retried_then_raised(self):
+        """Test read timeouts are retried and surface as LeasingAPIError"""
+
+        attempts = []
+
+        async def never_answers(request):
+            attempts.append(request.headers["idempotency-key"])
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        client = build_client(create_app(), max_attempts=2)
+        client.transport = httpx.MockTransport(never_answers)
+        try:
+            with pytest.raises(LeasingAPIError, match="timed out"):
+                await propose_tour({"lead_id": "lead_1"}, client=client)
+        finally:
+            await client.close()
+
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Test no more than max_concurrency requests reach the service at once"""
+
+        standin = create_app(latency_seconds=0.02)
+        client = build_client(standin, max_concurrency=3)
+        try:
+            results = await asyncio.gather(*(ask_clarification(f"question {i}", client=client) for i in range(12)))
+        finally:
+            await client.close()
+
+        assert len(results) == 12
+        assert standin.state.standin.requests == 12
+        assert standin.state.standin.max_in_flight == 3
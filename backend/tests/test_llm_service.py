@@ -3,6 +3,9 @@ from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime
 import json
 from services.llm import handle_lead_inquiry, ActionResponse
+from services.tools import tool_registry
+from services.tool_audit import ToolAuditLogger
+from contextlib import asynccontextmanager
 
 
 class TestLLMService:
@@ -12,7 +15,7 @@ class TestLLMService:
         """Test successful availability check with units found"""
         
         # Mock tool response
-        with patch('services.llm.check_availability') as mock_check_availability:
+        with patch.object(tool_registry['check_availability'], 'func') as mock_check_availability:
             mock_check_availability.return_value = {
                 "units": sample_units,
                 "total_count": 2,
@@ -70,7 +73,7 @@ class TestLLMService:
         sample_inquiry_data["preferences"]["bedrooms"] = 3
         sample_inquiry_data["message"] = "I need a 3 bedroom apartment"
         
-        with patch('services.llm.check_availability') as mock_check_availability:
+        with patch.object(tool_registry['check_availability'], 'func') as mock_check_availability:
             mock_check_availability.return_value = {
                 "units": [],
                 "total_count": 0,
@@ -115,7 +118,7 @@ class TestLLMService:
         
         sample_inquiry_data["message"] = "Do you allow dogs? I have a 30lb golden retriever."
         
-        with patch('services.llm.check_pet_policy') as mock_check_pet_policy:
+        with patch.object(tool_registry['check_pet_policy'], 'func') as mock_check_pet_policy:
             mock_check_pet_policy.return_value = sample_pet_policy
             
             with patch('services.llm.client', mock_openai_client):
@@ -155,7 +158,7 @@ class TestLLMService:
         
         sample_inquiry_data["message"] = "What's the rent for unit 101?"
         
-        with patch('services.llm.get_pricing') as mock_get_pricing:
+        with patch.object(tool_registry['get_pricing'], 'func') as mock_get_pricing:
             mock_get_pricing.return_value = sample_pricing
             
             with patch('services.llm.client', mock_openai_client):
@@ -226,11 +229,90 @@ class TestLLMService:
             assert "tour is confirmed" in result.response_text
             assert len(sample_inquiry_data["conversation_history"]) == 2
 
+    @pytest.mark.asyncio
+    async def test_tool_calls_audited_with_turn_attribution(self, mock_db_session, sample_inquiry_data, mock_openai_client):
+        """Test tool audit records carry the conversation and request, and a turn's calls are sampled together"""
+
+        @asynccontextmanager
+        async def session_factory():
+            yield AsyncMock()
+
+        audit_logger = ToolAuditLogger(session_factory, queue_size=100, batch_size=10, flush_interval_seconds=0.01, success_sample_rate=0.5)
+        request_ids = [f"request_{i}" for i in range(20)]
+        kept = next(request_id for request_id in request_ids if audit_logger.sampled(True, request_id))
+        skipped = next(request_id for request_id in request_ids if not audit_logger.sampled(True, request_id))
+
+        def tool_call(call_id, bedrooms):
+            call = MagicMock()
+            call.id = call_id
+            call.function.name = "check_availability"
+            call.function.arguments = json.dumps({"community_id": "community_123", "bedrooms": bedrooms})
+            return call
+
+        structured_response_content = json.dumps({"response_text": "Here is what we have.", "action_type": "ask_clarification"})
+
+        with patch('services.llm.client', mock_openai_client), \
+             patch('services.tools.tool_audit_logger', audit_logger), \
+             patch('services.tools.UnitRepository') as mock_unit_repo_class, \
+             patch('services.tool_audit.ToolCallRepository') as mock_tool_call_repo_class:
+
+            mock_unit_repo_class.return_value = AsyncMock(get_available_units_by_bedrooms=AsyncMock(return_value=[]))
+            mock_tool_call_repo = AsyncMock()
+            mock_tool_call_repo_class.return_value = mock_tool_call_repo
+            audit_logger.start()
+
+            for request_id in (kept, skipped):
+                first_response = MagicMock(tool_calls=[tool_call("call_1", 1), tool_call("call_2", 2)], content=None)
+                mock_openai_client.chat.completions.create.side_effect = [
+                    MagicMock(choices=[MagicMock(message=first_response)], usage=MagicMock(total_tokens=100)),
+                    MagicMock(choices=[MagicMock(message=MagicMock(content=structured_response_content))], usage=MagicMock(total_tokens=50))
+                ]
+                await handle_lead_inquiry(mock_db_session, {**sample_inquiry_data, "conversation_id": "conv_456", "request_id": request_id})
+
+            await audit_logger.stop()
+
+        records = [record for call in mock_tool_call_repo.log_many.await_args_list for record in call.args[1]]
+        assert [(record["request_id"], record["arguments"]["bedrooms"]) for record in records] == [(kept, 1), (kept, 2)]
+        assert all(record["conversation_id"] == "conv_456" for record in records)
+
+    @pytest.mark.asyncio
+    async def test_fact_sheet_answers_policy_question_without_tools(self, mock_db_session, sample_inquiry_data, mock_openai_client):
+        """Test the community fact sheet is placed in the system prompt"""
+        
+        sample_inquiry_data["message"] = "Can I bring my dog?"
+        sample_inquiry_data["fact_sheet"] = {
+            "version": "3f9a2c1b0d4e",
+            "text": "Sunset Apartments: 1 Main St\nPets: dogs allowed (max 2, up to 50 lb, $300 deposit, $50/month)"
+        }
+        
+        with patch('services.llm.client', mock_openai_client):
+            first_response = MagicMock()
+            first_response.tool_calls = None
+            first_response.content = "Yes, dogs up to 50 lb are welcome."
+            mock_openai_client.chat.completions.create.return_value.choices[0].message = first_response
+            
+            structured_response_content = json.dumps({
+                "response_text": "Yes! Up to two dogs under 50 lb are welcome, with a $300 deposit and $50/month pet rent.",
+                "action_type": "ask_clarification"
+            })
+            
+            mock_openai_client.chat.completions.create.side_effect = [
+                mock_openai_client.chat.completions.create.return_value,
+                MagicMock(choices=[MagicMock(message=MagicMock(content=structured_response_content))], usage=MagicMock(total_tokens=80))
+            ]
+            
+            result = await handle_lead_inquiry(mock_db_session, sample_inquiry_data)
+            
+            system_prompt = mock_openai_client.chat.completions.create.call_args_list[0].kwargs["messages"][0]["content"]
+            assert "Community facts (version 3f9a2c1b0d4e):" in system_prompt
+            assert "dogs allowed (max 2, up to 50 lb, $300 deposit, $50/month)" in system_prompt
+            assert result.tools_called is None
+
     @pytest.mark.asyncio
     async def test_error_handling_scenario(self, mock_db_session, sample_inquiry_data, mock_openai_client):
         """Test error handling when tool calls fail"""
         
-        with patch('services.llm.check_availability') as mock_check_availability:
+        with patch.object(tool_registry['check_availability'], 'func') as mock_check_availability:
             # Simulate tool failure
             mock_check_availability.side_effect = Exception("Database connection failed")
             
@@ -0,0 +1,507 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from db.repository import AvailabilitySummaryRepository, CommunityRepository, LeadRepository, MessageRepository, ToolCallRepository, TourSlotRepository, UnitPricingRepository
+from db.repository.base import MAX_BIND_PARAMS, decode_cursor, encode_cursor
+from db.repository.tool_call_payload import IDENTITY, ZLIB, decode_payload, encode_payload
+from core.ids import ALPHABET, nanoid, nanoids
+from models import Message, ToolCall
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestLeadRepository:
+
+    @pytest.mark.asyncio
+    async def test_create_with_conversation_single_statement(self, mock_db_session):
+        """Test lead upsert and conversation insert go out as one statement"""
+
+        mock_row = MagicMock(lead_id="lead_123", conversation_id="conv_456")
+        mock_db_session.execute.return_value = MagicMock(one=MagicMock(return_value=mock_row))
+
+        lead_data = {
+            "name": "John Doe",
+            "email": "John@Example.com",
+            "phone": None,
+            "preferred_bedrooms": 2,
+            "preferred_move_in": datetime(2024, 3, 1)
+        }
+        row = await LeadRepository().create_with_conversation(mock_db_session, lead_data, "community_123")
+
+        assert row is mock_row
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "ON CONFLICT (lower(email)) DO UPDATE" in sql
+        assert "email = excluded.email" not in sql
+        assert "INSERT INTO conversations" in sql
+        assert sql.count("RETURNING") == 2
+
+    @pytest.mark.asyncio
+    async def test_create_or_get_by_email_upserts(self, mock_db_session):
+        """Test lead create-or-get is a single upsert"""
+
+        mock_lead = MagicMock(id="lead_123")
+        mock_db_session.execute.return_value = MagicMock(scalar_one=MagicMock(return_value=mock_lead))
+
+        lead = await LeadRepository().create_or_get_by_email(
+            mock_db_session, {"name": "John Doe", "email": "john@example.com"}
+        )
+
+        assert lead is mock_lead
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "ON CONFLICT (lower(email)) DO UPDATE SET name = excluded.name" in sql
+
+
+class TestBulkOperations:
+
+    def tool_call_rows(self, count):
+        return [
+            {"function_name": "check_availability", "arguments": {}, "response": {}, "execution_time_ms": i, "success": True}
+            for i in range(count)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_create_many_chunks_multi_row_inserts(self, mock_db_session):
+        """Test create_many sends one multi-row INSERT per chunk"""
+
+        await ToolCallRepository().create_many(mock_db_session, self.tool_call_rows(10), chunk_size=4)
+
+        assert mock_db_session.execute.call_count == 3
+        sql = compile_sql(mock_db_session.execute.call_args_list[0][0][0])
+        assert sql.count("(%(id_m") == 4
+        mock_db_session.add.assert_not_called()
+        mock_db_session.flush.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_many_respects_bind_parameter_limit(self, mock_db_session):
+        """Test chunks never exceed the asyncpg bind parameter limit"""
+
+        rows = self.tool_call_rows(MAX_BIND_PARAMS // 5 + 1)
+        await ToolCallRepository().create_many(mock_db_session, rows)
+
+        assert mock_db_session.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_update_many_uses_values_join(self, mock_db_session):
+        """Test update_many issues a single UPDATE ... FROM (VALUES ...)"""
+
+        await ToolCallRepository().update_many(
+            mock_db_session, [{"id": "a", "success": False}, {"id": "b", "success": False}]
+        )
+
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("UPDATE tool_calls SET success=data.success FROM (VALUES")
+        assert "WHERE tool_calls.id = data.id" in sql
+
+    @pytest.mark.asyncio
+    async def test_update_many_requires_id(self, mock_db_session):
+        """Test update_many rejects rows without an id"""
+
+        with pytest.raises(ValueError):
+            await ToolCallRepository().update_many(mock_db_session, [{"success": False}])
+
+    @pytest.mark.asyncio
+    async def test_upsert_many_on_conflict(self, mock_db_session):
+        """Test upsert_many updates supplied columns, or skips when none"""
+
+        mock_db_session.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+        repo = ToolCallRepository()
+        rows = [{"id": "a", "success": True, "execution_time_ms": 5}]
+
+        await repo.upsert_many(mock_db_session, rows, returning=True)
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "ON CONFLICT (id) DO UPDATE SET" in sql
+        assert "success = excluded.success" in sql
+        assert "execution_time_ms = excluded.execution_time_ms" in sql
+        assert "RETURNING" in sql
+
+        await repo.upsert_many(mock_db_session, rows, update_columns=[])
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "ON CONFLICT (id) DO NOTHING" in sql
+
+
+class TestSingleStatementWrites:
+
+    @pytest.mark.asyncio
+    async def test_update_is_one_statement_with_returning(self, mock_db_session):
+        """Test update skips the SELECT and ignores unknown fields"""
+
+        mock_message = MagicMock(id="msg_123")
+        mock_db_session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=mock_message))
+
+        message = await MessageRepository().update(
+            mock_db_session, "msg_123", {"reply_text": "Hi", "not_a_column": 1}
+        )
+
+        assert message is mock_message
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("UPDATE messages SET reply_text=")
+        assert "not_a_column" not in sql
+        assert "RETURNING messages.id" in sql
+        mock_db_session.flush.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_book_slot_is_a_guarded_increment(self, mock_db_session):
+        """Test booking is conditional on capacity and returns None when full"""
+
+        mock_db_session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+
+        assert await TourSlotRepository().book_slot(mock_db_session, "slot_123") is None
+
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "current_bookings=(tour_slots.current_bookings + " in sql
+        assert "<= tour_slots.max_capacity" in sql
+        mock_db_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_delete_reports_whether_a_row_matched(self, mock_db_session):
+        """Test delete is a single DELETE ... RETURNING"""
+
+        mock_db_session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+
+        assert await MessageRepository().delete(mock_db_session, "missing") is False
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("DELETE FROM messages WHERE messages.id =")
+        assert "RETURNING messages.id" in sql
+
+
+class TestKeysetPagination:
+
+    @pytest.mark.asyncio
+    async def test_page_seeks_past_cursor(self, mock_db_session):
+        """Test pages seek on (created_at, id) and fetch one extra row to detect the end"""
+
+        created_at = datetime(2024, 3, 1, 12, 0)
+        rows = [MagicMock(id=f"tc_{i}", created_at=created_at) for i in range(3)]
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=rows)))
+        )
+
+        page = await ToolCallRepository().get_failed_calls(
+            mock_db_session, cursor=encode_cursor(created_at, "tc_prev"), limit=2
+        )
+
+        assert [item.id for item in page.items] == ["tc_0", "tc_1"]
+        assert decode_cursor(page.next_cursor) == (created_at, "tc_1")
+
+        # The page query; payloads are fetched after it
+        stmt = mock_db_session.execute.call_args_list[0][0][0]
+        sql = compile_sql(stmt)
+        assert "(tool_calls.created_at, tool_calls.id) < (" in sql
+        assert "ORDER BY tool_calls.created_at DESC, tool_calls.id DESC" in sql
+        assert "OFFSET" not in sql
+        assert 3 in stmt.compile().params.values()
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self, mock_db_session):
+        """Test a short page ends pagination"""
+
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[MagicMock()])))
+        )
+
+        page = await LeadRepository().get_by_preferences(mock_db_session, bedrooms=2, limit=10)
+
+        assert len(page.items) == 1
+        assert page.next_cursor is None
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestPartitionPruning:
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded_by_conversation_start(self, mock_db_session):
+        """Test history reads bound created_at so old partitions are pruned"""
+
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        )
+
+        await MessageRepository().get_by_conversation_id(
+            mock_db_session, "conv_456", since=datetime(2024, 3, 1, 12, 0)
+        )
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        assert "messages.created_at >= " in compile_sql(stmt)
+        assert datetime(2024, 3, 1, 11, 0) in stmt.compile().params.values()
+
+
+class TestToolCallPayloads:
+
+    def test_payloads_are_content_addressed(self):
+        """Test equal payloads hash the same regardless of key order"""
+
+        first = encode_payload({"bedrooms": 2, "community_id": "comm_1"})
+        second = encode_payload({"community_id": "comm_1", "bedrooms": 2})
+
+        assert first.hash == second.hash
+        assert first.encoding == IDENTITY
+        assert decode_payload(first.encoding, first.data) == {"bedrooms": 2, "community_id": "comm_1"}
+
+    def test_large_payloads_are_compressed(self):
+        """Test payloads above the threshold round-trip through zlib"""
+
+        response = {
+            "units": [{"unit_number": f"{i:03d}", "bedrooms": 2} for i in range(50)],
+            "checked_at": datetime(2024, 3, 1, tzinfo=timezone.utc),
+        }
+        payload = encode_payload(response)
+
+        assert payload.encoding == ZLIB
+        assert len(payload.data) < payload.size_bytes
+        assert decode_payload(payload.encoding, payload.data)["checked_at"] == "2024-03-01T00:00:00+00:00"
+
+    @pytest.mark.asyncio
+    async def test_log_writes_call_and_payloads_in_one_statement(self, mock_db_session):
+        """Test log stores payloads by hash and skips ones already stored"""
+
+        await ToolCallRepository().log(mock_db_session, {
+            "function_name": "check_pet_policy",
+            "arguments": {"pet_type": "dog"},
+            "response": {"allowed": True},
+            "execution_time_ms": 3,
+            "success": True,
+        })
+
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("WITH new_payloads AS \n(INSERT INTO tool_call_payloads")
+        assert "ON CONFLICT (hash) DO NOTHING" in sql
+        assert "INSERT INTO tool_calls" in sql
+        assert "arguments_hash" in sql
+
+    @pytest.mark.asyncio
+    async def test_rehydrate_restores_payloads(self, mock_db_session):
+        """Test reads put the stored payloads back on the tool call"""
+
+        arguments, response = encode_payload({"pet_type": "dog"}), encode_payload({"allowed": True})
+        mock_db_session.execute.return_value = [
+            MagicMock(hash=payload.hash, encoding=payload.encoding, data=payload.data)
+            for payload in (arguments, response)
+        ]
+        tool_call = ToolCall(function_name="check_pet_policy", arguments_hash=arguments.hash, response_hash=response.hash)
+
+        await ToolCallRepository().rehydrate(mock_db_session, [tool_call])
+
+        assert tool_call.arguments == {"pet_type": "dog"}
+        assert tool_call.response == {"allowed": True}
+
+
+class TestCurrentPricing:
+
+    @pytest.mark.asyncio
+    async def test_current_pricing_takes_latest_row(self, mock_db_session):
+        """Test the single-unit lookup is limited to one row of a unit in the community"""
+
+        mock_db_session.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+
+        await UnitPricingRepository().get_current_pricing(mock_db_session, "community_123", "unit_1", datetime(2024, 3, 1))
+
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "ORDER BY unit_pricing.move_in_date DESC" in sql
+        assert "LIMIT" in sql
+        assert "JOIN units ON units.id = unit_pricing.unit_id" in sql
+        assert "units.community_id = %(community_id_1)s" in sql
+
+    @pytest.mark.asyncio
+    async def test_current_pricing_bulk_is_one_distinct_on_query(self, mock_db_session):
+        """Test many units are priced with a single DISTINCT ON (unit_id) query"""
+
+        rows = [MagicMock(unit_id="unit_1"), MagicMock(unit_id="unit_2")]
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=rows)))
+        )
+
+        pricing = await UnitPricingRepository().get_current_pricing_bulk(
+            mock_db_session, "community_123", ["unit_1", "unit_2", "unit_1"], datetime(2024, 3, 1)
+        )
+
+        assert set(pricing) == {"unit_1", "unit_2"}
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert sql.startswith("SELECT DISTINCT ON (unit_pricing.unit_id)")
+        assert "ORDER BY unit_pricing.unit_id, unit_pricing.move_in_date DESC" in sql
+        assert "units.community_id = %(community_id_1)s" in sql
+
+    @pytest.mark.asyncio
+    async def test_current_pricing_bulk_without_units(self, mock_db_session):
+        """Test an empty unit list does not query"""
+
+        assert await UnitPricingRepository().get_current_pricing_bulk(mock_db_session, "community_123", [], datetime(2024, 3, 1)) == {}
+        mock_db_session.execute.assert_not_called()
+
+
+class TestClientIds:
+
+    def test_nanoids_match_server_format(self):
+        """Test client ids use the nanoid() SQL function's size and alphabet"""
+
+        ids = nanoids(500)
+
+        assert len(set(ids)) == 500
+        assert all(len(id) == 21 and set(id) <= set(ALPHABET) for id in ids)
+        assert len(nanoid(10)) == 10
+
+    def test_models_get_ids_on_construction(self):
+        """Test rows carry their id before any flush"""
+
+        message = Message(conversation_id="conv_456", message_text="Hi", request_id="req_1")
+
+        assert len(message.id) == 21
+
+    @pytest.mark.asyncio
+    async def test_create_many_sends_client_ids(self, mock_db_session):
+        """Test multi-row inserts fill in an id per row without RETURNING"""
+
+        await ToolCallRepository().create_many(
+            mock_db_session, [{"function_name": "check_availability", "execution_time_ms": i, "success": True} for i in range(3)]
+        )
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        ids = [value for key, value in stmt.compile().params.items() if key.startswith("id_m")]
+        assert len(set(ids)) == 3
+        assert "RETURNING" not in compile_sql(stmt)
+
+
+class TestAvailabilitySummary:
+
+    @pytest.mark.asyncio
+    async def test_available_counts_aggregate_summary_rows(self, mock_db_session):
+        """Test catalog counts come from the summary table, one row per community"""
+
+        mock_db_session.execute.return_value = MagicMock(all=MagicMock(return_value=[("comm_1", 12)]))
+
+        counts = await AvailabilitySummaryRepository().get_available_counts(mock_db_session)
+
+        assert counts == {"comm_1": 12}
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "FROM unit_availability_summary GROUP BY unit_availability_summary.community_id" in sql
+        assert "units " not in sql
+
+
+class TestSearch:
+
+    @pytest.mark.asyncio
+    async def test_lead_search_is_ranked_and_limited(self, mock_db_session):
+        """Test lead search matches name or email by substring or similarity, best first"""
+
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        )
+
+        await LeadRepository().search(mock_db_session, "jon_doe", limit=5)
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = compile_sql(stmt)
+        assert "(leads.name ILIKE '%%' || %(name_2)s || '%%' ESCAPE '/')" in sql
+        assert "leads.email %% " in sql
+        assert "ORDER BY leads.name <-> " in sql
+        assert "ORDER BY leads.email <-> " in sql
+        assert sql.count("UNION ALL") == 3
+        assert "similarity(" not in sql
+        assert "jon/_doe" in stmt.compile().params.values()
+        assert list(stmt.compile().params.values()).count(5) == 5
+
+    @pytest.mark.asyncio
+    async def test_address_search_uses_trigram_ranking(self, mock_db_session):
+        """Test address search ranks by trigram distance, each branch capped at the limit"""
+
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        )
+
+        await CommunityRepository().search_by_address(mock_db_session, "Main St")
+
+        stmt = mock_db_session.execute.call_args[0][0]
+        sql = compile_sql(stmt)
+        assert "ORDER BY communities.address <-> " in sql
+        assert sql.count("LIMIT") == 3
+        assert list(stmt.compile().params.values()).count(20) == 3
+
+    @pytest.mark.asyncio
+    async def test_message_search_matches_index_expression(self, mock_db_session):
+        """Test message search uses the indexed tsvector expression verbatim"""
+
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        )
+
+        await MessageRepository().search_text(mock_db_session, '"move in" special', conversation_id="conv_456")
+
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        document = "to_tsvector('english', coalesce(message_text, '') || ' ' || coalesce(reply_text, ''))"
+        assert f"{document} @@ websearch_to_tsquery('english', " in sql
+        assert f"ORDER BY ts_rank_cd({document}, " in sql
+        assert "messages.conversation_id = " in sql
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestTrigramSearchOnDatabase:
+
+    @pytest.fixture
+    async def engine(self):
+        engine = create_async_engine(TEST_DATABASE_URL.replace("postgresql", "postgresql+asyncpg", 1))
+        async with engine.connect() as connection:
+            installed = await connection.scalar(text("SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'"))
+        if not installed:
+            await engine.dispose()
+            pytest.skip("pg_trgm is not installed")
+        yield engine
+        await engine.dispose()
+
+    @pytest.fixture
+    async def addresses(self, engine):
+        async with engine.begin() as connection:
+            await connection.execute(
+                text("""
+                INSERT INTO communities (name, address)
+                SELECT 'trigram probe', n || ' Quillfeather Lane' FROM generate_series(1, 500) AS n
+                """)
+            )
+            await connection.execute(text("ANALYZE communities"))
+        yield
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM communities WHERE name = 'trigram probe'"))
+
+    @pytest.mark.asyncio
+    async def test_nearest_first_through_knn_index_scan(self, engine, addresses):
+        """Test search returns the closest addresses first, read off the GiST index in distance order"""
+
+        statements = []
+        async with AsyncSession(engine) as db:
+            execute = db.execute
+
+            async def recording(statement, *args, **kwargs):
+                statements.append(statement)
+                return await execute(statement, *args, **kwargs)
+
+            db.execute = recording
+            communities = await CommunityRepository().search_by_address(db, "250 Quillfeather Lane", limit=5)
+
+            sql = str(statements[0].compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            # Force the planner's hand on a small table; the point is that the plan exists
+            await execute(text("SET LOCAL enable_seqscan = off"))
+            plan = "\n".join((await execute(text(f"EXPLAIN {sql}"))).scalars().all())
+
+        assert len(communities) == 5
+        assert communities[0].address == "250 Quillfeather Lane"
+        assert all("Quillfeather Lane" in community.address for community in communities)
+        assert "ix_communities_address_trgm" in plan
+        assert "Order By: (address <-> " in plan
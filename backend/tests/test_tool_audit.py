@@ -0,0 +1,96 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+from sqlalchemy.exc import IntegrityError
+from services.tool_audit import ToolAuditLogger, dropped_counter
+
+
+def record(success=True, request_id="request_1", function_name="check_availability"):
+    return {
+        "function_name": function_name,
+        "arguments": {},
+        "response": {},
+        "execution_time_ms": 1,
+        "success": success,
+        "error_message": None,
+        "conversation_id": None,
+        "request_id": request_id,
+    }
+
+
+@pytest.fixture
+def tool_call_repo():
+    with patch('services.tool_audit.ToolCallRepository') as mock_repo_class:
+        mock_repo = AsyncMock()
+        mock_repo_class.return_value = mock_repo
+        yield mock_repo
+
+
+def make_logger(**kwargs):
+    @asynccontextmanager
+    async def session_factory():
+        yield AsyncMock()
+
+    options = dict(queue_size=100, batch_size=10, flush_interval_seconds=0.05, success_sample_rate=1.0)
+    options.update(kwargs)
+    return ToolAuditLogger(session_factory, **options)
+
+
+class TestToolAuditLogger:
+
+    def test_failures_always_kept_and_successes_sampled_per_request(self):
+        """Test sampling never drops a failure and keeps or skips a request's calls together"""
+
+        audit_logger = make_logger(success_sample_rate=0.5)
+        request_ids = [f"request_{i}" for i in range(200)]
+
+        assert all(audit_logger.sampled(False, request_id) for request_id in request_ids)
+        kept = [request_id for request_id in request_ids if audit_logger.sampled(True, request_id)]
+        assert 50 < len(kept) < 150
+        assert all(audit_logger.sampled(True, request_id) for request_id in kept)
+        assert not make_logger(success_sample_rate=0).sampled(True, "request_1")
+
+    @pytest.mark.asyncio
+    async def test_records_written_in_batches_and_drained_on_stop(self, tool_call_repo):
+        """Test queued records are written in multi-row batches and nothing is lost on shutdown"""
+
+        audit_logger = make_logger(batch_size=10)
+        audit_logger.start()
+        for i in range(25):
+            audit_logger.submit(record(request_id=f"request_{i}"))
+        await audit_logger.stop()
+
+        batches = [call.args[1] for call in tool_call_repo.log_many.await_args_list]
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert [r["request_id"] for batch in batches for r in batch] == [f"request_{i}" for i in range(25)]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_and_counts(self, tool_call_repo):
+        """Test the queue is bounded and overflow is counted instead of blocking"""
+
+        audit_logger = make_logger(queue_size=3)
+        audit_logger.start()
+        before = dropped_counter.value(reason="queue_full")
+        for _ in range(5):
+            audit_logger.submit(record())
+
+        assert dropped_counter.value(reason="queue_full") - before == 2
+        await audit_logger.stop()
+        assert sum(len(call.args[1]) for call in tool_call_repo.log_many.await_args_list) == 3
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_retried_record_by_record(self, tool_call_repo):
+        """Test one bad record does not cost the rest of its batch"""
+
+        async def log_many(db, batch):
+            if any(r["function_name"] == "bad" for r in batch):
+                raise IntegrityError("INSERT", {}, Exception("foreign key violation"))
+
+        tool_call_repo.log_many.side_effect = log_many
+        audit_logger = make_logger()
+        before = dropped_counter.value(reason="write_failed")
+
+        await audit_logger.flush([record(), record(function_name="bad"), record()])
+
+        assert tool_call_repo.log_many.await_count == 4
+        assert dropped_counter.value(reason="write_failed") - before == 1
@@ -0,0 +1,126 @@
+import pytest
+import time
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone
+from db.repository.tool_call_payload import encode_payload
+from services.inventory import InventoryCache
+from services.llm import _execute_tool_calls
+from services.tool_memo import ConversationMemo, call_record
+from services.tools import tool_registry
+
+AVAILABILITY_ARGS = {"community_id": "community_123", "bedrooms": 2}
+AVAILABILITY_RESULT = {"units": [], "total_count": 0, "community_id": "community_123", "bedrooms_requested": 2}
+AVAILABILITY_HASH = encode_payload(AVAILABILITY_RESULT).hash
+
+
+@pytest.fixture
+def live_inventory():
+    cache = InventoryCache()
+    cache.set_live(True)
+    with patch('services.tool_memo.inventory_cache', cache):
+        yield cache
+
+
+def history(*records):
+    return [{"calls": list(records)}]
+
+
+def tool_call(call_id, name, arguments):
+    call = MagicMock()
+    call.id = call_id
+    call.function.name = name
+    call.function.arguments = json.dumps(arguments)
+    return call
+
+
+class TestConversationMemo:
+
+    @pytest.mark.asyncio
+    async def test_seeded_from_earlier_turns(self, mock_db_session, live_inventory):
+        """Test recent calls persisted in tools_called are reused, matched on validated arguments, with results read back by hash"""
+
+        tool = tool_registry["check_availability"]
+        pet_args = {"community_id": "community_123", "pet_type": "dog"}
+        records = history(
+            call_record("check_availability", AVAILABILITY_ARGS, AVAILABILITY_HASH, time.time(), memoized=False),
+            call_record("check_pet_policy", pet_args, encode_payload(None).hash, time.time() - 3600, memoized=True),
+        )
+
+        with patch('services.tool_memo.ToolCallPayloadRepository.get_many', AsyncMock(return_value={AVAILABILITY_HASH: AVAILABILITY_RESULT})) as mock_get_many:
+            memo = await ConversationMemo.load(mock_db_session, "conv_123", records)
+
+        # The expired pet policy call is not fetched
+        assert list(mock_get_many.await_args[0][1]) == [AVAILABILITY_HASH]
+        assert "result" not in records[0]["calls"][0]
+        entry = memo.lookup(tool, {"community_id": "community_123", "bedrooms": "2"})
+        assert (entry.result, entry.result_hash) == (AVAILABILITY_RESULT, AVAILABILITY_HASH)
+        assert memo.lookup(tool_registry["check_pet_policy"], pet_args) is None
+        assert memo.lookup(tool, {"community_id": "community_123", "bedrooms": 3}) is None
+        assert (memo.saved, memo.saved_before) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_missing_payload_is_a_miss(self, mock_db_session, live_inventory):
+        """Test a record whose payload cannot be found is not reused"""
+
+        records = history(call_record("check_availability", AVAILABILITY_ARGS, AVAILABILITY_HASH, time.time(), memoized=False))
+
+        with patch('services.tool_memo.ToolCallPayloadRepository.get_many', AsyncMock(return_value={})):
+            memo = await ConversationMemo.load(mock_db_session, "conv_123", records)
+
+        assert memo.lookup(tool_registry["check_availability"], AVAILABILITY_ARGS) is None
+
+    def test_inventory_change_invalidates(self, live_inventory):
+        """Test entries executed before an inventory notification for their community are not reused"""
+
+        tool = tool_registry["check_availability"]
+        memo = ConversationMemo("conv_123")
+        memo.store(tool, AVAILABILITY_ARGS, AVAILABILITY_RESULT, AVAILABILITY_HASH, time.time())
+        memo.store(tool, {"community_id": "community_456", "bedrooms": 2}, AVAILABILITY_RESULT, AVAILABILITY_HASH, time.time())
+
+        live_inventory.invalidate("community_123")
+
+        assert memo.lookup(tool, AVAILABILITY_ARGS) is None
+        assert memo.lookup(tool, {"community_id": "community_456", "bedrooms": 2}) is not None
+
+    def test_not_used_without_live_invalidations(self):
+        """Test the memo is bypassed while inventory notifications could be missed"""
+
+        tool = tool_registry["check_availability"]
+        memo = ConversationMemo("conv_123")
+        memo.store(tool, AVAILABILITY_ARGS, AVAILABILITY_RESULT, AVAILABILITY_HASH, time.time())
+
+        with patch('services.tool_memo.inventory_cache', InventoryCache()):
+            assert memo.lookup(tool, AVAILABILITY_ARGS) is None
+
+    def test_errors_and_uncacheable_tools_not_stored(self, live_inventory):
+        """Test error results and tools without a TTL are never memoized"""
+
+        memo = ConversationMemo("conv_123")
+        memo.store(tool_registry["check_availability"], AVAILABILITY_ARGS, {**AVAILABILITY_RESULT, "error": "timeout"}, AVAILABILITY_HASH, time.time())
+        memo.store(tool_registry["find_tour_slots"], {"community_id": "community_123"}, {"slots": []}, encode_payload({"slots": []}).hash, time.time())
+
+        assert memo.entries == {}
+
+    @pytest.mark.asyncio
+    async def test_repeated_call_answered_from_memo(self, mock_db_session, live_inventory):
+        """Test an identical call is executed once, its result stored once by hash, and the hit audited as memoized"""
+
+        memo = ConversationMemo("conv_123")
+        calls = [tool_call("call_1", "check_availability", AVAILABILITY_ARGS), tool_call("call_2", "check_availability", AVAILABILITY_ARGS)]
+
+        with patch.object(tool_registry["check_availability"], "func", AsyncMock(return_value=AVAILABILITY_RESULT)) as mock_tool, \
+             patch('services.tools.tool_audit_logger') as mock_audit_logger, \
+             patch('services.llm.ToolCallPayloadRepository.store_many', AsyncMock()) as mock_store_many:
+            messages, tools_called = await _execute_tool_calls(mock_db_session, calls, [], memo, {"conversation_id": "conv_123", "request_id": "req_1"})
+
+        mock_tool.assert_awaited_once()
+        assert [record["memoized"] for record in tools_called["calls"]] == [False, True]
+        assert [record["result_hash"] for record in tools_called["calls"]] == [AVAILABILITY_HASH.hex()] * 2
+        assert tools_called["calls"][0]["executed_at"] == tools_called["calls"][1]["executed_at"]
+        assert [json.loads(message["content"]) for message in messages] == [AVAILABILITY_RESULT, AVAILABILITY_RESULT]
+        assert [payload.hash for payload in mock_store_many.await_args[0][1]] == [AVAILABILITY_HASH]
+        assert memo.saved == 1
+
+        audited = mock_audit_logger.submit.call_args[0][0]
+        assert (audited["memoized"], audited["response"], audited["conversation_id"], audited["request_id"]) == (True, AVAILABILITY_RESULT, "conv_123", "req_1")
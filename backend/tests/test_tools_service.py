@@ -1,13 +1,28 @@
+import os
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from datetime import datetime
 from services.tools import (
     check_availability, 
     check_pet_policy, 
+    get_availability_summary,
     get_pricing, 
+    get_pricing_bulk,
     get_available_tour_slots,
-    log_tool_call
+    find_tour_slots,
+    search_units,
+    log_tool_call,
+    tool_registry
 )
+from services.tool_registry import ToolRegistry
+from core.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from services.tour_slots import SlotRecord, TourSlotIndex
+from datetime import timedelta, timezone
+import asyncio
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
 
 
 class TestToolsService:
@@ -18,19 +33,19 @@ class TestToolsService:
         
         mock_units = [
             MagicMock(id="unit_1", unit_number="101", bedrooms=2, bathrooms=2, square_feet=1200, is_available=True),
-            MagicMock(id="unit_2", unit_number="102", bedrooms=2, bathrooms=2, square_feet=1100, is_available=True),
-            MagicMock(id="unit_3", unit_number="201", bedrooms=1, bathrooms=1, square_feet=800, is_available=True)
+            MagicMock(id="unit_2", unit_number="102", bedrooms=2, bathrooms=2, square_feet=1100, is_available=True)
         ]
         
         with patch('services.tools.UnitRepository') as mock_repo_class, \
              patch('services.tools.log_tool_call') as mock_log:
             
             mock_repo = AsyncMock()
-            mock_repo.get_available_units.return_value = mock_units
+            mock_repo.get_available_units_by_bedrooms.return_value = mock_units
             mock_repo_class.return_value = mock_repo
             
             result = await check_availability(mock_db_session, "community_123", 2)
             
+            mock_repo.get_available_units_by_bedrooms.assert_called_once_with(mock_db_session, "community_123", 2)
             assert result["total_count"] == 2
             assert len(result["units"]) == 2
             assert result["units"][0]["unit_number"] == "101"
@@ -46,7 +61,7 @@ class TestToolsService:
              patch('services.tools.log_tool_call') as mock_log:
             
             mock_repo = AsyncMock()
-            mock_repo.get_available_units.return_value = []
+            mock_repo.get_available_units_by_bedrooms.return_value = []
             mock_repo_class.return_value = mock_repo
             
             result = await check_availability(mock_db_session, "community_123", 3)
@@ -130,6 +145,59 @@ class TestToolsService:
             assert result["special_discount"] == 2500
             mock_log.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_get_availability_summary(self, mock_db_session):
+        """Test the overview is built from summary rows, not units"""
+        
+        summaries = [
+            MagicMock(bedrooms=1, available_units=3, min_rent=1500, max_rent=1700, min_square_feet=600,
+                      max_square_feet=700, earliest_available_date=datetime(2024, 3, 1)),
+            MagicMock(bedrooms=2, available_units=2, min_rent=2100, max_rent=2400, min_square_feet=900,
+                      max_square_feet=1000, earliest_available_date=None)
+        ]
+        
+        with patch('services.tools.AvailabilitySummaryRepository') as mock_repo_class, \
+             patch('services.tools.UnitRepository') as mock_unit_repo_class, \
+             patch('services.tools.log_tool_call') as mock_log:
+            
+            mock_repo = AsyncMock()
+            mock_repo.get_by_community.return_value = summaries
+            mock_repo_class.return_value = mock_repo
+            
+            result = await get_availability_summary(mock_db_session, "community_123")
+            
+            assert result["total_available"] == 5
+            assert [option["bedrooms"] for option in result["bedroom_options"]] == [1, 2]
+            assert result["bedroom_options"][1]["min_rent"] == 2100
+            mock_unit_repo_class.assert_not_called()
+            mock_log.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_pricing_bulk(self, mock_db_session):
+        """Test bulk pricing keeps request order and reports unpriced units"""
+        
+        mock_pricing = MagicMock(
+            unit_id="unit_2", rent=2700, move_in_date=datetime(2024, 3, 1), special_offer=None,
+            special_discount=None, effective_date=datetime(2024, 1, 1), expires_date=None
+        )
+        
+        with patch('services.tools.UnitPricingRepository') as mock_repo_class, \
+             patch('services.tools.log_tool_call') as mock_log:
+            
+            mock_repo = AsyncMock()
+            mock_repo.get_current_pricing_bulk.return_value = {"unit_2": mock_pricing}
+            mock_repo_class.return_value = mock_repo
+            
+            result = await get_pricing_bulk(mock_db_session, "community_123", ["unit_1", "unit_2"], datetime(2024, 3, 1))
+            
+            assert [pricing["unit_id"] for pricing in result["pricing"]] == ["unit_2"]
+            assert result["pricing"][0]["rent"] == 2700
+            assert result["units_without_pricing"] == ["unit_1"]
+            mock_repo.get_current_pricing_bulk.assert_called_once_with(
+                mock_db_session, "community_123", ["unit_1", "unit_2"], datetime(2024, 3, 1)
+            )
+            mock_log.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_get_pricing_not_found(self, mock_db_session):
         """Test pricing retrieval when no pricing found"""
@@ -189,16 +257,75 @@ class TestToolsService:
             mock_log.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_log_tool_call_success(self, mock_db_session):
-        """Test successful tool call logging"""
-        
-        with patch('services.tools.ToolCallRepository') as mock_repo_class:
-            
+    async def test_search_units(self, mock_db_session):
+        """Test unit search passes every criterion to the ranked query and reports the match count"""
+
+        row = MagicMock(
+            id="unit_1", unit_number="101", bedrooms=2, bathrooms=2.0, square_feet=950,
+            rent=1850, special_offer="One month free", available_date=datetime(2024, 2, 15, tzinfo=timezone.utc)
+        )
+
+        with patch('services.tools.UnitRepository') as mock_repo_class, \
+             patch('services.tools.log_tool_call') as mock_log:
+
             mock_repo = AsyncMock()
+            mock_repo.search_available_units.return_value = ([row], 12)
             mock_repo_class.return_value = mock_repo
+
+            result = await search_units(
+                mock_db_session, "community_123", bedrooms=2, max_rent=2000, min_square_feet=900,
+                available_by=datetime(2024, 3, 1), limit=1
+            )
+
+            assert result["units"] == [{
+                "id": "unit_1", "unit_number": "101", "bedrooms": 2, "bathrooms": 2.0, "square_feet": 950,
+                "rent": 1850, "special_offer": "One month free", "available_date": "2024-02-15T00:00:00+00:00"
+            }]
+            assert result["total_matches"] == 12
+            assert result["criteria"] == {
+                "bedrooms": 2, "max_rent": 2000, "min_square_feet": 900, "available_by": "2024-03-01T00:00:00", "sort_by": "rent"
+            }
+            mock_repo.search_available_units.assert_called_once_with(
+                mock_db_session, "community_123", datetime(2024, 3, 1), limit=1,
+                bedrooms=2, min_bathrooms=None, min_rent=None, max_rent=2000, min_square_feet=900,
+                max_square_feet=None, available_by=datetime(2024, 3, 1), sort_by="rent"
+            )
+            mock_log.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_find_tour_slots(self, mock_db_session):
+        """Test tour slots come from the interval index, nearest the preferred time"""
+
+        start = datetime(2030, 3, 15, 14, 0, tzinfo=timezone.utc)
+        index = TourSlotIndex("community_123", 0, [
+            SlotRecord("slot_1", start - timedelta(days=1), start - timedelta(days=1) + timedelta(minutes=30), 2),
+            SlotRecord("slot_2", start, start + timedelta(minutes=30), 1),
+            SlotRecord("slot_3", start + timedelta(days=7), start + timedelta(days=7, minutes=30), 3),
+        ])
+
+        with patch('services.tools.tour_slot_cache') as mock_cache:
+            mock_cache.get = AsyncMock(return_value=index)
+
+            with patch('services.tools.log_tool_call') as mock_log:
+                result = await find_tour_slots(mock_db_session, "community_123", datetime(2030, 3, 15, 10, 0, tzinfo=timezone(timedelta(hours=-5))), limit=2)
+
+                assert [slot["id"] for slot in result["slots"]] == ["slot_1", "slot_2"]
+                assert result["slots"][1] == {
+                    "id": "slot_2",
+                    "start_time": "2030-03-15T14:00:00+00:00",
+                    "end_time": "2030-03-15T14:30:00+00:00",
+                    "available_spots": 1
+                }
+                assert result["total_count"] == 2
+                mock_log.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_log_tool_call_success(self, mock_db_session):
+        """Test tool calls are handed to the background audit logger"""
+        
+        with patch('services.tools.tool_audit_logger') as mock_audit_logger:
             
-            await log_tool_call(
-                mock_db_session,
+            log_tool_call(
                 "check_availability",
                 {"community_id": "comm_1", "bedrooms": 2},
                 {"units": [], "total_count": 0},
@@ -207,13 +334,13 @@ class TestToolsService:
                 conversation_id="conv_123"
             )
             
-            mock_repo.create.assert_called_once()
-            call_args = mock_repo.create.call_args[0]
-            call_data = call_args[1]
+            mock_audit_logger.submit.assert_called_once()
+            call_data = mock_audit_logger.submit.call_args[0][0]
             
             assert call_data["function_name"] == "check_availability"
             assert call_data["success"] is True
             assert call_data["execution_time_ms"] == 150
+            assert call_data["created_at"].tzinfo is not None
 
     @pytest.mark.asyncio
     async def test_error_handling_in_tools(self, mock_db_session):
@@ -223,7 +350,7 @@ class TestToolsService:
              patch('services.tools.log_tool_call') as mock_log:
             
             mock_repo = AsyncMock()
-            mock_repo.get_available_units.side_effect = Exception("Database error")
+            mock_repo.get_available_units_by_bedrooms.side_effect = Exception("Database error")
             mock_repo_class.return_value = mock_repo
             
             result = await check_availability(mock_db_session, "community_123", 2)
@@ -234,7 +361,272 @@ class TestToolsService:
                 
             # Verify error was logged
             call_args = mock_log.call_args
-            # success is the 6th positional argument (index 5)
-            assert call_args[0][5] is False
+            # success is the 5th positional argument (index 4)
+            assert call_args[0][4] is False
             # error_message is passed as keyword argument
-            assert call_args[1]["error_message"] == "Database error"
\ No newline at end of file
+            assert call_args[1]["error_message"] == "Database error"
+
+
+class TestToolRegistry:
+
+    def test_schema_generated_from_signature(self):
+        """Test the schema covers the model-facing parameters only, with their descriptions"""
+
+        schema = tool_registry["get_pricing"].schema["function"]
+
+        assert schema["name"] == "get_pricing"
+        assert schema["parameters"]["required"] == ["community_id", "unit_id", "move_in_date"]
+        assert schema["parameters"]["properties"]["move_in_date"] == {
+            "description": "Move-in date in YYYY-MM-DD format", "format": "date", "type": "string"
+        }
+        assert "title" not in schema["parameters"]
+        assert [s["function"]["name"] for s in tool_registry.schemas()] == [
+            "check_availability", "get_availability_summary", "check_pet_policy", "get_pricing", "get_pricing_bulk", "search_units", "find_tour_slots"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_arguments_validated_and_coerced(self, mock_db_session):
+        """Test arguments are parsed into the declared types and the tool runs on the caller's session in a savepoint"""
+
+        savepoint = mock_db_session.begin_nested.return_value
+
+        with patch.object(tool_registry["get_pricing"], "func", AsyncMock(return_value={"rent": 2500})) as mock_tool:
+            result = await tool_registry.execute(
+                mock_db_session, "get_pricing",
+                {"community_id": "community_123", "unit_id": "unit_1", "move_in_date": "2024-03-01"}
+            )
+
+        assert result == {"rent": 2500}
+        mock_tool.assert_awaited_once_with(
+            mock_db_session, community_id="community_123", unit_id="unit_1", move_in_date=datetime(2024, 3, 1)
+        )
+        timeout_ms = int(mock_db_session.execute.call_args[0][1]["timeout_ms"])
+        assert 4900 <= timeout_ms <= 5000
+        savepoint.rollback.assert_awaited_once()
+        mock_db_session.rollback.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_tour_time_requires_offset(self, mock_db_session):
+        """Test a preferred tour time without a UTC offset is rejected rather than read as UTC"""
+
+        with patch.object(tool_registry["find_tour_slots"], "func", AsyncMock()) as mock_tool:
+            result = await tool_registry.execute(
+                mock_db_session, "find_tour_slots", {"community_id": "community_123", "preferred_time": "2030-03-15T14:00"}
+            )
+
+        assert result["error"].startswith("Invalid arguments for find_tour_slots")
+        mock_tool.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalid_and_unknown_calls_return_errors(self, mock_db_session):
+        """Test bad arguments and unknown tools are reported to the model instead of raising"""
+
+        with patch.object(tool_registry["check_availability"], "func", AsyncMock()) as mock_tool:
+            invalid = await tool_registry.execute(mock_db_session, "check_availability", {"community_id": "community_123", "bedrooms": "two"})
+            missing = await tool_registry.execute(mock_db_session, "check_availability", {"bedrooms": 2})
+
+        assert invalid["error"].startswith("Invalid arguments for check_availability")
+        assert "community_id" in missing["error"]
+        mock_tool.assert_not_called()
+
+        with patch.object(tool_registry["get_pricing_bulk"], "func", AsyncMock()) as mock_bulk:
+            too_many = await tool_registry.execute(
+                mock_db_session, "get_pricing_bulk",
+                {"community_id": "community_123", "unit_ids": [f"unit_{i}" for i in range(51)], "move_in_date": "2024-03-01"}
+            )
+
+        assert too_many["error"].startswith("Invalid arguments for get_pricing_bulk")
+        mock_bulk.assert_not_called()
+        assert await tool_registry.execute(mock_db_session, "book_tour", {}) == {"error": "Unknown function: book_tour"}
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_concurrency_limit(self, mock_db_session):
+        """Test a tool is cut off at its timeout and runs at most max_concurrency at once"""
+
+        registry = ToolRegistry()
+        running = []
+
+        @registry.tool("Slow tool", timeout_seconds=0.2, max_concurrency=1)
+        async def slow_tool(db, seconds: float):
+            running.append(seconds)
+            assert len(running) == 1
+            await asyncio.sleep(seconds)
+            running.pop()
+            return {"slept": seconds}
+
+        @registry.tool("Cancelled query", timeout_seconds=0.1)
+        async def cancelled_query(db):
+            # What a tool returns when the database cancels its statement
+            await asyncio.sleep(0.1)
+            return {"error": "canceling statement due to statement timeout"}
+
+        assert registry["slow_tool"].policy.max_concurrency == 1
+        cancelled = await registry.execute(mock_db_session, "cancelled_query", {})
+        assert cancelled["degraded"] is True
+        assert "timed out after 0.1s" in cancelled["error"]
+        mock_db_session.rollback.assert_not_called()
+
+        with patch("services.tool_registry.BACKSTOP_GRACE_SECONDS", 0.05):
+            timed_out = await registry.execute(mock_db_session, "slow_tool", {"seconds": 1})
+        assert timed_out["degraded"] is True
+        assert "timed out after 0.2s" in timed_out["error"]
+        mock_db_session.rollback.assert_awaited_once()
+        assert not registry["slow_tool"].semaphore.locked()
+
+        running.clear()
+        results = await asyncio.gather(*(registry.execute(mock_db_session, "slow_tool", {"seconds": 0.01}) for _ in range(3)))
+        assert results == [{"slept": 0.01}] * 3
+
+        # The second call gives up waiting for the slot the first holds
+        queued = await asyncio.gather(*(registry.execute(mock_db_session, "slow_tool", {"seconds": 0.25}) for _ in range(2)))
+        assert queued[0] == {"slept": 0.25}
+        assert queued[1]["degraded"] is True
+        assert not registry["slow_tool"].semaphore.locked()
+
+        with pytest.raises(ValueError):
+            registry.tool("Duplicate", timeout_seconds=1)(slow_tool)
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_returns_degraded_result(self, mock_db_session):
+        """Test a failing tool trips its breaker and is then short-circuited without running"""
+
+        registry = ToolRegistry()
+        calls = []
+
+        @registry.tool("Flaky tool", timeout_seconds=1)
+        async def flaky_tool(db):
+            calls.append(1)
+            raise ConnectionError("database unavailable")
+
+        breaker = registry["flaky_tool"].breaker
+        for _ in range(breaker.min_calls):
+            result = await registry.execute(mock_db_session, "flaky_tool", {})
+            assert result == {"error": "Tool execution failed: database unavailable"}
+
+        assert breaker.state == OPEN
+        rejected = await registry.execute(mock_db_session, "flaky_tool", {})
+        assert rejected["degraded"] is True
+        assert "circuit open" in rejected["error"]
+        assert rejected["retry_after_seconds"] > 0
+        assert len(calls) == breaker.min_calls
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestToolsOnCallerSession:
+
+    @pytest.fixture
+    async def engine(self):
+        # As many connections as concurrent turns: nothing is left over for tools
+        engine = create_async_engine(
+            TEST_DATABASE_URL.replace("postgresql", "postgresql+asyncpg", 1),
+            pool_size=4,
+            max_overflow=0,
+            pool_timeout=1,
+        )
+        yield engine
+        await engine.dispose()
+
+    @pytest.fixture
+    def registry(self):
+        registry = ToolRegistry()
+
+        @registry.tool("Query tool", timeout_seconds=0.5, max_concurrency=8)
+        async def query_tool(db, seconds: float = 0):
+            try:
+                await db.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": seconds})
+            except Exception as e:
+                return {"error": str(e)}
+            return {"slept": seconds}
+
+        return registry
+
+    @pytest.mark.asyncio
+    async def test_turns_holding_the_whole_pool_still_run_tools(self, engine, registry):
+        """Test tools need no connection beyond their turn's, so a saturated pool cannot time them out"""
+
+        async def turn():
+            async with AsyncSession(engine) as db:
+                await db.execute(text("SELECT 1"))
+                results = [await registry.execute(db, "query_tool", {"seconds": 0.05}) for _ in range(3)]
+                await db.commit()
+                return results
+
+        results = await asyncio.gather(*(turn() for _ in range(4)))
+
+        assert results == [[{"slept": 0.05}] * 3] * 4
+        assert registry["query_tool"].breaker.state == CLOSED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_statement_leaves_the_turn_usable(self, engine, registry):
+        """Test the database cancels a slow tool query and the turn's transaction and timeout survive"""
+
+        async with AsyncSession(engine) as db:
+            await db.execute(text("CREATE TEMP TABLE turn_rows (id int) ON COMMIT DROP"))
+            await db.execute(text("INSERT INTO turn_rows VALUES (1)"))
+            statement_timeout = (await db.execute(text("SHOW statement_timeout"))).scalar()
+
+            result = await registry.execute(db, "query_tool", {"seconds": 5})
+
+            assert result["degraded"] is True
+            assert "timed out after 0.5s" in result["error"]
+            assert (await db.execute(text("SELECT count(*) FROM turn_rows"))).scalar() == 1
+            assert (await db.execute(text("SHOW statement_timeout"))).scalar() == statement_timeout
+            await db.commit()
+
+
+class TestCircuitBreaker:
+
+    def make_breaker(self, clock):
+        return CircuitBreaker(
+            "test", window=4, min_calls=4, failure_rate=0.5,
+            slow_call_seconds=1.0, slow_call_rate=0.75, open_seconds=10, clock=lambda: clock[0],
+        )
+
+    def test_trips_on_failure_rate(self):
+        """Test the breaker stays closed below the failure rate and opens once it is reached"""
+
+        clock = [0.0]
+        breaker = self.make_breaker(clock)
+        for success in (True, True, True, False):
+            assert breaker.allow()
+            breaker.record(success, 0.1)
+        assert breaker.state == CLOSED
+
+        assert breaker.allow()
+        breaker.record(False, 0.1)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.retry_after() == 10
+
+    def test_trips_on_slow_calls(self):
+        """Test successful but slow calls open the breaker too"""
+
+        clock = [0.0]
+        breaker = self.make_breaker(clock)
+        for seconds in (0.1, 2.0, 2.0, 2.0):
+            assert breaker.allow()
+            breaker.record(True, seconds)
+        assert breaker.state == OPEN
+
+    def test_half_open_lets_one_probe_through(self):
+        """Test a single probe is allowed after open_seconds and its outcome decides the state"""
+
+        clock = [0.0]
+        breaker = self.make_breaker(clock)
+        for _ in range(4):
+            breaker.allow()
+            breaker.record(False, 0.1)
+        assert breaker.state == OPEN
+
+        clock[0] = 10.0
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+        breaker.record(False, 0.1)
+        assert breaker.state == OPEN
+
+        clock[0] = 20.0
+        assert breaker.allow()
+        breaker.record(True, 0.1)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
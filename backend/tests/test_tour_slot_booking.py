@@ -0,0 +1,145 @@
+import asyncio
+import os
+import pytest
+from unittest.mock import MagicMock
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from db.repository import TourSlotRepository
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestBatchBooking:
+
+    @pytest.mark.asyncio
+    async def test_hold_slots_is_one_conditional_update(self, mock_db_session):
+        """Test batch holds check capacity per slot in a single statement"""
+
+        mock_db_session.execute.return_value = MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        )
+
+        await TourSlotRepository().hold_slots(mock_db_session, {"slot_1": 1, "slot_2": 3})
+
+        mock_db_session.execute.assert_called_once()
+        sql = compile_sql(mock_db_session.execute.call_args[0][0])
+        assert "FROM (VALUES" in sql
+        assert "tour_slots.current_bookings + requested.seats <= tour_slots.max_capacity" in sql
+        assert "RETURNING" in sql
+        mock_db_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_non_positive_seats_rejected(self, mock_db_session):
+        """Test zero or negative seat counts are refused before any statement runs"""
+
+        repo = TourSlotRepository()
+        with pytest.raises(ValueError, match="slot_2"):
+            await repo.hold_slots(mock_db_session, {"slot_1": 1, "slot_2": 0})
+        with pytest.raises(ValueError):
+            await repo.cancel_bookings(mock_db_session, {"slot_1": -2})
+        with pytest.raises(ValueError):
+            await repo.book_slot(mock_db_session, "slot_1", seats=-1)
+        with pytest.raises(ValueError):
+            await repo.cancel_booking(mock_db_session, "slot_1", seats=0)
+
+        mock_db_session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_is_a_no_op(self, mock_db_session):
+        """Test an empty batch does not touch the database"""
+
+        assert await TourSlotRepository().cancel_bookings(mock_db_session, {}) == []
+        mock_db_session.execute.assert_not_called()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+class TestBookingConcurrency:
+
+    @pytest.fixture
+    async def engine(self):
+        engine = create_async_engine(
+            TEST_DATABASE_URL.replace("postgresql", "postgresql+asyncpg", 1),
+            pool_size=50,
+            max_overflow=0,
+            pool_timeout=60,
+        )
+        yield engine
+        await engine.dispose()
+
+    @pytest.fixture
+    async def slot_id(self, engine):
+        start = datetime.now(timezone.utc) + timedelta(days=7)
+        async with engine.begin() as connection:
+            community_id = await connection.scalar(
+                text("INSERT INTO communities (name, address) VALUES ('booking stress', 'test') RETURNING id")
+            )
+            slot_id = await connection.scalar(
+                text("""
+                INSERT INTO tour_slots (community_id, start_time, end_time, is_available, max_capacity, current_bookings)
+                VALUES (:community_id, :start, :end, true, 10, 0) RETURNING id
+                """),
+                {"community_id": community_id, "start": start, "end": start + timedelta(hours=1)},
+            )
+        yield slot_id
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM tour_slots WHERE community_id = :id"), {"id": community_id})
+            await connection.execute(text("DELETE FROM communities WHERE id = :id"), {"id": community_id})
+
+    @pytest.mark.asyncio
+    async def test_parallel_bookers_never_oversell(self, engine, slot_id):
+        """Test hundreds of concurrent bookings fill the slot exactly to capacity"""
+
+        repo = TourSlotRepository()
+
+        async def book():
+            async with AsyncSession(engine) as db:
+                slot = await repo.book_slot(db, slot_id)
+                await db.commit()
+                return slot is not None
+
+        results = await asyncio.gather(*(book() for _ in range(300)))
+
+        async with engine.connect() as connection:
+            row = (await connection.execute(
+                text("SELECT current_bookings, is_available FROM tour_slots WHERE id = :id"), {"id": slot_id}
+            )).one()
+
+        assert sum(results) == 10
+        assert row.current_bookings == 10
+        assert row.is_available is False
+
+    @pytest.mark.asyncio
+    async def test_parallel_holds_and_cancellations_stay_within_capacity(self, engine, slot_id):
+        """Test mixed batch holds and cancellations keep the counter consistent"""
+
+        repo = TourSlotRepository()
+
+        async def hold():
+            async with AsyncSession(engine) as db:
+                booked = await repo.hold_slots(db, {slot_id: 2})
+                await db.commit()
+                return len(booked)
+
+        async def cancel():
+            async with AsyncSession(engine) as db:
+                cancelled = await repo.cancel_bookings(db, {slot_id: 1})
+                await db.commit()
+                return len(cancelled)
+
+        results = await asyncio.gather(*(hold() if i % 3 else cancel() for i in range(300)))
+        held = sum(r for i, r in enumerate(results) if i % 3)
+        cancelled = sum(r for i, r in enumerate(results) if not i % 3)
+
+        async with engine.connect() as connection:
+            bookings = await connection.scalar(
+                text("SELECT current_bookings FROM tour_slots WHERE id = :id"), {"id": slot_id}
+            )
+
+        assert 0 <= bookings <= 10
+        assert bookings == held * 2 - cancelled
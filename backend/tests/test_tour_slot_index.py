@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from datetime import datetime, timezone, timedelta
+from services.tour_slots import SlotRecord, TourSlotCache, TourSlotIndex
+
+NOW = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def hourly_slots(hours):
+    return [
+        SlotRecord(f"slot_{hour}", NOW + timedelta(hours=hour), NOW + timedelta(hours=hour, minutes=30), 1)
+        for hour in hours
+    ]
+
+
+@pytest.fixture
+def slot_repo():
+    with patch('services.tour_slots.TourSlotRepository') as mock_repo_class:
+        mock_repo = AsyncMock()
+        mock_repo.get_open_slot_rows.return_value = [tuple(slot) for slot in hourly_slots([1, 2, 5])]
+        mock_repo_class.return_value = mock_repo
+        yield mock_repo
+
+
+class TestTourSlotIndex:
+
+    def test_nearest_slots_on_both_sides(self):
+        """Test the slots closest to the preferred time are picked, ties going to the later slot"""
+
+        index = TourSlotIndex("community_123", 0, hourly_slots([1, 2, 4, 7, 8, 30]))
+
+        nearest = index.nearest(NOW + timedelta(hours=5), 3, now=NOW)
+        assert [slot.id for slot in nearest] == ["slot_4", "slot_7", "slot_8"]
+        assert [slot.id for slot in index.nearest(NOW + timedelta(days=5), 2, now=NOW)] == ["slot_8", "slot_30"]
+        assert [slot.id for slot in index.nearest(NOW, 10, now=NOW)] == ["slot_1", "slot_2", "slot_4", "slot_7", "slot_8", "slot_30"]
+
+    def test_started_slots_are_skipped(self):
+        """Test slots starting before now are never offered, even when closest"""
+
+        index = TourSlotIndex("community_123", 0, hourly_slots([1, 2, 4, 7]))
+
+        later = NOW + timedelta(hours=3)
+        assert [slot.id for slot in index.nearest(NOW + timedelta(hours=1), 2, now=later)] == ["slot_4", "slot_7"]
+        assert index.nearest(NOW, 2, now=NOW + timedelta(days=1)) == []
+
+    def test_naive_preferred_time_rejected(self):
+        """Test a preferred time without a UTC offset is not silently read as UTC"""
+
+        index = TourSlotIndex("community_123", 0, hourly_slots([1, 2]))
+
+        with pytest.raises(ValueError):
+            index.nearest(NOW.replace(tzinfo=None), 1, now=NOW)
+
+
+class TestTourSlotCache:
+
+    @pytest.mark.asyncio
+    async def test_not_kept_until_listener_is_live(self, mock_db_session, slot_repo):
+        """Test every lookup reads the database while invalidations could be missed"""
+
+        cache = TourSlotCache()
+        await cache.get(mock_db_session, "community_123")
+        await cache.get(mock_db_session, "community_123")
+
+        assert slot_repo.get_open_slot_rows.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_booking_notification_rebuilds_index(self, mock_db_session, slot_repo):
+        """Test the index is reused until a tour_slots change for the community is notified"""
+
+        cache = TourSlotCache()
+        cache.set_live(True)
+
+        first = await cache.get(mock_db_session, "community_123")
+        assert await cache.get(mock_db_session, "community_123") is first
+        assert slot_repo.get_open_slot_rows.await_count == 1
+
+        slot_repo.get_open_slot_rows.return_value = [tuple(slot) for slot in hourly_slots([2, 5])]
+        cache.invalidate("community_456")
+        assert await cache.get(mock_db_session, "community_123") is first
+        cache.invalidate("community_123")
+
+        rebuilt = await cache.get(mock_db_session, "community_123")
+        assert [slot.id for slot in rebuilt.slots] == ["slot_2", "slot_5"]
+        assert slot_repo.get_open_slot_rows.await_count == 2
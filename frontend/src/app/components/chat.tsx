@@ -8,6 +8,7 @@ interface Community {
   address: string
   phone?: string
   email?: string
+  available_units: number
 }
 
 interface Message {
@@ -297,7 +298,7 @@ export default function Chat() {
                   >
                     {communities.map((community) => (
                       <option key={community.id} value={community.id}>
-                        {community.name}
+                        {community.name} ({community.available_units} available)
                       </option>
                     ))}
                   </select>